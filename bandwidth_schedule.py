@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+시간대별 업로드 대역폭 제한
+
+config.yaml 예시 (수업 시간에는 5M, 그 외에는 bandwidth_limit):
+    rclone:
+      bandwidth_limit: "0"           # 스케줄에 해당하지 않는 시간 (0 = 무제한)
+      bandwidth_schedule:
+        - days: [mon, tue, wed, thu, fri]
+          start: "09:00"
+          end: "12:50"
+          limit: "5M"
+        - days: [mon, tue, wed, thu, fri]
+          start: "13:50"
+          end: "18:00"
+          limit: "5M"
+
+- 먼저 나온 항목이 우선
+- end는 "24:00"까지 가능, 자정을 넘는 구간은 두 항목으로 나눠서 작성
+- days 생략 시 매일 (mon..sun 또는 월..일)
+
+rclone copy 모드는 rclone 자체 타임테이블(--bwlimit "Mon-09:00,5M ...")로 넘겨
+전송 도중에도 시간이 바뀌면 바로 적용되고, rc 모드는 BandwidthUpdater 스레드가
+core/bwlimit를 갱신합니다.
+"""
+
+import re
+import threading
+from datetime import datetime
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+DAY_ALIASES = {
+    "mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6,
+    "월": 0, "화": 1, "수": 2, "목": 3, "금": 4, "토": 5, "일": 6,
+}
+RATE_UNITS = {"B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def normalize_limit(limit):
+    """"0"/빈값 → "off" (rclone 무제한 표기)"""
+    limit = str(limit or "0").strip()
+    return "off" if limit in ("0", "", "off") else limit
+
+
+def parse_rate(limit):
+    """
+    rclone 대역폭 표기 → bytes/s ("off"면 None)
+
+    단위 없으면 KiB/s, "10M:1M"처럼 업/다운을 나눈 경우 업로드 값 사용
+    """
+    limit = normalize_limit(limit)
+    if limit == "off":
+        return None
+    match = re.fullmatch(r"([\d.]+)\s*([BKMGT]?)I?B?", limit.split(":")[0].strip().upper())
+    if not match:
+        raise ValueError(f"잘못된 대역폭 값: {limit}")
+    return float(match.group(1)) * RATE_UNITS[match.group(2) or "K"]
+
+
+def lower_limit(a, b):
+    """두 제한 중 낮은 값 (rclone 표기, 둘 다 무제한이면 "off")"""
+    rate_a, rate_b = parse_rate(a), parse_rate(b)
+    if rate_a is None:
+        return normalize_limit(b)
+    if rate_b is None or rate_a <= rate_b:
+        return normalize_limit(a)
+    return normalize_limit(b)
+
+
+def _parse_day(value):
+    """요일 이름 → 0(월)~6(일)"""
+    key = str(value).strip().lower()
+    if key[:3] in DAY_ALIASES:
+        return DAY_ALIASES[key[:3]]
+    return DAY_ALIASES[key[:1]]
+
+
+def _parse_hhmm(value):
+    """"HH:MM" → 분"""
+    h, m = str(value).split(":")
+    minutes = int(h) * 60 + int(m)
+    if not 0 <= minutes <= 24 * 60:
+        raise ValueError(f"잘못된 시간: {value}")
+    return minutes
+
+
+def parse_schedule(entries):
+    """설정 항목 → [(요일 set, 시작 분, 끝 분, 제한)]"""
+    rules = []
+    for entry in entries or []:
+        days = entry.get("days")
+        if days:
+            day_set = {_parse_day(d) for d in days}
+        else:
+            day_set = set(range(7))
+        start = _parse_hhmm(entry["start"])
+        end = _parse_hhmm(entry["end"])
+        if end <= start:
+            raise ValueError(f"끝 시간이 시작 시간보다 빨라야 합니다: {entry}")
+        rules.append((day_set, start, end, normalize_limit(entry.get("limit"))))
+    return rules
+
+
+def limit_at(rules, default, weekday, minute):
+    """해당 요일/시각(분)의 제한"""
+    for day_set, start, end, limit in rules:
+        if weekday in day_set and start <= minute < end:
+            return limit
+    return normalize_limit(default)
+
+
+def current_limit(rules, default, now=None):
+    """현재 시각의 제한"""
+    now = now or datetime.now()
+    return limit_at(rules, default, now.weekday(), now.hour * 60 + now.minute)
+
+
+def to_rclone_timetable(rules, default):
+    """
+    rclone --bwlimit 타임테이블 문자열 생성
+
+    스케줄이 없으면 단일 값 ("off" 또는 "5M")을 반환
+    """
+    default = normalize_limit(default)
+    if not rules:
+        return default
+
+    entries = []
+    last = None
+    for weekday in range(7):
+        # 요일별 경계 시각에서의 제한값
+        bounds = {0}
+        for day_set, start, end, _ in rules:
+            if weekday in day_set:
+                bounds.add(start)
+                if end < 24 * 60:
+                    bounds.add(end)
+        for minute in sorted(bounds):
+            limit = limit_at(rules, default, weekday, minute)
+            if limit == last:
+                continue
+            entries.append(f"{DAY_NAMES[weekday]}-{minute // 60:02d}:{minute % 60:02d},{limit}")
+            last = limit
+    return " ".join(entries)
+
+
+class BandwidthUpdater:
+    """rc 모드용: 스케줄이 바뀌는 시점에 core/bwlimit 갱신"""
+
+    def __init__(self, client, rules, default, interval=30, logger=None, adjust=None):
+        self.client = client
+        self.rules = rules
+        self.default = default
+        self.interval = interval
+        self.logger = logger
+        self.adjust = adjust      # callback(제한) → 제한 (OBS 녹화 중 속도 제한 등)
+        self.current = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def apply(self):
+        limit = current_limit(self.rules, self.default)
+        if self.adjust:
+            limit = self.adjust(limit)
+        if limit != self.current:
+            self.client.set_bwlimit(limit)
+            if self.logger:
+                self.logger.info(f"대역폭 제한 변경: {self.current or '-'} -> {limit}")
+            self.current = limit
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.apply()
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"대역폭 제한 갱신 실패: {e}")
+
+    def start(self):
+        self.apply()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
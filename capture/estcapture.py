@@ -6,13 +6,16 @@ EST 출결 화면 캡처
 사용법:
     python estcapture.py           # 자동 모드 (트리거 시간에만)
     python estcapture.py --force   # 강제 캡처
-    python estcapture.py 7         # 7교시 단축 스케줄
+    python estcapture.py --course 7   # schedule.yaml의 코스 선택 (7은 --course 7과 같음)
     python estcapture.py --no-zoom # Zoom 체크 안함
+    python estcapture.py --worker  # 상주 모드 (flask_server.py가 실행)
 """
 
 import os
 import sys
-from datetime import datetime, time
+import json
+import time
+from datetime import datetime
 from pathlib import Path
 
 if hasattr(sys.stdout, "reconfigure"):
@@ -36,118 +39,97 @@ except ImportError:
     ZOOM_AVAILABLE = False
     print("[!] zoom_utils를 찾을 수 없습니다. Zoom 체크 비활성화.")
 
+from session_schedule import load_schedule
+
 # --- 설정 ---
 BASE_FOLDER = r"C:\Users\smhrd\Desktop\출결"
+# 차시/캡처 시각은 schedule.yaml (없으면 schedule.example.yaml)에서 변경
 # --- 설정 끝 ---
 
+_schedule = None
+
+
+def get_schedule():
+    """시간표 엔진 (schedule.yaml, 처음 호출할 때 한 번만 로드)"""
+    global _schedule
+    if _schedule is None:
+        _schedule = load_schedule()
+    return _schedule
+
 
-def get_belonging_session(now, schedule_type="default"):
+def get_belonging_session(now, schedule_type=None):
     """
     '현재 시각이 속한 차시'를 반환 (파일명/기록용).
     - 강제 호출(force) 여부와 무관하게 항상 이 기준을 사용.
-    - 예) 10:05 -> 2차시 (10:00~10:50 범위로 가정)
+    - 예) 10:05 -> 2차시 (schedule.yaml의 periods 기준)
     """
-    t = now.time()
-
-    # 7교시 단축 스케줄(예시: 09:00~16:50까지 7차시로 운영)
-    if schedule_type == "7":
-        if time(9, 0) <= t < time(10, 0):
-            return "1차시"
-        elif time(10, 0) <= t < time(11, 0):
-            return "2차시"
-        elif time(11, 0) <= t < time(12, 0):
-            return "3차시"
-        elif time(12, 0) <= t < time(13, 0):
-            return "4차시"
-        elif time(13, 0) <= t < time(14, 0):
-            return "5차시"
-        elif time(14, 0) <= t < time(15, 0):
-            return "6차시"
-        elif time(15, 0) <= t < time(16, 50):
-            return "7차시"
-        else:
-            return None
-
-    # 기본 9교시 스케줄
-    if time(9, 0) <= t < time(10, 0):
-        return "1차시"
-    elif time(10, 0) <= t < time(10, 50):
-        return "2차시"
-    elif time(10, 50) <= t < time(11, 50):
-        return "3차시"
-    elif time(11, 50) <= t < time(12, 50):
-        return "4차시"
-    elif time(13, 50) <= t < time(14, 50):
-        return "5차시"
-    elif time(14, 50) <= t < time(15, 50):
-        return "6차시"
-    elif time(15, 50) <= t < time(16, 50):
-        return "7차시"
-    elif time(16, 50) <= t < time(17, 50):
-        return "8차시"
-    else:
-        return "끝"
+    return get_schedule().session_at(now, schedule_type)
 
 
-def is_capture_time(now, schedule_type="default"):
+def is_capture_time(now, schedule_type=None):
     """
-    '자동 캡처 트리거 시간'인지 여부만 판단.
+    '자동 캡처 트리거 시간'인지 여부만 판단 (schedule.yaml의 triggers 기준).
     """
-    t = now.time()
-    weekday = now.weekday()  # 0 = 월요일
-
-    if schedule_type == "7":
-        return (
-            time(9, 9) <= t < time(9, 12)
-            or time(9, 59) <= t < time(10, 2)
-            or time(10, 59) <= t < time(11, 2)
-            or time(11, 59) <= t < time(12, 2)
-            or time(13, 59) <= t < time(14, 2)
-            or time(14, 59) <= t < time(15, 2)
-            or time(15, 59) <= t < time(16, 2)
-            or time(16, 49) <= t < time(16, 52)
-        )
-
-    # 기본(9교시)
-    monday_extra_end = (weekday == 0 and (time(16, 49) <= t < time(16, 52)))
-
-    return (
-        monday_extra_end
-        or (time(9, 9) <= t < time(9, 12))
-        or (time(9, 59) <= t < time(10, 2))
-        or (time(10, 59) <= t < time(11, 2))
-        or (time(11, 59) <= t < time(12, 2))
-        or (time(13, 59) <= t < time(14, 2))
-        or (time(14, 59) <= t < time(15, 2))
-        or (time(15, 59) <= t < time(16, 2))
-        or (time(16, 59) <= t < time(17, 2))
-        or (time(17, 49) <= t < time(17, 52))
-    )
+    return get_schedule().is_trigger(now, schedule_type)
 
 
-def take_screenshot(schedule_type="default", force=False, label_prefix=None, check_zoom=True):
+def capture_screen(schedule_type=None, force=False, label_prefix=None, check_zoom=True,
+                   on_phase=None):
     """
     전체 화면 스크린샷을 찍고 저장.
 
     Args:
-        schedule_type: "default" (9교시) 또는 "7" (7교시)
+        schedule_type: schedule.yaml의 코스 이름 (None이면 default_course + 날짜별 변경, 예: "7")
         force: True면 트리거 시간 무시하고 촬영
         label_prefix: 파일명에 추가 라벨
         check_zoom: True면 캡처 전 Zoom 회의 상태 확인
+        on_phase: 단계가 바뀔 때 호출 (zoom_check → rejoin → grab → encode → saved)
+
+    Returns:
+        결과 dict (flask_server.py에 JSON으로 전달)
+        - ok, image_path, session, captured_at, message
+        - zoom: "ok" / "failed" / "skipped" (체크 안 함) / "unavailable" (zoom_utils 없음)
+        - timings: 단계별 소요 시간(초) {zoom, grab, save, total}
     """
+    started = time.perf_counter()
     now = datetime.now()
+    result = {
+        "ok": False,
+        "image_path": None,
+        "session": None,
+        "captured_at": now.isoformat(timespec="seconds"),
+        "zoom": "skipped",
+        "timings": {},
+        "message": None,
+    }
+
+    def phase(name):
+        if on_phase:
+            on_phase(name)
+
+    def finish(message=None):
+        result["message"] = message
+        result["timings"]["total"] = round(time.perf_counter() - started, 3)
+        return result
 
     # 자동 트리거가 아니면 종료 (단, force면 무시)
     if (not force) and (not is_capture_time(now, schedule_type)):
         print(f"[{now.strftime('%H:%M:%S')}] 스크린샷 시간이 아닙니다. 종료합니다.")
-        return False
+        return finish("not capture time")
 
     # Zoom 회의 상태 확인 및 필요시 재참가
-    if check_zoom and ZOOM_AVAILABLE:
+    if check_zoom and not ZOOM_AVAILABLE:
+        result["zoom"] = "unavailable"
+    elif check_zoom:
         print(f"[{now.strftime('%H:%M:%S')}] Zoom 회의 상태 확인 중...")
-        if not ensure_meeting(verbose=True):
+        phase("zoom_check")
+        step = time.perf_counter()
+        in_meeting = ensure_meeting(verbose=True, on_rejoin=lambda: phase("rejoin"))
+        result["timings"]["zoom"] = round(time.perf_counter() - step, 3)
+        result["zoom"] = "ok" if in_meeting else "failed"
+        if not in_meeting:
             print("[X] Zoom 회의 연결 실패. 캡처를 건너뜁니다.")
-            return False
+            return finish("zoom meeting not connected")
         print("[O] Zoom 회의 준비 완료")
         print()
 
@@ -155,6 +137,7 @@ def take_screenshot(schedule_type="default", force=False, label_prefix=None, che
     session_name = get_belonging_session(now, schedule_type)
     if session_name is None:
         session_name = "기타"
+    result["session"] = session_name
 
     # 1) 날짜 폴더 생성
     date_folder_name = now.strftime("%Y%m%d")
@@ -163,7 +146,7 @@ def take_screenshot(schedule_type="default", force=False, label_prefix=None, che
         os.makedirs(date_folder_path, exist_ok=True)
     except OSError as e:
         print(f"폴더 생성 실패: {e}")
-        return False
+        return finish(f"folder error: {e}")
 
     # 2) 파일명 생성
     file_date = now.strftime("%m%d")
@@ -180,27 +163,95 @@ def take_screenshot(schedule_type="default", force=False, label_prefix=None, che
 
     # 3) 캡처 및 저장
     try:
+        phase("grab")
+        step = time.perf_counter()
         img = ImageGrab.grab()
+        result["timings"]["grab"] = round(time.perf_counter() - step, 3)
+        phase("encode")
+        step = time.perf_counter()
         img.save(file_path, "JPEG")
-        print(f"SAVED:{file_path}")
-        return True
+        result["timings"]["save"] = round(time.perf_counter() - step, 3)
     except Exception as e:
         print(f"스크린샷 저장 실패: {e}")
-        return False
+        return finish(f"save error: {e}")
+
+    print(f"SAVED:{file_path}")
+    phase("saved")
+    result["ok"] = True
+    result["image_path"] = file_path
+    return finish()
+
+
+def take_screenshot(schedule_type=None, force=False, label_prefix=None, check_zoom=True):
+    """capture_screen()의 성공 여부만 반환"""
+    return capture_screen(schedule_type, force, label_prefix, check_zoom)["ok"]
+
+
+def serve_worker():
+    """
+    상주 캡처 모드 (flask_server.py가 실행해 두고 요청마다 재사용).
+
+    Pillow/pywinauto/pyautogui import를 한 번만 하고 stdin으로 명령을 한 줄씩 받음.
+    - "ping"    → "PONG"
+    - "capture" → 단계마다 "PHASE:<단계>", 끝나면 "RESULT:<JSON>" (capture_screen() 결과)
+    캡처 중 출력하는 로그는 stderr로 보내고 stdout에는 응답만 씀.
+    """
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    get_schedule()
+
+    def reply(line):
+        out.write(line + "\n")
+        out.flush()
+
+    reply("READY")
+    for line in sys.stdin:
+        cmd = line.strip()
+        if cmd == "ping":
+            reply("PONG")
+        elif cmd == "capture":
+            try:
+                result = capture_screen(force=True, on_phase=lambda name: reply("PHASE:" + name))
+            except Exception as e:
+                print(f"스크린샷 실패: {e}")
+                result = {"ok": False, "message": str(e)}
+            reply("RESULT:" + json.dumps(result))
+        elif cmd == "quit":
+            break
 
 
 if __name__ == "__main__":
-    schedule_type = "default"
+    if "--worker" in sys.argv:
+        serve_worker()
+        sys.exit(0)
+
+    schedule_type = None
     force = False
     label_prefix = None
     check_zoom = True
 
     args = [arg.lower() for arg in sys.argv[1:]]
 
-    # 7교시 단축
-    if "7" in args:
-        schedule_type = "7"
-        print("7교시 단축 스케줄로 실행합니다...")
+    # 코스 선택 (--course <이름>, schedule.yaml의 courses 중 하나 / "7"은 --course 7과 같음)
+    course = None
+    raw_args = sys.argv[1:]
+    for i, arg in enumerate(raw_args):
+        if arg == "--course":
+            if i + 1 >= len(raw_args):
+                print("✗ --course 뒤에 코스 이름이 필요합니다")
+                sys.exit(2)
+            course = raw_args[i + 1]
+        elif arg.startswith("--course="):
+            course = arg.split("=", 1)[1]
+    if course is None and "7" in args:
+        course = "7"
+    if course is not None:
+        courses = get_schedule().courses
+        if course not in courses:
+            print(f"✗ 시간표에 없는 코스: {course} (사용 가능: {', '.join(map(str, courses))})")
+            sys.exit(2)
+        schedule_type = course
+        print(f"{course} 코스 스케줄로 실행합니다...")
 
     # 강제 캡처
     if "--force" in args or "force" in args:
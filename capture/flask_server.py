@@ -1,6 +1,11 @@
 from flask import Flask, jsonify, Response, request, send_file
 import subprocess
 import threading
+import collections
+import atexit
+import queue
+import json
+import uuid
 import time
 import os
 import re
@@ -8,30 +13,354 @@ import re
 app = Flask(__name__)
 
 PYTHON_EXE = r"C:\Users\smhrd\.conda\envs\est_capture\pythonw.exe"
-CAPTURE_SCRIPT = r"C:\scripts\estcapture.py"
+# 같은 폴더의 estcapture.py (session_schedule.py, schedule.yaml도 같은 폴더에서 찾음)
+CAPTURE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "estcapture.py")
 BASE_FOLDER = r"C:\Users\smhrd\Desktop\출결"
 
 TIMEOUT_SEC = 120
-lock = threading.Lock()
-
-
-def find_latest_image():
-    """BASE_FOLDER에서 가장 최근 jpg 파일 찾기"""
-    from datetime import datetime
-    import glob
-
-    # 오늘 날짜 폴더
-    today_folder = os.path.join(BASE_FOLDER, datetime.now().strftime("%Y%m%d"))
-    if not os.path.isdir(today_folder):
-        return None
-
-    # 해당 폴더의 jpg 파일들
-    files = glob.glob(os.path.join(today_folder, "*.jpg"))
-    if not files:
-        return None
-
-    # 수정 시간 기준 가장 최근 파일
-    return max(files, key=os.path.getmtime)
+WORKER_PING_SEC = 60      # 유휴 중 상주 워커 응답 확인 주기
+WORKER_PING_TIMEOUT = 10  # ping 응답이 이 시간 안에 없으면 멈춘 것으로 보고 재시작
+MAX_JOBS = 200            # 상태 조회용으로 보관할 최근 작업 수
+SSE_KEEPALIVE_SEC = 15    # SSE 연결 유지용 주석 전송 주기
+
+
+class CaptureWorker:
+    """
+    estcapture.py --worker 상주 프로세스.
+
+    요청마다 Python을 새로 띄우면 Pillow/pywinauto/pyautogui import에 매번 시간이 걸리므로
+    한 번 띄워 두고 stdin/stdout으로 명령을 주고받음.
+    응답이 없으면(Zoom 자동화가 멈춘 경우 등) 강제 종료 후 새로 띄움.
+    """
+
+    def __init__(self):
+        self.proc = None
+        self.lines = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    @staticmethod
+    def _pump(stream, lines):
+        for line in stream:
+            lines.put(line.strip())
+        lines.put(None)
+
+    @staticmethod
+    def _drain(stream):
+        # 캡처 로그 (Zoom 체크 등)
+        for line in stream:
+            print(f"[worker] {line.rstrip()}")
+
+    def _alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def _start(self):
+        proc = subprocess.Popen(
+            [PYTHON_EXE, CAPTURE_SCRIPT, "--worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(proc.stdout, lines), daemon=True).start()
+        threading.Thread(target=self._drain, args=(proc.stderr,), daemon=True).start()
+        self.proc, self.lines = proc, lines
+        self._expect(("READY",), TIMEOUT_SEC)
+        print(f"[worker] 상주 캡처 워커 시작 (PID {proc.pid})")
+
+    def _kill(self):
+        if self.proc is not None:
+            try:
+                self.proc.kill()
+                self.proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.proc = None
+        self.lines = None
+
+    def _expect(self, replies, timeout, on_line=None):
+        """
+        replies 중 하나로 시작하는 응답 줄을 기다림 (시간 초과면 워커 종료)
+        그 전에 오는 다른 줄은 on_line으로 전달
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = self.lines.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                self._kill()
+                self._wake.set()
+                raise subprocess.TimeoutExpired(CAPTURE_SCRIPT, timeout)
+            if line is None:
+                self._kill()
+                self._wake.set()
+                raise RuntimeError("capture worker exited")
+            if line.startswith(replies):
+                return line
+            if on_line:
+                on_line(line)
+
+    def _request(self, cmd, reply, timeout, on_line=None):
+        if not self._alive():
+            self._kill()
+            self._start()
+        try:
+            self.proc.stdin.write(cmd + "\n")
+            self.proc.stdin.flush()
+        except OSError:
+            self._kill()
+            raise RuntimeError("capture worker exited")
+        return self._expect((reply,), timeout, on_line)
+
+    def capture(self, on_phase=None):
+        """
+        강제 캡처 1회. estcapture.capture_screen() 결과 dict 반환
+
+        Args:
+            on_phase: 워커가 단계를 알릴 때마다 호출 (zoom_check, rejoin, grab, encode, saved)
+        """
+        def on_line(line):
+            if on_phase and line.startswith("PHASE:"):
+                on_phase(line[len("PHASE:"):])
+
+        with self._lock:
+            line = self._request("capture", "RESULT:", TIMEOUT_SEC, on_line)
+        return json.loads(line[len("RESULT:"):])
+
+    def _watchdog(self):
+        while True:
+            self._wake.wait(WORKER_PING_SEC)
+            self._wake.clear()
+            # 캡처 중이면 건너뜀 (캡처 시간 초과는 capture()에서 처리)
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                self._request("ping", "PONG", WORKER_PING_TIMEOUT)
+            except (RuntimeError, OSError, subprocess.TimeoutExpired) as e:
+                print(f"[worker] 응답 없음, 재시작: {e}")
+            finally:
+                self._lock.release()
+
+    def start(self):
+        """워커를 미리 띄우고 감시 스레드 시작"""
+        atexit.register(self.stop)
+        self._wake.set()
+        threading.Thread(target=self._watchdog, daemon=True).start()
+
+    def stop(self):
+        with self._lock:
+            if self._alive():
+                try:
+                    self.proc.stdin.write("quit\n")
+                    self.proc.stdin.flush()
+                    self.proc.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            self._kill()
+
+
+worker = CaptureWorker()
+
+
+latest = None             # 마지막 캡처 결과 (폴더를 다시 훑지 않도록 유지)
+latest_lock = threading.Lock()
+
+
+def latest_path():
+    return os.path.join(BASE_FOLDER, "latest.json")
+
+
+def load_latest():
+    """서버 시작 시 latest.json에서 마지막 캡처 결과 복원"""
+    global latest
+    try:
+        with open(latest_path(), "r", encoding="utf-8") as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        return
+    if result.get("image_path") and os.path.isfile(result["image_path"]):
+        latest = result
+
+
+def save_latest(result):
+    """마지막 캡처 결과 갱신 (latest.json에도 기록)"""
+    global latest
+    with latest_lock:
+        latest = result
+        tmp = latest_path() + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp, latest_path())
+        except OSError as e:
+            print(f"latest.json 저장 실패: {e}")
+
+
+class JobBoard:
+    """
+    캡처 작업 상태 + 단계 이벤트 기록
+
+    작업 상태: queued → running → done / failed
+    이벤트: 작업이 단계(queued, zoom_check, rejoin, grab, encode, saved, done, failed)를
+    지날 때마다 순번(seq)을 붙여 기록. SSE는 마지막으로 받은 seq 이후 이벤트를 보냄
+    """
+
+    TERMINAL = ("done", "failed")
+
+    def __init__(self, max_jobs=MAX_JOBS):
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self.events = collections.deque(maxlen=max_jobs * 10)
+        self.seq = 0
+        self.active = None
+        self.last_done = None
+        self.cond = threading.Condition()
+
+    def create(self, max_age=None):
+        """
+        캡처 작업 등록 (single-flight)
+
+        이미 진행 중인 작업이 있으면 새로 찍지 않고 그 작업을 돌려줌.
+        max_age(초)를 주면 그 안에 성공한 캡처가 있을 때 그 작업을 돌려줌.
+
+        Returns:
+            (작업, 새로 등록했는지)
+        """
+        with self.cond:
+            if self.active is not None:
+                return self.active, False
+            last = self.last_done
+            if max_age is not None and last is not None and time.time() - last["finished_at"] <= max_age:
+                return last, False
+            job = {
+                "id": uuid.uuid4().hex[:12],
+                "state": "queued",
+                "phase": None,
+                "phases": [],
+                "created_at": time.time(),
+                "finished_at": None,
+                "result": None,
+            }
+            self.jobs[job["id"]] = job
+            while len(self.jobs) > self.max_jobs:
+                self.jobs.pop(next(iter(self.jobs)))
+            self.active = job
+            self._publish(job, "queued")
+            return job, True
+
+    def _publish(self, job, phase, result=None):
+        now = time.time()
+        job["phase"] = phase
+        job["phases"].append({"phase": phase, "at": round(now - job["created_at"], 3)})
+        if phase in self.TERMINAL:
+            job["state"] = phase
+            job["result"] = result
+            job["finished_at"] = now
+            if self.active is job:
+                self.active = None
+            if phase == "done":
+                self.last_done = job
+        elif phase != "queued":
+            job["state"] = "running"
+        self.seq += 1
+        event = {"seq": self.seq, "job_id": job["id"], "phase": phase, "state": job["state"]}
+        if result is not None:
+            event["result"] = result
+        self.events.append(event)
+        self.cond.notify_all()
+
+    def publish(self, job, phase, result=None):
+        with self.cond:
+            self._publish(job, phase, result)
+
+    def get(self, job_id):
+        with self.cond:
+            job = self.jobs.get(job_id)
+            return None if job is None else job_status(job)
+
+    def wait_events(self, after_seq, timeout):
+        """after_seq 이후 이벤트 목록 (없으면 timeout까지 대기)"""
+        with self.cond:
+            if self.seq <= after_seq:
+                self.cond.wait(timeout)
+            return [e for e in self.events if e["seq"] > after_seq]
+
+
+def job_status(job):
+    """작업 상태 응답 (result는 끝난 뒤에만)"""
+    status = {k: job[k] for k in ("id", "state", "phase", "phases", "result")}
+    end = job["finished_at"] or time.time()
+    status["elapsed_sec"] = round(end - job["created_at"], 2)
+    status["status_url"] = f"/jobs/{job['id']}"
+    status["events_url"] = f"/jobs/{job['id']}/events"
+    return status
+
+
+board = JobBoard()
+job_queue = queue.Queue()
+
+
+def run_jobs():
+    """캡처 작업을 하나씩 상주 워커로 실행 (HTTP 요청 스레드는 기다리지 않음)"""
+    while True:
+        job = job_queue.get()
+        try:
+            result = worker.capture(on_phase=lambda phase: board.publish(job, phase))
+            if not result.get("ok"):
+                result.setdefault("message", "캡처 실패")
+        except subprocess.TimeoutExpired:
+            result = {"ok": False, "message": f"capture timeout ({TIMEOUT_SEC}s)"}
+        except Exception as e:
+            result = {"ok": False, "message": str(e)}
+
+        if result.get("ok"):
+            save_latest(result)
+        board.publish(job, "done" if result.get("ok") else "failed", result)
+
+
+threading.Thread(target=run_jobs, daemon=True).start()
+
+
+def sse(events):
+    """이벤트 목록을 SSE 형식으로"""
+    return "".join(
+        f"id: {e['seq']}\nevent: {e['phase']}\ndata: {json.dumps(e, ensure_ascii=False)}\n\n"
+        for e in events
+    )
+
+
+def event_stream(after_seq, job_id=None):
+    """after_seq 이후 이벤트를 계속 보냄 (job_id가 있으면 그 작업만, 끝나면 종료)"""
+    if job_id is not None:
+        # 이미 지난 단계도 처음부터 보여줌
+        with board.cond:
+            events = [e for e in board.events if e["job_id"] == job_id]
+        yield sse(events)
+        if any(e["phase"] in JobBoard.TERMINAL for e in events):
+            return
+        after_seq = max([after_seq] + [e["seq"] for e in events])
+
+    while True:
+        events = board.wait_events(after_seq, SSE_KEEPALIVE_SEC)
+        if not events:
+            yield ": keepalive\n\n"
+            continue
+        after_seq = events[-1]["seq"]
+        if job_id is not None:
+            events = [e for e in events if e["job_id"] == job_id]
+        yield sse(events)
+        if job_id is not None and any(e["phase"] in JobBoard.TERMINAL for e in events):
+            return
+
+
+def sse_response(stream):
+    return Response(stream, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @app.get("/ui")
@@ -57,31 +386,68 @@ def ui():
   <div id="filepath"></div>
   <img id="preview" alt="captured"/>
   <script>
+    function showImage(data){
+      const preview = document.getElementById('preview');
+      document.getElementById('filepath').textContent = data.image_path;
+      preview.src = '/image?path=' + encodeURIComponent(data.image_path) + '&t=' + Date.now();
+      preview.style.display = 'block';
+    }
+
+    // 마지막 캡처 표시
+    fetch('/latest').then(r => r.ok ? r.json() : null).then(data => {
+      if(data && data.image_path){
+        document.getElementById('status').textContent = '마지막 캡처: ' + data.captured_at;
+        showImage(data);
+      }
+    });
+
+    const PHASES = {
+      queued: '대기 중...', zoom_check: 'Zoom 확인 중...', rejoin: 'Zoom 재참가 중...',
+      grab: '화면 캡처 중...', encode: '저장 중...', saved: '저장 완료'
+    };
+
     async function run(){
       const btn = document.getElementById('btn');
       const status = document.getElementById('status');
       const preview = document.getElementById('preview');
-      const filepath = document.getElementById('filepath');
 
       btn.disabled = true;
-      status.textContent = '캡처 중...';
+      status.textContent = '캡처 요청 중...';
       preview.style.display = 'none';
 
       try {
         const r = await fetch('/capture', {method:'POST'});
-        const data = await r.json();
-
-        if(data.ok && data.image_path){
-          status.textContent = '캡처 완료!';
-          filepath.textContent = data.image_path;
-          preview.src = '/image?path=' + encodeURIComponent(data.image_path) + '&t=' + Date.now();
-          preview.style.display = 'block';
-        } else {
-          status.textContent = '캡처 실패: ' + (data.message || data.result || 'Unknown error');
+        const job = await r.json();
+        if(!job.job_id){
+          throw new Error(job.message || 'Unknown error');
+        }
+        if(job.coalesced){
+          status.textContent = '진행 중인 캡처 결과를 기다립니다...';
         }
+
+        // 단계 표시 (SSE)
+        const es = new EventSource('/jobs/' + job.job_id + '/events');
+        Object.keys(PHASES).forEach(p => es.addEventListener(p, () => { status.textContent = PHASES[p]; }));
+        es.addEventListener('done', e => {
+          const data = JSON.parse(e.data).result;
+          status.textContent = '캡처 완료! (' + data.session + ', ' + data.timings.total + '초)';
+          showImage(data);
+          es.close();
+          btn.disabled = false;
+        });
+        es.addEventListener('failed', e => {
+          const data = JSON.parse(e.data).result;
+          status.textContent = '캡처 실패: ' + (data.message || 'Unknown error');
+          es.close();
+          btn.disabled = false;
+        });
+        es.onerror = () => {
+          status.textContent = '연결 끊김 (상태: /jobs/' + job.job_id + ')';
+          es.close();
+          btn.disabled = false;
+        };
       } catch(e) {
         status.textContent = '오류: ' + e.message;
-      } finally {
         btn.disabled = false;
       }
     }
@@ -93,56 +459,64 @@ def ui():
 
 @app.post("/capture")
 def capture():
-    # 동시 실행 방지
-    if not lock.acquire(blocking=False):
-        return jsonify(ok=False, message="capture already running"), 429
+    """
+    캡처 작업 등록 후 바로 202 + 작업 ID 반환 (?wait=1이면 끝날 때까지 기다려 결과 반환)
 
+    이미 진행 중인 캡처가 있으면 새로 찍지 않고 같은 작업에 붙음 (같은 결과를 받음).
+    ?max_age=N: N초 안에 찍은 캡처가 있으면 그 결과를 그대로 사용
+    """
     try:
-        start = time.time()
-
-        # 캡처 전 최신 파일 시간 기록
-        before_latest = find_latest_image()
-        before_mtime = os.path.getmtime(before_latest) if before_latest else 0
-
-        proc = subprocess.run(
-            [PYTHON_EXE, CAPTURE_SCRIPT, "--force"],
-            capture_output=True,
-            text=False,
-            timeout=TIMEOUT_SEC
-        )
-
-        elapsed = round(time.time() - start, 2)
-
-        if proc.returncode != 0:
-            return jsonify(
-                ok=False,
-                elapsed_sec=elapsed,
-                returncode=proc.returncode
-            ), 500
-
-        # 캡처 후 최신 파일 찾기
-        time.sleep(0.3)  # 파일 저장 완료 대기
-        image_path = find_latest_image()
-
-        # 새 파일인지 확인
-        if image_path and os.path.getmtime(image_path) > before_mtime:
-            return jsonify(
-                ok=True,
-                elapsed_sec=elapsed,
-                image_path=image_path
-            )
-        else:
-            return jsonify(
-                ok=False,
-                elapsed_sec=elapsed,
-                message="캡처 파일을 찾을 수 없습니다"
-            ), 500
-
-    except subprocess.TimeoutExpired:
-        return jsonify(ok=False, message=f"capture timeout ({TIMEOUT_SEC}s)"), 504
-
-    finally:
-        lock.release()
+        max_age = float(request.args["max_age"]) if request.args.get("max_age") else None
+    except ValueError:
+        return jsonify(ok=False, message="max_age must be a number"), 400
+
+    job, created = board.create(max_age)
+    if created:
+        job_queue.put(job)
+
+    if request.args.get("wait") not in ("1", "true"):
+        # state와 result를 같은 잠금 안에서 읽어야 끝나는 순간에도 result가 빠지지 않음
+        with board.cond:
+            status = job_status(job)
+        finished = status["state"] in JobBoard.TERMINAL
+        return jsonify(ok=True, job_id=job["id"], coalesced=not created, state=status["state"],
+                       result=status["result"], status_url=status["status_url"],
+                       events_url=status["events_url"]), 200 if finished else 202
+
+    with board.cond:
+        board.cond.wait_for(lambda: job["state"] in JobBoard.TERMINAL, TIMEOUT_SEC + 10)
+        status = job_status(job)
+    result = status["result"] or {"ok": False, "message": "capture timeout"}
+    code = 200 if result.get("ok") else (504 if "timeout" in (result.get("message") or "") else 500)
+    return jsonify(elapsed_sec=status["elapsed_sec"], job_id=job["id"], coalesced=not created,
+                   **result), code
+
+
+@app.get("/jobs/<job_id>")
+def get_job(job_id):
+    """작업 상태 (state, 현재 단계, 지난 단계, 끝났으면 result)"""
+    status = board.get(job_id)
+    if status is None:
+        return jsonify(ok=False, message="job not found"), 404
+    return jsonify(status)
+
+
+@app.get("/jobs/<job_id>/events")
+def job_events(job_id):
+    """작업 단계 SSE (끝나면 연결 종료)"""
+    if board.get(job_id) is None:
+        return jsonify(ok=False, message="job not found"), 404
+    return sse_response(event_stream(0, job_id))
+
+
+@app.get("/events")
+def all_events():
+    """모든 작업의 단계 SSE (대시보드용, Last-Event-ID부터 이어받기)"""
+    try:
+        after_seq = int(request.headers.get("Last-Event-ID") or request.args.get("after") or board.seq)
+    except ValueError:
+        return jsonify(ok=False, message="Last-Event-ID/after must be an integer"), 400
+    return sse_response(event_stream(after_seq))
 
 
 @app.get("/image")
@@ -160,10 +534,20 @@ def get_image():
     return send_file(path, mimetype="image/jpeg")
 
 
+@app.get("/latest")
+def get_latest():
+    """마지막 캡처 결과"""
+    if latest is None:
+        return jsonify(ok=False, message="no capture yet"), 404
+    return jsonify(latest)
+
+
 @app.get("/health")
 def health():
-    return jsonify(ok=True)
+    return jsonify(ok=True, worker_alive=worker._alive())
 
 
 if __name__ == "__main__":
+    load_latest()
+    worker.start()
     app.run(host="0.0.0.0", port=8000)
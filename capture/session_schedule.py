@@ -0,0 +1,216 @@
+"""
+수업 시간표 엔진 (차시/캡처 시각 조회)
+
+capture/schedule.yaml(없으면 schedule.example.yaml)의 코스별 차시/캡처 시각을 날짜마다
+정렬된 구간 배열로 만들어 두고 이분 탐색으로 조회합니다.
+- 요일별 변경 (weekdays: periods/triggers 대체, extra_triggers 추가)
+- 휴일 (calendar.holidays: 차시/캡처 없음)
+- 날짜별 다른 시간표 (calendar.overrides: 기본 코스로 조회할 때만 적용)
+
+다른 스크립트에서 import해서 사용:
+    from session_schedule import load_schedule
+    schedule = load_schedule()
+    schedule.session_at(now)                   # 현재 차시 이름
+    schedule.is_trigger(now)                   # 자동 캡처 시각인지
+    schedule.next_trigger(now)                 # 다음 캡처 시각 (datetime)
+    schedule.seconds_until_next_trigger(now)
+
+사용법:
+    python session_schedule.py                 # 오늘 시간표 + 다음 캡처 시각
+    python session_schedule.py --course 7
+"""
+
+import sys
+import bisect
+import argparse
+from datetime import datetime, date, timedelta
+from pathlib import Path
+
+import yaml
+
+SCHEDULE_DIR = Path(__file__).parent
+SCHEDULE_PATH = SCHEDULE_DIR / "schedule.yaml"
+EXAMPLE_PATH = SCHEDULE_DIR / "schedule.example.yaml"
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# 다음 캡처 시각을 찾을 때 최대 며칠 뒤까지 볼지
+SEARCH_DAYS = 14
+
+
+def _parse_hhmm(value):
+    """"HH:MM" → 자정부터 초"""
+    h, m = str(value).split(":")
+    return int(h) * 3600 + int(m) * 60
+
+
+def _seconds(now):
+    return now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+
+
+class DayTable:
+    """하루치 차시/캡처 구간 (시작 시각 순 정렬 배열)"""
+
+    def __init__(self, periods, triggers, window_sec, outside):
+        periods = sorted(periods)
+        for prev, cur in zip(periods, periods[1:]):
+            if cur[0] < prev[1]:
+                raise ValueError(f"차시가 겹칩니다: {prev[2]} / {cur[2]}")
+        self.period_starts = [p[0] for p in periods]
+        self.period_ends = [p[1] for p in periods]
+        self.period_names = [p[2] for p in periods]
+        self.outside = outside
+
+        # 캡처 구간은 겹치면 합침
+        merged = []
+        for start in sorted(set(triggers)):
+            end = start + window_sec
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.trigger_starts = [t[0] for t in merged]
+        self.trigger_ends = [t[1] for t in merged]
+
+    def session(self, sec):
+        i = bisect.bisect_right(self.period_starts, sec) - 1
+        if i >= 0 and sec < self.period_ends[i]:
+            return self.period_names[i]
+        return self.outside
+
+    def in_trigger(self, sec):
+        i = bisect.bisect_right(self.trigger_starts, sec) - 1
+        return i >= 0 and sec < self.trigger_ends[i]
+
+    def next_trigger(self, sec):
+        """sec 이후(초과) 첫 캡처 시작 시각 (없으면 None)"""
+        i = bisect.bisect_right(self.trigger_starts, sec)
+        return self.trigger_starts[i] if i < len(self.trigger_starts) else None
+
+
+EMPTY_DAY = DayTable([], [], 0, None)
+
+
+class SessionSchedule:
+    """코스별 시간표 + 달력 (날짜별 DayTable 캐시)"""
+
+    def __init__(self, data):
+        data = data or {}
+        self.courses = data.get('courses') or {}
+        if not self.courses:
+            raise ValueError("시간표에 courses가 없습니다")
+        self.default_course = str(data.get('default_course') or next(iter(self.courses)))
+        calendar = data.get('calendar') or {}
+        self.holidays = {str(d) for d in calendar.get('holidays') or []}
+        self.overrides = {str(k): str(v) for k, v in (calendar.get('overrides') or {}).items()}
+        for name in [self.default_course] + list(self.overrides.values()):
+            if name not in self.courses:
+                raise ValueError(f"시간표에 없는 코스: {name}")
+        self._cache = {}
+
+    def course_for(self, day, course=None):
+        """그날 사용할 코스 (기본 코스로 조회하면 날짜별 변경 적용)"""
+        course = str(course) if course is not None else self.default_course
+        if course == self.default_course:
+            course = self.overrides.get(day.isoformat(), course)
+        if course not in self.courses:
+            raise ValueError(f"시간표에 없는 코스: {course}")
+        return course
+
+    def day_table(self, day, course=None):
+        """날짜의 DayTable (휴일이면 빈 표)"""
+        if day.isoformat() in self.holidays:
+            return EMPTY_DAY
+        course = self.course_for(day, course)
+        key = (course, day.weekday())
+        table = self._cache.get(key)
+        if table is None:
+            table = self._cache[key] = self._compile(course, day.weekday())
+        return table
+
+    def _compile(self, course, weekday):
+        cfg = self.courses[course]
+        day_cfg = (cfg.get('weekdays') or {}).get(WEEKDAYS[weekday]) or {}
+        periods = day_cfg.get('periods', cfg.get('periods')) or []
+        triggers = list(day_cfg.get('triggers', cfg.get('triggers')) or [])
+        triggers += day_cfg.get('extra_triggers') or []
+        window_sec = int(day_cfg.get('trigger_window_min', cfg.get('trigger_window_min', 3)) * 60)
+        return DayTable(
+            [(_parse_hhmm(start), _parse_hhmm(end), str(name)) for start, end, name in periods],
+            [_parse_hhmm(t) for t in triggers],
+            window_sec,
+            day_cfg.get('outside', cfg.get('outside')),
+        )
+
+    # ----------------------------------------
+    # 조회
+    # ----------------------------------------
+    def session_at(self, now, course=None):
+        """now가 속한 차시 이름 (차시 밖이면 코스의 outside 값)"""
+        return self.day_table(now.date(), course).session(_seconds(now))
+
+    def is_trigger(self, now, course=None):
+        """자동 캡처 시각인지"""
+        return self.day_table(now.date(), course).in_trigger(_seconds(now))
+
+    def next_trigger(self, now, course=None):
+        """now 이후 다음 캡처 시작 시각 (SEARCH_DAYS 안에 없으면 None)"""
+        sec = _seconds(now)
+        day = now.date()
+        for offset in range(SEARCH_DAYS + 1):
+            current = day + timedelta(days=offset)
+            start = self.day_table(current, course).next_trigger(sec if offset == 0 else -1)
+            if start is not None:
+                return datetime.combine(current, datetime.min.time()) + timedelta(seconds=start)
+        return None
+
+    def seconds_until_next_trigger(self, now, course=None):
+        """다음 캡처까지 남은 초 (없으면 None)"""
+        nxt = self.next_trigger(now, course)
+        return None if nxt is None else (nxt - now).total_seconds()
+
+
+def load_schedule(path=None):
+    """schedule.yaml (없으면 schedule.example.yaml) 로드"""
+    if path is None:
+        path = SCHEDULE_PATH if SCHEDULE_PATH.exists() else EXAMPLE_PATH
+    with open(path, "r", encoding="utf-8") as f:
+        return SessionSchedule(yaml.safe_load(f))
+
+
+def _fmt(sec):
+    sec = int(sec)
+    return f"{sec // 3600:02d}:{sec % 3600 // 60:02d}"
+
+
+def main():
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    parser = argparse.ArgumentParser(description="수업 시간표 조회")
+    parser.add_argument("--course", default=None, help="코스 이름 (기본: default_course)")
+    parser.add_argument("--date", default=None, help="날짜 (YYYY-MM-DD, 기본: 오늘)")
+    args = parser.parse_args()
+
+    schedule = load_schedule()
+    now = datetime.now()
+    day = date.fromisoformat(args.date) if args.date else now.date()
+    table = schedule.day_table(day, args.course)
+
+    print(f"{day} ({WEEKDAYS[day.weekday()]}) 코스: {schedule.course_for(day, args.course)}"
+          f"{' [휴일]' if day.isoformat() in schedule.holidays else ''}")
+    for start, end, name in zip(table.period_starts, table.period_ends, table.period_names):
+        print(f"  {_fmt(start)}~{_fmt(end)}  {name}")
+    print(f"  캡처: {', '.join(f'{_fmt(s)}~{_fmt(e)}' for s, e in zip(table.trigger_starts, table.trigger_ends)) or '없음'}")
+
+    print(f"\n현재 차시: {schedule.session_at(now, args.course)}")
+    nxt = schedule.next_trigger(now, args.course)
+    if nxt is None:
+        print("다음 캡처: 없음")
+    else:
+        wait = schedule.seconds_until_next_trigger(now, args.course)
+        print(f"다음 캡처: {nxt:%Y-%m-%d %H:%M} ({int(wait // 60)}분 후)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OBS 녹화 중 업로드 I/O 양보
+
+업로드가 녹화 드라이브를 최대 속도로 읽으면 OBS의 쓰기와 겹쳐 프레임 드롭이 생길 수 있습니다.
+OBS WebSocket으로 녹화 상태(GetRecordStatus)와 통계(GetStats)를 poll_sec마다 확인해서
+녹화 중이면 업로드를 멈추거나(pause) 속도를 낮추고(throttle), 우선순위도 낮춥니다.
+녹화가 끝나면 원래 속도로 돌아갑니다.
+
+- 연결 설정(host/port/password)은 기본으로 obs/obs_recordStart.py의 값을 그대로 사용
+- OBS가 꺼져 있거나 연결이 안 되면 녹화 중이 아닌 것으로 간주
+- throttle 중에도 녹화 출력 프레임 드롭률이 drop_pct(%)를 넘으면 녹화가 끝날 때까지 pause로 강화
+- 적용 시점: rc 모드/이어받기/다중 원격은 전송 중에도 바로, copy 모드는 다음 파일부터
+  (copy 모드에서 전송 중인 rclone은 우선순위만 낮춤)
+
+config.yaml:
+    obs_governor:
+      enabled: true
+      action: "throttle"        # pause = 녹화 중 업로드 멈춤 / throttle = 속도 제한 / priority = 우선순위만 낮춤
+      recording_limit: "2M"     # throttle 시 업로드 속도 (rclone 표기)
+      low_priority: true        # 녹화 중 업로드 프로세스/rclone 우선순위 낮춤 (Windows)
+      drop_pct: 0.5             # 녹화 프레임 드롭률(%)이 이 이상이면 pause로 강화 (0 = 사용 안 함)
+      poll_sec: 5
+      # host/port/password는 생략하면 obs/obs_recordStart.py 값 사용
+
+upload_recording.py에서 import해서 사용:
+    from obs_governor import IoGovernor
+
+오프라인 테스트용 가짜 OBS WebSocket 서버:
+    python obs_governor.py --fake-server --port 4455 --password secret --toggle-sec 30
+    python obs_governor.py --status      # 현재 녹화 상태 확인
+"""
+
+import os
+import sys
+import ast
+import json
+import time
+import base64
+import logging
+import hashlib
+import argparse
+import threading
+import socketserver
+
+from bandwidth_schedule import normalize_limit, parse_rate
+
+try:
+    import obsws_python as obs
+    OBSWS_AVAILABLE = True
+    # 연결 시 비밀번호를 INFO로, OBS가 꺼져 있으면 조회마다 예외를 ERROR로 남기므로 끔
+    logging.getLogger("obsws_python").setLevel(logging.CRITICAL)
+except ImportError:
+    OBSWS_AVAILABLE = False
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OBS_SCRIPT = os.path.join(SCRIPT_DIR, "obs", "obs_recordStart.py")
+
+FULL = "full"
+THROTTLE = "throttle"
+PAUSE = "pause"
+
+# rc 모드에서 전송 중인 파일을 pause할 때 쓰는 최소 속도 (연결이 끊기지 않을 정도)
+PAUSE_LIMIT = "1K"
+
+# Windows 우선순위
+BELOW_NORMAL_PRIORITY_CLASS = 0x00004000
+NORMAL_PRIORITY_CLASS = 0x00000020
+PROCESS_MODE_BACKGROUND_BEGIN = 0x00100000
+PROCESS_MODE_BACKGROUND_END = 0x00200000
+
+
+def load_obs_settings(script=OBS_SCRIPT):
+    """obs/obs_recordStart.py의 WEBSOCKET_HOST/PORT/PASSWORD (win32 모듈 없이 값만 읽음)"""
+    settings = {'host': "localhost", 'port': 4455, 'password': ""}
+    names = {'WEBSOCKET_HOST': 'host', 'WEBSOCKET_PORT': 'port', 'WEBSOCKET_PASSWORD': 'password'}
+    try:
+        with open(script, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError):
+        return settings
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            key = names.get(node.targets[0].id)
+            if key:
+                try:
+                    settings[key] = ast.literal_eval(node.value)
+                except ValueError:
+                    pass
+    return settings
+
+
+# ============================================
+# 우선순위 (Windows만, 다른 OS는 그대로)
+# ============================================
+def set_self_background(enabled):
+    """현재 프로세스를 백그라운드 모드로 (CPU + 디스크 I/O 우선순위 낮춤)"""
+    if os.name != 'nt':
+        return
+    import ctypes
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    mode = PROCESS_MODE_BACKGROUND_BEGIN if enabled else PROCESS_MODE_BACKGROUND_END
+    kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), mode)
+
+
+def set_child_priority(pid, low):
+    """실행 중인 자식 프로세스(rclone) 우선순위 변경"""
+    if os.name != 'nt':
+        return
+    import ctypes
+    from ctypes import wintypes
+
+    PROCESS_SET_INFORMATION = 0x0200
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    handle = kernel32.OpenProcess(PROCESS_SET_INFORMATION, False, pid)
+    if not handle:
+        return
+    try:
+        kernel32.SetPriorityClass(handle, BELOW_NORMAL_PRIORITY_CLASS if low else NORMAL_PRIORITY_CLASS)
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+# ============================================
+# OBS 상태 조회
+# ============================================
+class ObsProbe:
+    """OBS WebSocket 연결 (끊기면 다음 조회 때 다시 연결)"""
+
+    def __init__(self, host="localhost", port=4455, password="", timeout=3):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._client = None
+
+    def _connect(self):
+        if self._client is None:
+            self._client = obs.ReqClient(host=self.host, port=self.port,
+                                         password=self.password, timeout=self.timeout)
+        return self._client
+
+    def poll(self):
+        """
+        Returns:
+            {'recording', 'paused', 'skipped', 'total'} 또는 None (연결 안 됨)
+        """
+        try:
+            client = self._connect()
+            status = client.get_record_status()
+            stats = client.get_stats()
+        except Exception:
+            self.close()
+            return None
+        return {
+            'recording': bool(status.output_active),
+            'paused': bool(getattr(status, 'output_paused', False)),
+            'skipped': getattr(stats, 'output_skipped_frames', 0) or 0,
+            'total': getattr(stats, 'output_total_frames', 0) or 0,
+        }
+
+    def close(self):
+        if self._client is not None:
+            try:
+                self._client.disconnect()
+            except Exception:
+                pass
+            self._client = None
+
+
+class IoGovernor:
+    """OBS 녹화 상태에 따라 업로드 속도/우선순위 결정"""
+
+    def __init__(self, probe, action=THROTTLE, recording_limit="2M", low_priority=True,
+                 drop_pct=0.5, poll_sec=5, logger=None):
+        if action not in (PAUSE, THROTTLE, "priority"):
+            raise ValueError(f"알 수 없는 obs_governor.action: {action}")
+        self.probe = probe
+        self.action = action
+        self.recording_limit = normalize_limit(recording_limit)
+        self.low_priority = low_priority
+        self.drop_pct = drop_pct
+        self.poll_sec = poll_sec
+        self.logger = logger
+        self.level = FULL
+        self.recording = False
+        self._escalated = False
+        self._last_frames = None
+        self._children = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, config, logger=None):
+        """obs_governor.enabled가 아니거나 obsws_python이 없으면 None"""
+        cfg = config.get('obs_governor') or {}
+        if not cfg.get('enabled'):
+            return None
+        if not OBSWS_AVAILABLE:
+            if logger:
+                logger.warning("obsws_python이 없어 OBS 녹화 감지를 사용하지 않습니다 (pip install obsws-python)")
+            return None
+        conn = load_obs_settings()
+        probe = ObsProbe(
+            host=cfg.get('host', conn['host']),
+            port=cfg.get('port', conn['port']),
+            password=cfg.get('password', conn['password']),
+        )
+        return cls(
+            probe,
+            action=cfg.get('action', THROTTLE),
+            recording_limit=cfg.get('recording_limit', "2M"),
+            low_priority=cfg.get('low_priority', True),
+            drop_pct=cfg.get('drop_pct', 0.5),
+            poll_sec=cfg.get('poll_sec', 5),
+            logger=logger,
+        )
+
+    def _log(self, msg):
+        if self.logger:
+            self.logger.info(msg)
+
+    # ----------------------------------------
+    # 상태 갱신
+    # ----------------------------------------
+    def _dropping(self, status):
+        """이번 조회 구간의 녹화 프레임 드롭률이 기준 이상인지"""
+        frames = (status['skipped'], status['total'])
+        last, self._last_frames = self._last_frames, frames
+        if not self.drop_pct or last is None:
+            return False
+        total = frames[1] - last[1]
+        if total <= 0:
+            return False
+        return (frames[0] - last[0]) * 100 / total >= self.drop_pct
+
+    def update(self):
+        """OBS 상태를 한 번 조회해 단계 갱신. 현재 단계 반환"""
+        status = self.probe.poll()
+        recording = bool(status and status['recording'] and not status['paused'])
+
+        if not recording:
+            self._escalated = False
+            self._last_frames = None
+            level = FULL
+        else:
+            if self.action == THROTTLE and not self._escalated and self._dropping(status):
+                self._escalated = True
+                self._log("녹화 프레임 드롭 감지 → 녹화가 끝날 때까지 업로드 멈춤")
+            if self.action == PAUSE or self._escalated:
+                level = PAUSE
+            elif self.action == THROTTLE:
+                level = THROTTLE
+            else:
+                level = FULL
+        self._set(recording, level)
+        return level
+
+    def _set(self, recording, level):
+        with self._lock:
+            changed_rec = recording != self.recording
+            changed = changed_rec or level != self.level
+            self.recording = recording
+            self.level = level
+            children = list(self._children)
+            listeners = list(self._listeners)
+        if not changed:
+            return
+
+        if changed_rec:
+            self._log(f"OBS 녹화 {'시작' if recording else '종료'} 감지 → 업로드 "
+                      f"{self.describe() if recording else '원래 속도로'}")
+            if self.low_priority:
+                set_self_background(recording)
+                for pid in children:
+                    set_child_priority(pid, recording)
+        if level == PAUSE:
+            self._resumed.clear()
+        else:
+            self._resumed.set()
+        for listener in listeners:
+            try:
+                listener(self)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"업로드 속도 조절 적용 실패: {e}")
+
+    def describe(self):
+        if self.level == PAUSE:
+            return "멈춤"
+        if self.level == THROTTLE:
+            return f"속도 제한 {self.recording_limit}"
+        return "우선순위만 낮춤" if self.low_priority else "그대로"
+
+    def _run(self):
+        while not self._stop.wait(self.poll_sec):
+            self.update()
+
+    def start(self):
+        self.update()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.probe.timeout + 1)
+        self.probe.close()
+        self._set(False, FULL)
+
+    # ----------------------------------------
+    # 업로드 쪽에서 사용
+    # ----------------------------------------
+    def add_listener(self, fn):
+        """단계가 바뀔 때 fn(governor) 호출 (rc 대역폭 갱신 등)"""
+        with self._lock:
+            self._listeners.append(fn)
+
+    def wait(self):
+        """pause 중이면 녹화가 끝날 때까지 대기. 기다린 시간(초) 반환"""
+        if self._resumed.is_set():
+            return 0.0
+        started = time.time()
+        while not self._resumed.wait(1):
+            if self._stop.is_set():
+                break
+        return time.time() - started
+
+    def limit(self, limit):
+        """현재 단계에 맞춘 대역폭 제한 (rclone 표기)"""
+        if self.level == PAUSE:
+            return PAUSE_LIMIT
+        if self.level == THROTTLE:
+            current = parse_rate(limit)
+            capped = parse_rate(self.recording_limit)
+            if capped is not None and (current is None or capped < current):
+                return self.recording_limit
+        return normalize_limit(limit)
+
+    def rate(self, rate):
+        """현재 단계에 맞춘 bytes/s (None = 무제한). pause는 wait()로 처리"""
+        if self.level == THROTTLE:
+            capped = parse_rate(self.recording_limit)
+            if capped is not None and (rate is None or capped < rate):
+                return capped
+        return rate
+
+    def popen_kwargs(self):
+        """녹화 중 새로 띄우는 rclone 우선순위 (Windows)"""
+        if os.name == 'nt' and self.low_priority and self.recording:
+            return {'creationflags': BELOW_NORMAL_PRIORITY_CLASS}
+        return {}
+
+    def track(self, process):
+        """녹화 상태가 바뀌면 우선순위를 같이 바꿀 rclone 프로세스 등록"""
+        with self._lock:
+            self._children.add(process.pid)
+
+    def untrack(self, process):
+        with self._lock:
+            self._children.discard(process.pid)
+
+
+# ============================================
+# 가짜 OBS WebSocket 서버 (오프라인 테스트용, obs-websocket v5 일부)
+# ============================================
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class _WsHandler(socketserver.BaseRequestHandler):
+    def _recv_exact(self, n):
+        data = b""
+        while len(data) < n:
+            chunk = self.request.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("연결 종료")
+            data += chunk
+        return data
+
+    def _recv_frame(self):
+        b1, b2 = self._recv_exact(2)
+        opcode = b1 & 0x0F
+        length = b2 & 0x7F
+        if length == 126:
+            length = int.from_bytes(self._recv_exact(2), 'big')
+        elif length == 127:
+            length = int.from_bytes(self._recv_exact(8), 'big')
+        mask = self._recv_exact(4) if b2 & 0x80 else None
+        payload = self._recv_exact(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    def _send_frame(self, payload, opcode=0x1):
+        header = bytes([0x80 | opcode])
+        n = len(payload)
+        if n < 126:
+            header += bytes([n])
+        elif n < 65536:
+            header += bytes([126]) + n.to_bytes(2, 'big')
+        else:
+            header += bytes([127]) + n.to_bytes(8, 'big')
+        self.request.sendall(header + payload)
+
+    def _send(self, op, d):
+        self._send_frame(json.dumps({'op': op, 'd': d}).encode('utf-8'))
+
+    def handle(self):
+        server = self.server.fake
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        headers = {}
+        for line in request.decode('latin-1').split("\r\n")[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+        accept = base64.b64encode(
+            hashlib.sha1((headers.get('sec-websocket-key', '') + WS_GUID).encode()).digest()
+        ).decode()
+        self.request.sendall(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+
+        hello = {'obsWebSocketVersion': "5.0.0-fake", 'rpcVersion': 1}
+        salt, challenge = "fakesalt", base64.b64encode(os.urandom(12)).decode()
+        if server.password:
+            hello['authentication'] = {'challenge': challenge, 'salt': salt}
+        self._send(0, hello)
+
+        try:
+            while True:
+                opcode, payload = self._recv_frame()
+                if opcode == 0x8:
+                    self._send_frame(b"", opcode=0x8)
+                    return
+                if opcode == 0x9:
+                    self._send_frame(payload, opcode=0xA)
+                    continue
+                msg = json.loads(payload.decode('utf-8'))
+                if msg['op'] == 1:
+                    if server.password:
+                        secret = base64.b64encode(hashlib.sha256((server.password + salt).encode()).digest())
+                        expected = base64.b64encode(hashlib.sha256(secret + challenge.encode()).digest()).decode()
+                        if msg['d'].get('authentication') != expected:
+                            self._send_frame((4009).to_bytes(2, 'big') + b"Authentication failed", opcode=0x8)
+                            return
+                    self._send(2, {'negotiatedRpcVersion': 1})
+                elif msg['op'] == 6:
+                    d = msg['d']
+                    ok, data = server.handle(d['requestType'], d.get('requestData') or {})
+                    status = {'result': ok, 'code': 100 if ok else 204}
+                    self._send(7, {'requestType': d['requestType'], 'requestId': d['requestId'],
+                                   'requestStatus': status, 'responseData': data})
+        except (ConnectionError, OSError, ValueError):
+            return
+
+
+class FakeObsServer:
+    """녹화 상태만 흉내 내는 OBS WebSocket 서버"""
+
+    def __init__(self, host="localhost", port=4455, password="", recording=False,
+                 toggle_sec=0, skip_pct=0.0, fps=30):
+        self.password = password
+        self.recording = recording
+        self.toggle_sec = toggle_sec
+        self.skip_pct = skip_pct
+        self.fps = fps
+        self._since = time.time()
+        self._frames = 0.0
+        self._lock = threading.Lock()
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host, port), _WsHandler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self.addr = f"{host}:{self.server.server_address[1]}"
+
+    def _tick(self):
+        now = time.time()
+        if self.toggle_sec and now - self._since >= self.toggle_sec:
+            self.recording = not self.recording
+            self._since = now
+            print(f"[가짜 OBS] 녹화 {'시작' if self.recording else '종료'}")
+        if self.recording:
+            self._frames = (now - self._since) * self.fps
+
+    def handle(self, request_type, data):
+        with self._lock:
+            self._tick()
+            if request_type == "GetVersion":
+                return True, {'obsVersion': "fake", 'obsWebSocketVersion': "5.0.0-fake", 'rpcVersion': 1}
+            if request_type == "GetRecordStatus":
+                return True, {'outputActive': self.recording, 'outputPaused': False,
+                              'outputTimecode': "00:00:00.000", 'outputDuration': 0, 'outputBytes': 0}
+            if request_type == "GetStats":
+                total = int(self._frames)
+                return True, {'cpuUsage': 1.0, 'memoryUsage': 100.0, 'availableDiskSpace': 100000.0,
+                              'activeFps': self.fps, 'averageFrameRenderTime': 1.0,
+                              'renderSkippedFrames': 0, 'renderTotalFrames': total,
+                              'outputSkippedFrames': int(total * self.skip_pct / 100),
+                              'outputTotalFrames': total,
+                              'webSocketSessionIncomingMessages': 0, 'webSocketSessionOutgoingMessages': 0}
+            if request_type in ("StartRecord", "StopRecord"):
+                self.recording = request_type == "StartRecord"
+                self._since = time.time()
+                self._frames = 0.0
+                print(f"[가짜 OBS] 녹화 {'시작' if self.recording else '종료'}")
+                return True, {'outputPath': "fake.mkv"} if not self.recording else {}
+            return False, {}
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OBS 녹화 감지 도구")
+    parser.add_argument("--status", action="store_true", help="OBS 녹화 상태 확인")
+    parser.add_argument("--fake-server", action="store_true", help="가짜 OBS WebSocket 서버 실행 (테스트용)")
+    parser.add_argument("--port", type=int, default=None, help="포트 (기본: obs_recordStart.py 값)")
+    parser.add_argument("--password", default=None, help="비밀번호 (기본: obs_recordStart.py 값)")
+    parser.add_argument("--recording", action="store_true", help="녹화 중 상태로 시작")
+    parser.add_argument("--toggle-sec", type=float, default=0, help="N초마다 녹화 시작/종료 전환")
+    parser.add_argument("--skip-pct", type=float, default=0, help="녹화 출력 프레임 드롭률(%%)")
+    args = parser.parse_args()
+
+    conn = load_obs_settings()
+    port = args.port or conn['port']
+    password = conn['password'] if args.password is None else args.password
+
+    if args.fake_server:
+        server = FakeObsServer(conn['host'], port, password, recording=args.recording,
+                               toggle_sec=args.toggle_sec, skip_pct=args.skip_pct)
+        print(f"가짜 OBS WebSocket 서버 실행 중: ws://{server.addr} (녹화 {'중' if args.recording else '아님'})")
+        try:
+            server.server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n종료합니다.")
+            sys.exit(0)
+        return
+
+    if args.status:
+        if not OBSWS_AVAILABLE:
+            print("✗ obsws_python이 설치되지 않았습니다. pip install obsws-python")
+            sys.exit(1)
+        status = ObsProbe(conn['host'], port, password).poll()
+        if status is None:
+            print(f"✗ OBS에 연결할 수 없습니다 (ws://{conn['host']}:{port})")
+            sys.exit(1)
+        print(f"✓ 녹화 {'중' if status['recording'] else '아님'}"
+              f" (출력 프레임 {status['total']}, 드롭 {status['skipped']})")
+        return
+
+    parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+rclone 원격 제어(rc) 클라이언트
+
+상주하는 `rclone rcd` 하나에 전송 작업을 비동기 job으로 넣고 상태를 polling합니다.
+파일마다 rclone 프로세스를 새로 띄우지 않으므로 설정 파싱/SFTP 접속이 재사용됩니다.
+
+upload_recording.py에서 import해서 사용:
+    from rclone_rc import ensure_daemon
+
+오프라인 테스트용 가짜 rc 서버:
+    python rclone_rc.py --fake-server --addr 127.0.0.1:5572 --root D:\\fake_remote --user test --pass test
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import secrets
+import argparse
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+from base64 import b64encode
+
+
+class RcError(Exception):
+    """rc 호출 실패"""
+
+
+class RcClient:
+    """rclone rc HTTP API 클라이언트"""
+
+    def __init__(self, addr="127.0.0.1:5572", user=None, password=None, timeout=10):
+        if not addr.startswith("http"):
+            addr = f"http://{addr}"
+        self.base_url = addr.rstrip("/")
+        self.timeout = timeout
+        self._auth = None
+        if user:
+            token = b64encode(f"{user}:{password or ''}".encode()).decode()
+            self._auth = f"Basic {token}"
+
+    def call(self, command, **params):
+        """rc 명령 호출 → 응답 dict"""
+        req = urllib.request.Request(
+            f"{self.base_url}/{command}",
+            data=json.dumps(params).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        if self._auth:
+            req.add_header("Authorization", self._auth)
+
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read().decode("utf-8") or "{}")
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode("utf-8")).get("error", str(e))
+            except Exception:
+                message = str(e)
+            raise RcError(f"{command}: {message}") from e
+        except (urllib.error.URLError, OSError) as e:
+            raise RcError(f"{command}: rc 서버 연결 실패 ({e})") from e
+
+    def is_alive(self):
+        try:
+            self.call("rc/noop")
+            return True
+        except RcError:
+            return False
+
+    # ----------------------------------------
+    # 전송 작업
+    # ----------------------------------------
+    def copyfile_async(self, src_fs, src_remote, dst_fs, dst_remote, options=None):
+        """파일 복사 job 시작 → job id (options: 이 job에만 적용할 rclone 설정, 예: MultiThreadStreams)"""
+        params = dict(
+            srcFs=src_fs, srcRemote=src_remote,
+            dstFs=dst_fs, dstRemote=dst_remote,
+            _async=True,
+        )
+        if options:
+            params["_config"] = options
+        result = self.call("operations/copyfile", **params)
+        return result["jobid"]
+
+    def job_status(self, jobid):
+        return self.call("job/status", jobid=jobid)
+
+    def job_stop(self, jobid):
+        return self.call("job/stop", jobid=jobid)
+
+    def stats(self, group=None):
+        if group:
+            return self.call("core/stats", group=group)
+        return self.call("core/stats")
+
+    def set_bwlimit(self, rate):
+        return self.call("core/bwlimit", rate=rate)
+
+    def quit(self):
+        try:
+            self.call("core/quit")
+        except RcError:
+            pass
+
+
+LOOPBACK_HOSTS = ("localhost", "127.0.0.1", "::1", "[::1]")
+
+
+def load_credentials(rc_cfg, auth_path=None):
+    """
+    rc 인증 정보 (user, pass)
+
+    config에 user가 없으면 auth_path에 무작위 계정을 만들어 저장하고 다음 실행에서 재사용
+    (keep_alive로 남아 있는 rcd에 다시 접속하기 위해)
+    """
+    user = rc_cfg.get("user") or None
+    if user:
+        return user, rc_cfg.get("pass") or ""
+    if auth_path is None:
+        return None, None
+
+    auth_path = str(auth_path)
+    try:
+        with open(auth_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("user") and data.get("pass"):
+            return data["user"], data["pass"]
+    except (OSError, ValueError):
+        pass
+
+    data = {"user": "uploader", "pass": secrets.token_urlsafe(24)}
+    os.makedirs(os.path.dirname(auth_path) or ".", exist_ok=True)
+    fd = os.open(auth_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return data["user"], data["pass"]
+
+
+def ensure_daemon(rc_cfg, rclone_exe="rclone", auth_path=None):
+    """
+    rclone rcd에 연결 (실행 중이 아니면 시작)
+
+    rcd는 원격 계정 정보를 모두 가지고 있으므로 항상 127.0.0.1에서 인증을 걸고 실행.
+    user/pass를 비워 두면 auth_path에 무작위 계정을 만들어 사용
+
+    config.yaml:
+        rclone:
+          mode: "rc"
+          rc:
+            addr: "127.0.0.1:5572"
+            user: ""           # 빈칸 = 무작위 계정 자동 생성 (state/rclone_rc_auth.json)
+            pass: ""
+            keep_alive: true   # 업로드 종료 후에도 rcd 유지 (다음 실행에서 재사용)
+
+    Returns:
+        (RcClient, 새로 시작한 Popen 또는 None)
+    """
+    addr = rc_cfg.get("addr", "127.0.0.1:5572").replace("http://", "")
+    host = addr.rsplit(":", 1)[0]
+    if host not in LOOPBACK_HOSTS:
+        raise RcError(f"rc.addr는 127.0.0.1만 사용할 수 있습니다: {addr}")
+
+    user, password = load_credentials(rc_cfg, auth_path)
+    client = RcClient(addr, user=user, password=password)
+
+    if client.is_alive():
+        if user and RcClient(addr).is_alive():
+            raise RcError(f"{addr}에 인증 없이 실행 중인 rclone rcd가 있습니다. 종료 후 다시 실행하세요")
+        return client, None
+
+    cmd = [rclone_exe, "rcd", "--rc-addr", addr]
+    if user:
+        cmd.extend(["--rc-user", user, "--rc-pass", password])
+    else:
+        cmd.append("--rc-no-auth")
+
+    # 업로드 스크립트가 끝나도 살아있도록 분리 실행
+    kwargs = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    if os.name == "nt":
+        kwargs["creationflags"] = (
+            subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW
+        )
+    else:
+        kwargs["start_new_session"] = True
+
+    try:
+        process = subprocess.Popen(cmd, **kwargs)
+    except FileNotFoundError:
+        raise RcError("rclone이 설치되지 않았습니다. https://rclone.org/downloads/")
+
+    for _ in range(50):
+        if client.is_alive():
+            return client, process
+        if process.poll() is not None:
+            raise RcError(f"rclone rcd 시작 실패 (코드: {process.returncode})")
+        time.sleep(0.2)
+
+    process.terminate()
+    raise RcError("rclone rcd 응답 없음")
+
+
+# ============================================
+# 가짜 rc 서버 (오프라인 테스트용)
+# ============================================
+class FakeRcServer:
+    """
+    rclone rcd 흉내: 원격 "remote:path"를 root 아래 로컬 폴더로 매핑해 복사
+
+    지원 명령: rc/noop, operations/copyfile(_async), operations/list, job/status,
+               job/stop, core/stats, core/bwlimit, core/quit
+    user가 있으면 rcd처럼 Basic 인증을 요구
+    """
+
+    def __init__(self, root, host="127.0.0.1", port=5572, chunk_delay=0.0, user=None, password=None):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        self.root = root
+        self.chunk_delay = chunk_delay
+        self.jobs = {}
+        self.bwlimit = "off"
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._auth = None
+        if user:
+            self._auth = "Basic " + b64encode(f"{user}:{password or ''}".encode()).decode()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                params = json.loads(self.rfile.read(length) or b"{}")
+                try:
+                    if server._auth and self.headers.get("Authorization") != server._auth:
+                        status, body = 401, {"error": "authentication required"}
+                    else:
+                        status, body = 200, server.handle(self.path.strip("/"), params)
+                except KeyError as e:
+                    status, body = 404, {"error": f"not found: {e}"}
+                except Exception as e:
+                    status, body = 500, {"error": str(e)}
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.addr = f"{host}:{self.httpd.server_address[1]}"
+
+    def local_path(self, fs, remote=""):
+        """'remote:path' → root 아래 로컬 경로 (로컬 경로는 그대로)"""
+        if ":" in fs and not os.path.isabs(fs):
+            fs = os.path.join(self.root, fs.split(":", 1)[1].lstrip("/\\"))
+        return os.path.join(fs, remote) if remote else fs
+
+    def _copy(self, job, src, dst):
+        try:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            total = os.path.getsize(src)
+            job["stats"]["totalBytes"] = total
+            start = time.time()
+            with open(src, "rb") as fin, open(dst, "wb") as fout:
+                while not job["stop"]:
+                    chunk = fin.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    fout.write(chunk)
+                    job["stats"]["bytes"] += len(chunk)
+                    elapsed = max(time.time() - start, 1e-6)
+                    job["stats"]["speed"] = job["stats"]["bytes"] / elapsed
+                    if self.chunk_delay:
+                        time.sleep(self.chunk_delay)
+            if job["stop"]:
+                raise RuntimeError("job stopped")
+            shutil.copystat(src, dst)
+            job["success"] = True
+        except Exception as e:
+            job["error"] = str(e)
+        finally:
+            job["finished"] = True
+            job["duration"] = time.time() - job["start"]
+
+    def _list(self, folder, opt, filter_opt=None):
+        """operations/list 흉내 (Name, Size, Hashes, _filter의 FilesFromRaw 지원)"""
+        import hashlib
+        import zlib
+
+        items = []
+        if not os.path.isdir(folder):
+            return items
+        names = sorted(os.listdir(folder))
+        files_from = (filter_opt or {}).get("FilesFromRaw")
+        if files_from:
+            wanted = set()
+            for list_file in files_from:
+                with open(list_file, "r", encoding="utf-8") as f:
+                    wanted.update(line.rstrip("\n") for line in f if line.strip())
+            names = [name for name in names if name in wanted]
+        for name in names:
+            path = os.path.join(folder, name)
+            if not os.path.isfile(path):
+                continue
+            item = {"Path": name, "Name": name, "Size": os.path.getsize(path), "IsDir": False}
+            if opt.get("showHash"):
+                hashes = {}
+                for algo in opt.get("hashTypes") or ["md5"]:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                    if algo == "crc32":
+                        hashes[algo] = f"{zlib.crc32(data) & 0xFFFFFFFF:08x}"
+                    else:
+                        hashes[algo] = hashlib.new(algo, data).hexdigest()
+                item["Hashes"] = hashes
+            items.append(item)
+        return items
+
+    def handle(self, command, params):
+        if command == "rc/noop":
+            return params
+        if command == "core/bwlimit":
+            if "rate" in params:
+                self.bwlimit = params["rate"]
+            return {"rate": self.bwlimit}
+        if command == "core/quit":
+            threading.Thread(target=self.httpd.shutdown, daemon=True).start()
+            return {}
+        if command == "operations/copyfile":
+            src = self.local_path(params["srcFs"], params["srcRemote"])
+            dst = self.local_path(params["dstFs"], params["dstRemote"])
+            with self._lock:
+                jobid = self._next_id
+                self._next_id += 1
+            job = {
+                "id": jobid, "finished": False, "success": False, "error": "",
+                "start": time.time(), "duration": 0, "stop": False,
+                "stats": {"bytes": 0, "totalBytes": 0, "speed": 0, "errors": 0},
+            }
+            self.jobs[jobid] = job
+            if params.get("_async"):
+                threading.Thread(target=self._copy, args=(job, src, dst), daemon=True).start()
+                return {"jobid": jobid}
+            self._copy(job, src, dst)
+            if job["error"]:
+                raise RuntimeError(job["error"])
+            return {}
+        if command == "operations/list":
+            return {"list": self._list(self.local_path(params["fs"], params.get("remote", "")),
+                                       params.get("opt") or {}, params.get("_filter"))}
+        if command == "job/status":
+            job = self.jobs[params["jobid"]]
+            return {k: job[k] for k in ("id", "finished", "success", "error", "duration")}
+        if command == "job/stop":
+            self.jobs[params["jobid"]]["stop"] = True
+            return {}
+        if command == "core/stats":
+            group = params.get("group", "")
+            if group.startswith("job/"):
+                stats = dict(self.jobs[int(group[4:])]["stats"])
+            else:
+                stats = {"bytes": sum(j["stats"]["bytes"] for j in self.jobs.values())}
+            total, done = stats.get("totalBytes", 0), stats.get("bytes", 0)
+            speed = stats.get("speed", 0)
+            stats["eta"] = int((total - done) / speed) if speed and total else None
+            return stats
+        raise KeyError(command)
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rclone rc 도구")
+    parser.add_argument("--fake-server", action="store_true", help="가짜 rc 서버 실행 (테스트용)")
+    parser.add_argument("--addr", default="127.0.0.1:5572", help="서버 주소 (host:port)")
+    parser.add_argument("--user", default=None, help="인증 사용자 (config의 rc.user/pass와 같게)")
+    parser.add_argument("--pass", dest="password", default=None, help="인증 비밀번호")
+    parser.add_argument("--root", default="fake_remote", help="가짜 원격 저장 폴더")
+    parser.add_argument("--delay", type=float, default=0.0, help="1MB마다 지연(초)")
+    args = parser.parse_args()
+
+    if not args.fake_server:
+        parser.print_help()
+        return
+
+    host, port = args.addr.rsplit(":", 1)
+    server = FakeRcServer(args.root, host=host, port=int(port), chunk_delay=args.delay,
+                          user=args.user, password=args.password)
+    print(f"가짜 rc 서버 실행 중: http://{server.addr} (root: {args.root})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n종료합니다.")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
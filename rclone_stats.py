@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+rclone 전송 통계 파싱
+
+rclone의 JSON 로그(--use-json-log)와 rc core/stats 응답은 같은 stats 구조를 사용합니다.
+사람이 읽는 진행률 문자열 대신 이 구조를 TransferStats로 변환해 사용합니다.
+
+upload_recording.py에서 import해서 사용:
+    from rclone_stats import TransferStats, parse_log_line, ThroughputLog
+"""
+
+import json
+import threading
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+
+
+@dataclass
+class TransferStats:
+    """전송 통계 1건 (rclone stats 구조)"""
+    bytes: int = 0               # 전송된 바이트
+    total_bytes: int = 0         # 전체 바이트
+    speed: float = 0.0           # 평균 속도 (bytes/s)
+    eta: int = None              # 남은 시간(초), 모르면 None
+    elapsed: float = 0.0         # 경과 시간(초)
+    errors: int = 0              # 오류 수
+    retries: int = 0             # 재시도 수 (로그의 "Attempt n/m failed")
+    checks: int = 0              # 검사 완료 수
+    total_checks: int = 0
+    transfers: int = 0           # 전송 완료 수
+    total_transfers: int = 0
+    last_error: str = ""
+    transferring: list = field(default_factory=list)  # 진행 중 파일별 {name, bytes, size, speed}
+
+    @property
+    def percent(self):
+        if not self.total_bytes:
+            return 0
+        return min(100, int(self.bytes * 100 / self.total_bytes))
+
+    @classmethod
+    def from_rclone(cls, stats, retries=0):
+        """rclone stats dict → TransferStats"""
+        return cls(
+            bytes=int(stats.get('bytes') or 0),
+            total_bytes=int(stats.get('totalBytes') or 0),
+            speed=float(stats.get('speed') or 0),
+            eta=stats.get('eta'),
+            elapsed=float(stats.get('elapsedTime') or 0),
+            errors=int(stats.get('errors') or 0),
+            retries=retries,
+            checks=int(stats.get('checks') or 0),
+            total_checks=int(stats.get('totalChecks') or 0),
+            transfers=int(stats.get('transfers') or 0),
+            total_transfers=int(stats.get('totalTransfers') or 0),
+            last_error=stats.get('lastError') or "",
+            transferring=[
+                {
+                    'name': t.get('name', ''),
+                    'bytes': int(t.get('bytes') or 0),
+                    'size': int(t.get('size') or 0),
+                    'speed': float(t.get('speed') or 0),
+                }
+                for t in (stats.get('transferring') or [])
+            ],
+        )
+
+
+def parse_log_line(line):
+    """
+    rclone JSON 로그 한 줄 파싱
+
+    Returns:
+        (dict 로그 레코드 또는 None, stats dict 또는 None)
+    """
+    line = line.strip()
+    if not line.startswith('{'):
+        return None, None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None, None
+    return record, record.get('stats')
+
+
+def is_retry_message(record):
+    """재시도 로그인지 ("Attempt 1/3 failed with ...")"""
+    msg = record.get('msg', '') if record else ''
+    return msg.startswith('Attempt ') and ' failed' in msg
+
+
+class ThroughputLog:
+    """파일별 전송 결과 기록 (logs/throughput_YYYYMMDD.jsonl, 한 줄에 JSON 하나)"""
+
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+
+    def record(self, file_info, stats, success, mode, remote=""):
+        entry = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'file': file_info['name'],
+            'size': file_info['size'],
+            'success': success,
+            'mode': mode,
+            'remote': remote,
+            'avg_speed': round(stats.bytes / stats.elapsed, 1) if stats.elapsed else 0,
+        }
+        entry.update({k: v for k, v in asdict(stats).items() if k != 'transferring'})
+
+        path = self.log_dir / f"throughput_{datetime.now().strftime('%Y%m%d')}.jsonl"
+        with self._lock:
+            self.log_dir.mkdir(exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return entry
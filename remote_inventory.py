@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+원격 파일 목록 캐시
+
+업로드 폴더를 정리했거나 PC를 다시 설치해 장부가 비어 있어도, 서버에 이미 있는 녹화를
+다시 보내지 않도록 원격 목록(rclone lsjson)과 이름+크기(+해시)로 비교합니다.
+
+- 목록은 state/remote_inventory.json에 저장하고 ttl_min 동안은 다시 조회하지 않음
+- TTL이 지나면 마지막 조회 이후 바뀐 파일만 조회 (--max-age), full_refresh_hours마다 전체 조회
+- 이번 실행에서 업로드한 파일은 조회 없이 목록에 바로 추가
+- 증분 조회는 원격에서 지운 파일을 알 수 없으므로, 업로드된 것으로 기록(archive)하기 전에
+  일치한 파일만 다시 조회해 확인
+
+config.yaml:
+    inventory:
+      enabled: true
+      on_match: "archive"       # archive = 업로드된 것으로 기록하고 이동 / skip = 건너뛰기만
+      ttl_min: 60
+      full_refresh_hours: 24
+      hash: false               # 원격 해시도 조회해 비교 (verify.hash 알고리즘, SFTP는 느릴 수 있음)
+
+upload_recording.py에서 import해서 사용:
+    from remote_inventory import RemoteInventory
+"""
+
+import os
+import json
+import time
+import threading
+import subprocess
+
+# 증분 조회 시 시계 오차/조회 시간 여유
+MAX_AGE_MARGIN_SEC = 600
+
+
+def list_all(remote_dir, hash_type=None, rc_client=None, max_age_sec=None):
+    """
+    원격 폴더 전체(또는 max_age_sec 이내에 바뀐 파일) 목록
+
+    Returns:
+        {파일명: {'size': 크기, 'hashes': {알고리즘: digest}}}
+    """
+    if rc_client is not None:
+        opt = {'filesOnly': True, 'noMimeType': True}
+        if hash_type:
+            opt.update({'showHash': True, 'hashTypes': [hash_type]})
+        params = {'fs': remote_dir.rstrip('/'), 'remote': '', 'opt': opt}
+        if max_age_sec:
+            params['_filter'] = {'MaxAge': f"{int(max_age_sec)}s"}
+        items = rc_client.call('operations/list', **params).get('list') or []
+    else:
+        cmd = ['rclone', 'lsjson', remote_dir, '--files-only', '--no-mimetype']
+        if hash_type:
+            cmd.extend(['--hash', '--hash-type', hash_type])
+        if max_age_sec:
+            cmd.extend(['--max-age', f"{int(max_age_sec)}s"])
+        proc = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
+        if proc.returncode == 3:
+            # 원격 폴더가 아직 없음 (첫 업로드 전)
+            return {}
+        if proc.returncode != 0:
+            raise RuntimeError(f"rclone lsjson 오류 (코드: {proc.returncode}): {proc.stderr.strip()[-200:]}")
+        items = json.loads(proc.stdout or '[]')
+
+    return {
+        item['Name']: {
+            'size': item.get('Size'),
+            'hashes': {k.lower(): v.lower() for k, v in (item.get('Hashes') or {}).items() if v},
+        }
+        for item in items if not item.get('IsDir')
+    }
+
+
+class RemoteInventory:
+    """원격 목록 캐시 (스레드 안전)"""
+
+    def __init__(self, cache_path, remote_dir, ttl_sec=3600, full_refresh_sec=86400,
+                 hash_type=None, rc_client=None, logger=None):
+        self.cache_path = str(cache_path)
+        self.remote_dir = remote_dir
+        self.ttl_sec = ttl_sec
+        self.full_refresh_sec = full_refresh_sec
+        self.hash_type = hash_type
+        self.rc_client = rc_client
+        self.logger = logger
+        self.files = {}
+        self.fetched_at = 0
+        self.full_at = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _log(self, msg):
+        if self.logger:
+            self.logger.info(msg)
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # 원격 경로/해시 설정이 바뀌었으면 캐시 사용 안 함
+        if data.get('remote') != self.remote_dir or data.get('hash_type') != self.hash_type:
+            return
+        self.files = data.get('files') or {}
+        self.fetched_at = data.get('fetched_at', 0)
+        self.full_at = data.get('full_at', 0)
+
+    def save(self):
+        with self._lock:
+            data = {
+                'remote': self.remote_dir,
+                'hash_type': self.hash_type,
+                'fetched_at': self.fetched_at,
+                'full_at': self.full_at,
+                'files': self.files,
+            }
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp = self.cache_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, self.cache_path)
+
+    def refresh(self, force_full=False):
+        """TTL이 지났으면 원격 목록 갱신 (가능하면 바뀐 파일만)"""
+        now = time.time()
+        with self._lock:
+            if not force_full and now - self.fetched_at < self.ttl_sec:
+                return
+            full = force_full or not self.full_at or now - self.full_at >= self.full_refresh_sec
+
+        if full:
+            listing = list_all(self.remote_dir, self.hash_type, self.rc_client)
+            with self._lock:
+                self.files = listing
+                self.full_at = now
+            self._log(f"원격 목록 전체 조회: {len(listing)}개")
+        else:
+            max_age = now - self.fetched_at + MAX_AGE_MARGIN_SEC
+            listing = list_all(self.remote_dir, self.hash_type, self.rc_client, max_age_sec=max_age)
+            with self._lock:
+                self.files.update(listing)
+            self._log(f"원격 목록 증분 조회: 바뀐 파일 {len(listing)}개")
+
+        with self._lock:
+            self.fetched_at = now
+        self.save()
+
+    def recheck(self, names):
+        """
+        지정한 파일만 원격에서 다시 조회해 목록 갱신 (증분 조회로는 원격에서 지운 파일을 알 수 없으므로
+        업로드된 것으로 기록하기 전에 확인). 원격에 없으면 목록에서 제거
+        """
+        from upload_verify import list_remote
+
+        if not names:
+            return
+        listing = list_remote(self.remote_dir, list(names), self.hash_type, self.rc_client)
+        with self._lock:
+            for name in names:
+                if name in listing:
+                    self.files[name] = listing[name]
+                else:
+                    self.files.pop(name, None)
+        removed = [name for name in names if name not in listing]
+        if removed:
+            self._log(f"원격에서 지워진 파일 {len(removed)}개를 목록에서 제거")
+        self.save()
+
+    def get(self, name):
+        with self._lock:
+            return self.files.get(name)
+
+    def add(self, file_info, digests=None):
+        """업로드한 파일을 목록에 추가 (다시 조회하지 않도록)"""
+        hashes = {}
+        if digests and self.hash_type and self.hash_type in digests:
+            hashes[self.hash_type] = digests[self.hash_type]
+        with self._lock:
+            self.files[file_info['name']] = {'size': file_info['size'], 'hashes': hashes}
+
+    def match(self, file_info, digests=None):
+        """
+        로컬 파일이 원격에 이미 있는지
+
+        Returns:
+            (일치 여부, 사유)
+        """
+        remote = self.get(file_info['name'])
+        if remote is None:
+            return False, "원격에 없음"
+        if remote['size'] != file_info['size']:
+            return False, f"크기 다름 (원격 {remote['size']})"
+        remote_hash = remote['hashes'].get(self.hash_type) if self.hash_type else None
+        local_hash = (digests or {}).get(self.hash_type) if self.hash_type else None
+        if remote_hash and local_hash:
+            if remote_hash != local_hash:
+                return False, f"{self.hash_type} 다름"
+            return True, f"이름+크기+{self.hash_type} 일치"
+        return True, "이름+크기 일치"
@@ -0,0 +1,14 @@
+"""
+pytest 공통 설정
+
+스크립트들이 패키지가 아니라 폴더에서 바로 실행되는 구조라
+저장소 루트와 capture/ 폴더를 import 경로에 추가합니다.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for folder in (ROOT, ROOT / "capture"):
+    if str(folder) not in sys.path:
+        sys.path.insert(0, str(folder))
@@ -0,0 +1,54 @@
+"""시간대별 대역폭 제한"""
+
+from datetime import datetime
+
+import pytest
+
+from bandwidth_schedule import (
+    parse_rate, parse_schedule, limit_at, current_limit, to_rclone_timetable, lower_limit,
+)
+
+CLASS_HOURS = [
+    {'days': ['mon', 'tue', 'wed', 'thu', 'fri'], 'start': '09:00', 'end': '12:50', 'limit': '5M'},
+    {'days': ['월'], 'start': '13:50', 'end': '17:50', 'limit': '2M'},
+]
+
+
+def test_parse_rate():
+    assert parse_rate("0") is None
+    assert parse_rate("off") is None
+    assert parse_rate("5M") == 5 * 1024 ** 2
+    assert parse_rate("512") == 512 * 1024      # 단위 없으면 KiB/s
+    assert parse_rate("10M:1M") == 10 * 1024 ** 2
+    with pytest.raises(ValueError):
+        parse_rate("fast")
+
+
+def test_limit_at():
+    rules = parse_schedule(CLASS_HOURS)
+    assert limit_at(rules, "0", 0, 9 * 60) == "5M"
+    assert limit_at(rules, "0", 0, 12 * 60 + 50) == "off"    # 끝 시각은 포함하지 않음
+    assert limit_at(rules, "0", 0, 14 * 60) == "2M"
+    assert limit_at(rules, "0", 1, 14 * 60) == "off"
+    assert limit_at(rules, "20M", 5, 10 * 60) == "20M"       # 토요일은 기본값
+    assert current_limit(rules, "0", datetime(2026, 10, 19, 10, 0)) == "5M"
+
+
+def test_parse_schedule_rejects_reversed_range():
+    with pytest.raises(ValueError):
+        parse_schedule([{'start': '12:00', 'end': '09:00', 'limit': '1M'}])
+
+
+def test_to_rclone_timetable():
+    assert to_rclone_timetable([], "0") == "off"
+    rules = parse_schedule(CLASS_HOURS)
+    table = to_rclone_timetable(rules, "0").split()
+    assert table[:5] == ["Mon-00:00,off", "Mon-09:00,5M", "Mon-12:50,off", "Mon-13:50,2M", "Mon-17:50,off"]
+    assert table[-2:] == ["Fri-09:00,5M", "Fri-12:50,off"]
+
+
+def test_lower_limit():
+    assert lower_limit("off", "5M") == "5M"
+    assert lower_limit("2M", "5M") == "2M"
+    assert lower_limit("10M", "512K") == "512K"
+    assert lower_limit("0", "off") == "off"
@@ -0,0 +1,74 @@
+"""캡처 작업 보드 (single-flight, max_age, 이벤트 순번) + 요청 검증"""
+
+import pytest
+
+flask_server = pytest.importorskip("flask_server")
+JobBoard = flask_server.JobBoard
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(flask_server.time, "time", lambda: now[0])
+    return now
+
+
+def test_concurrent_requests_join_the_active_job(clock):
+    board = JobBoard()
+    job, created = board.create()
+    assert created and job["state"] == "queued"
+    same, created = board.create()
+    assert same is job and not created
+
+    board.publish(job, "grab")
+    assert board.get(job["id"])["state"] == "running"
+    board.publish(job, "done", {"ok": True, "image_path": "a.jpg"})
+
+    status = board.get(job["id"])
+    assert status["state"] == "done" and status["result"]["ok"]
+    assert [p["phase"] for p in status["phases"]] == ["queued", "grab", "done"]
+    # 끝난 뒤에는 새 작업
+    assert board.create()[1]
+
+
+def test_max_age_reuses_recent_success(clock):
+    board = JobBoard()
+    job, _ = board.create()
+    board.publish(job, "done", {"ok": True})
+
+    clock[0] += 30
+    assert board.create(max_age=60) == (job, False)
+    clock[0] += 31
+    fresh, created = board.create(max_age=60)
+    assert created and fresh is not job
+
+
+def test_max_age_ignores_failures(clock):
+    board = JobBoard()
+    job, _ = board.create()
+    board.publish(job, "failed", {"ok": False, "message": "capture timeout"})
+    assert board.create(max_age=60)[1]
+
+
+def test_events_and_pruning(clock):
+    board = JobBoard(max_jobs=2)
+    ids = []
+    for _ in range(3):
+        job, _ = board.create()
+        ids.append(job["id"])
+        board.publish(job, "done", {"ok": True})
+    assert board.get(ids[0]) is None and board.get(ids[2]) is not None
+
+    events = board.wait_events(0, timeout=0)
+    assert [e["seq"] for e in events] == list(range(1, 7))
+    assert events[-1] == {"seq": 6, "job_id": ids[2], "phase": "done", "state": "done",
+                          "result": {"ok": True}}
+    assert board.wait_events(6, timeout=0) == []
+
+
+def test_malformed_query_values_return_400():
+    client = flask_server.app.test_client()
+    assert client.post("/capture?max_age=soon").status_code == 400
+    assert client.get("/events?after=abc").status_code == 400
+    assert client.get("/events", headers={"Last-Event-ID": "x"}).status_code == 400
+    assert client.get("/jobs/missing").status_code == 404
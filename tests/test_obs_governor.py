@@ -0,0 +1,86 @@
+"""OBS 녹화 상태에 따른 업로드 조절 단계 (가짜 probe 사용)"""
+
+import pytest
+
+from obs_governor import IoGovernor, FULL, THROTTLE, PAUSE, PAUSE_LIMIT
+
+
+class FakeProbe:
+    timeout = 1
+
+    def __init__(self):
+        self.status = None
+
+    def set(self, recording, skipped=0, total=0, paused=False):
+        self.status = {'recording': recording, 'paused': paused, 'skipped': skipped, 'total': total}
+
+    def poll(self):
+        return self.status
+
+    def close(self):
+        pass
+
+
+def make(action=THROTTLE, **kwargs):
+    probe = FakeProbe()
+    return probe, IoGovernor(probe, action=action, recording_limit="2M", low_priority=False, **kwargs)
+
+
+def test_throttle_while_recording():
+    probe, governor = make()
+    assert governor.update() == FULL            # OBS 꺼짐 (조회 실패)
+    assert governor.limit("10M") == "10M"
+
+    probe.set(True)
+    assert governor.update() == THROTTLE
+    assert governor.limit("10M") == "2M"
+    assert governor.limit("1M") == "1M"          # 이미 더 낮으면 그대로
+    assert governor.limit("off") == "2M"
+    assert governor.rate(None) == 2 * 1024 ** 2
+    assert governor.wait() == 0.0
+
+    probe.set(True, paused=True)                 # 녹화 일시정지는 녹화 중이 아님
+    assert governor.update() == FULL
+
+
+def test_pause_action():
+    probe, governor = make(action=PAUSE)
+    probe.set(True)
+    assert governor.update() == PAUSE
+    assert governor.limit("10M") == PAUSE_LIMIT
+    probe.set(False)
+    assert governor.update() == FULL
+    assert governor.wait() == 0.0
+
+
+def test_frame_drops_escalate_until_recording_ends():
+    probe, governor = make(drop_pct=0.5)
+    probe.set(True, skipped=0, total=1000)
+    assert governor.update() == THROTTLE
+    probe.set(True, skipped=1, total=2000)       # 0.1% 드롭
+    assert governor.update() == THROTTLE
+    probe.set(True, skipped=11, total=3000)      # 1% 드롭 → 멈춤
+    assert governor.update() == PAUSE
+    probe.set(True, skipped=11, total=4000)      # 드롭이 멈춰도 녹화 중에는 유지
+    assert governor.update() == PAUSE
+    probe.set(False)
+    assert governor.update() == FULL
+    probe.set(True, skipped=0, total=100)
+    assert governor.update() == THROTTLE
+
+
+def test_listeners_called_on_change():
+    probe, governor = make()
+    seen = []
+    governor.add_listener(lambda g: seen.append(g.level))
+    probe.set(True)
+    governor.update()
+    governor.update()
+    probe.set(False)
+    governor.update()
+    assert seen == [THROTTLE, FULL]
+
+
+def test_unknown_action():
+    with pytest.raises(ValueError):
+        IoGovernor(FakeProbe(), action="stop")
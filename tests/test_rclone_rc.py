@@ -0,0 +1,82 @@
+"""rc 클라이언트 + 가짜 rc 서버 (인증, 비동기 복사, 목록 필터), rcd 연결 조건"""
+
+import os
+import stat
+import time
+
+import pytest
+
+from rclone_rc import RcClient, RcError, FakeRcServer, ensure_daemon, load_credentials
+
+
+@pytest.fixture
+def server(tmp_path):
+    fake = FakeRcServer(str(tmp_path / "remote"), port=0, user="uploader", password="secret").start()
+    yield fake
+    fake.stop()
+
+
+def wait_job(client, jobid, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.job_status(jobid)
+        if status["finished"]:
+            return status
+        time.sleep(0.05)
+    raise AssertionError("job이 끝나지 않음")
+
+
+def test_auth_required(server):
+    with pytest.raises(RcError):
+        RcClient(server.addr).call("rc/noop")
+    assert not RcClient(server.addr, user="uploader", password="wrong").is_alive()
+    assert RcClient(server.addr, user="uploader", password="secret").is_alive()
+
+
+def test_async_copy_and_filtered_list(server, tmp_path):
+    client = RcClient(server.addr, user="uploader", password="secret")
+    src = tmp_path / "rec"
+    src.mkdir()
+    for name in ("a.mp4", "b.mp4"):
+        (src / name).write_bytes(name.encode() * 1000)
+        jobid = client.copyfile_async(str(src), name, "est:/r", name)
+        assert wait_job(client, jobid)["success"]
+    assert client.stats(group=f"job/{jobid}")["bytes"] == 5000
+
+    names = tmp_path / "names.txt"
+    names.write_text("b.mp4\n", encoding="utf-8")
+    result = client.call("operations/list", fs="est:/r", remote="",
+                         opt={"showHash": True, "hashTypes": ["md5"]}, _filter={"FilesFromRaw": [str(names)]})
+    assert [item["Name"] for item in result["list"]] == ["b.mp4"]
+    assert len(result["list"][0]["Hashes"]["md5"]) == 32
+
+
+def test_generated_credentials_are_private_and_reused(tmp_path):
+    auth_path = tmp_path / "state" / "rclone_rc_auth.json"
+    user, password = load_credentials({}, auth_path)
+    assert user == "uploader" and len(password) >= 24
+    assert load_credentials({}, auth_path) == (user, password)
+    if os.name != "nt":
+        assert stat.S_IMODE(os.stat(auth_path).st_mode) == 0o600
+    assert load_credentials({"user": "me", "pass": "pw"}, auth_path) == ("me", "pw")
+
+
+def test_ensure_daemon_only_on_loopback():
+    with pytest.raises(RcError):
+        ensure_daemon({"addr": "0.0.0.0:5572"}, rclone_exe="rclone-not-installed")
+
+
+def test_ensure_daemon_reuses_authenticated_server(server):
+    client, process = ensure_daemon({"addr": server.addr, "user": "uploader", "pass": "secret"},
+                                    rclone_exe="rclone-not-installed")
+    assert process is None and client.is_alive()
+
+
+def test_ensure_daemon_rejects_unauthenticated_server(tmp_path):
+    open_server = FakeRcServer(str(tmp_path), port=0).start()
+    try:
+        with pytest.raises(RcError):
+            ensure_daemon({"addr": open_server.addr}, rclone_exe="rclone-not-installed",
+                          auth_path=tmp_path / "auth.json")
+    finally:
+        open_server.stop()
@@ -0,0 +1,119 @@
+"""수업 시간표 엔진 (차시/캡처 시각 조회, 요일별 변경, 휴일, 날짜별 코스)"""
+
+from datetime import datetime
+
+import pytest
+
+from session_schedule import SessionSchedule, load_schedule, EXAMPLE_PATH
+
+MON = datetime(2026, 10, 19)   # 월요일
+
+
+def at(day, hhmm):
+    h, m = map(int, hhmm.split(":"))
+    return day.replace(hour=h, minute=m)
+
+
+@pytest.fixture
+def data():
+    return {
+        'default_course': "main",
+        'courses': {
+            'main': {
+                'outside': "끝",
+                'periods': [["09:00", "10:00", "1차시"], ["10:00", "10:50", "2차시"]],
+                'trigger_window_min': 3,
+                'triggers': ["09:09", "09:59"],
+                'weekdays': {
+                    'mon': {'extra_triggers': ["10:49"]},
+                    'sat': {'periods': [["10:00", "12:00", "특강"]], 'triggers': ["10:30"]},
+                },
+            },
+            'short': {
+                'outside': None,
+                'periods': [["09:00", "09:40", "1차시"]],
+                'triggers': ["09:30"],
+            },
+        },
+        'calendar': {
+            'holidays': ["2026-10-20"],
+            'overrides': {"2026-10-21": "short"},
+        },
+    }
+
+
+def test_session_lookup(data):
+    schedule = SessionSchedule(data)
+    assert schedule.session_at(at(MON, "09:00")) == "1차시"
+    assert schedule.session_at(at(MON, "10:05")) == "2차시"
+    assert schedule.session_at(at(MON, "10:50")) == "끝"      # 끝 시각은 포함 안 함
+    assert schedule.session_at(at(MON, "08:00")) == "끝"
+    assert schedule.session_at(at(MON, "09:45"), "short") is None
+
+
+def test_trigger_window_and_weekday_changes(data):
+    schedule = SessionSchedule(data)
+    assert schedule.is_trigger(at(MON, "09:09"))
+    assert schedule.is_trigger(at(MON, "09:11"))
+    assert not schedule.is_trigger(at(MON, "09:12"))
+    assert schedule.is_trigger(at(MON, "10:49"))                # 월요일 extra_triggers
+    thu = MON.replace(day=22)
+    assert not schedule.is_trigger(at(thu, "10:49"))
+    sat = MON.replace(day=24)
+    assert schedule.session_at(at(sat, "11:00")) == "특강"        # 요일별 periods 대체
+    assert not schedule.is_trigger(at(sat, "09:09"))
+    assert schedule.is_trigger(at(sat, "10:30"))
+
+
+def test_holiday_has_no_sessions(data):
+    schedule = SessionSchedule(data)
+    tue = MON.replace(day=20)
+    assert schedule.session_at(at(tue, "09:30")) is None
+    assert not schedule.is_trigger(at(tue, "09:09"))
+
+
+def test_override_applies_to_default_course_only(data):
+    schedule = SessionSchedule(data)
+    wed = MON.replace(day=21)
+    assert schedule.course_for(wed.date()) == "short"
+    assert schedule.course_for(wed.date(), "main") == "short"   # 기본 코스 이름으로 조회해도 적용
+    assert schedule.session_at(at(wed, "09:50")) is None
+    assert schedule.is_trigger(at(wed, "09:30"))
+    assert schedule.course_for(MON.date()) == "main"
+
+
+def test_next_trigger_skips_holiday(data):
+    schedule = SessionSchedule(data)
+    assert schedule.next_trigger(at(MON, "09:09")) == at(MON, "09:59")
+    # 월요일 마지막 캡처 이후 → 화요일은 휴일, 수요일은 short 코스
+    assert schedule.next_trigger(at(MON, "11:00")) == at(MON.replace(day=21), "09:30")
+    assert schedule.seconds_until_next_trigger(at(MON, "09:00")) == 9 * 60
+
+
+def test_unknown_course_is_rejected(data):
+    schedule = SessionSchedule(data)
+    with pytest.raises(ValueError):
+        schedule.session_at(at(MON, "09:00"), "default")
+    data['calendar']['overrides'] = {"2026-10-21": "missing"}
+    with pytest.raises(ValueError):
+        SessionSchedule(data)
+
+
+def test_overlapping_periods_are_rejected(data):
+    data['courses']['main']['periods'].append(["09:30", "09:40", "겹침"])
+    with pytest.raises(ValueError):
+        SessionSchedule(data).session_at(at(MON, "09:00"))
+
+
+def test_example_schedule_loads():
+    schedule = load_schedule(EXAMPLE_PATH)
+    assert set(schedule.courses) == {"default", "7"}
+    assert schedule.session_at(at(MON, "16:00"), "7") == "7차시"
+
+
+def test_estcapture_uses_default_course(data, monkeypatch):
+    pytest.importorskip("PIL")
+    import estcapture
+    monkeypatch.setattr(estcapture, "_schedule", SessionSchedule(data))
+    assert estcapture.get_belonging_session(at(MON, "10:05")) == "2차시"
+    assert estcapture.is_capture_time(at(MON.replace(day=21), "09:30"))
@@ -0,0 +1,87 @@
+"""동시 업로드 수 AIMD 조절"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import upload_concurrency
+from upload_concurrency import AimdController, HOLD_WINDOWS
+from upload_retry import classify_failure
+
+MB = 1024 * 1024
+FILE = {'path': "/rec/a.mp4"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(upload_concurrency.time, "time", lambda: now[0])
+    return now
+
+
+def step(controller, clock, sent_mb, active, waiting=0):
+    """interval_sec 한 구간을 진행하고 그 구간에 sent_mb를 보낸 것으로 관측"""
+    controller.active, controller.waiting = active, waiting
+    clock[0] += controller.interval_sec
+    total = controller._last_bytes.get(FILE['path'], 0) + sent_mb * MB
+    controller.observe(FILE, SimpleNamespace(bytes=total))
+    return controller.limit
+
+
+def reasons(controller):
+    return [entry[-1] for entry in controller.history]
+
+
+def test_additive_increase_then_revert_and_hold(clock):
+    c = AimdController(min_jobs=1, max_jobs=4, start=2, interval_sec=10)
+    # 모든 자리가 사용 중 + 대기 파일 있음 → 1 증가
+    assert step(c, clock, 100, active=2, waiting=1) == 3
+    # 늘렸는데 처리량이 그대로 → 되돌림
+    assert step(c, clock, 100, active=3, waiting=1) == 2
+    # 되돌린 직후 HOLD_WINDOWS 동안은 다시 늘리지 않음
+    for _ in range(HOLD_WINDOWS):
+        assert step(c, clock, 100, active=2, waiting=1) == 2
+    assert step(c, clock, 100, active=2, waiting=1) == 3
+    assert reasons(c) == ["오류 없음, 대기 파일 있음", "늘려도 처리량 그대로", "오류 없음, 대기 파일 있음"]
+
+
+def test_no_increase_without_waiting_files(clock):
+    c = AimdController(min_jobs=1, max_jobs=4, start=2, interval_sec=10)
+    assert step(c, clock, 100, active=2, waiting=0) == 2
+    assert step(c, clock, 100, active=1, waiting=0) == 2
+
+
+def test_never_exceeds_max_jobs(clock):
+    c = AimdController(min_jobs=1, max_jobs=2, start=2, interval_sec=10)
+    assert step(c, clock, 100, active=2, waiting=3) == 2
+
+
+def test_multiplicative_decrease_on_errors(clock):
+    c = AimdController(min_jobs=1, max_jobs=8, start=6, interval_sec=10, decrease=0.5)
+    c.record_failure(classify_failure(1, "connection refused"))
+    assert step(c, clock, 10, active=6) == 3
+    c.record_failure(classify_failure(5))
+    assert step(c, clock, 10, active=3) == 1
+    c.record_failure(classify_failure(5))
+    assert step(c, clock, 10, active=1) == 1    # min_jobs 아래로는 줄이지 않음
+    assert reasons(c) == ["오류 발생", "오류 발생"]
+
+
+def test_permanent_failures_are_not_congestion(clock):
+    c = AimdController(min_jobs=1, max_jobs=4, start=4, interval_sec=10)
+    c.record_failure(classify_failure(4, "file not found"))
+    assert step(c, clock, 100, active=4) == 4
+
+
+def test_decrease_when_throughput_drops(clock):
+    c = AimdController(min_jobs=1, max_jobs=4, start=4, interval_sec=10, tolerance=0.05)
+    assert step(c, clock, 400, active=4) == 4
+    assert step(c, clock, 100, active=4) == 2
+    assert reasons(c) == ["처리량 감소"]
+
+
+def test_acquire_respects_limit(clock):
+    c = AimdController(min_jobs=1, max_jobs=4, start=1, interval_sec=10)
+    with c:
+        assert c.active == 1
+    assert c.active == 0
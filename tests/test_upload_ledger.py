@@ -0,0 +1,102 @@
+"""업로드 장부 상태 전이 / 재개용 기록"""
+
+import pytest
+
+from upload_ledger import UploadLedger, DISCOVERED, UPLOADING, UPLOADED, ARCHIVED
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    with UploadLedger(tmp_path / "state" / "ledger.db") as db:
+        yield db
+
+
+def make_info(tmp_path, name="rec.mp4", size=100, mtime_ns=1):
+    return {'path': str(tmp_path / name), 'name': name, 'size': size, 'mtime_ns': mtime_ns}
+
+
+def test_discover_registers_once(ledger, tmp_path):
+    info = make_info(tmp_path)
+    assert ledger.get_state(info) is None
+    assert ledger.discover(info) == DISCOVERED
+    ledger.mark(info, UPLOADED, remote="est:/r/rec.mp4")
+    # 이미 있는 파일은 상태를 되돌리지 않음
+    assert ledger.discover(info) == UPLOADED
+
+
+def test_state_transitions_keep_remote_and_count_attempts(ledger, tmp_path):
+    info = make_info(tmp_path)
+    ledger.discover(info)
+    ledger.mark(info, UPLOADING)
+    ledger.mark(info, DISCOVERED, error="connection refused")
+    ledger.mark(info, UPLOADING)
+    ledger.mark(info, UPLOADED, remote="est:/r/rec.mp4")
+    ledger.mark(info, ARCHIVED)
+
+    row = ledger.get(info)
+    assert row['state'] == ARCHIVED
+    assert row['remote'] == "est:/r/rec.mp4"
+    assert row['attempts'] == 2
+    assert row['error'] is None
+    assert [r['state'] for r in ledger.rows(ARCHIVED)] == [ARCHIVED]
+
+
+def test_changed_file_is_a_new_record(ledger, tmp_path):
+    info = make_info(tmp_path)
+    ledger.mark(info, ARCHIVED)
+    grown = make_info(tmp_path, size=200, mtime_ns=2)
+    assert ledger.discover(grown) == DISCOVERED
+    assert len(ledger.rows()) == 2
+
+
+def test_destination_states(ledger, tmp_path):
+    info = make_info(tmp_path)
+    ledger.mark_destination(info, "main", UPLOADED, remote="a:/r/rec.mp4")
+    ledger.mark_destination(info, "backup", DISCOVERED, error="timeout")
+    ledger.mark_destination(info, "backup", UPLOADED)
+    assert ledger.get_destination_states(info) == {"main": UPLOADED, "backup": UPLOADED}
+
+
+def test_resume_offsets_and_ranges(ledger, tmp_path):
+    info = make_info(tmp_path)
+    assert ledger.get_resume(info) is None
+    ledger.put_resume(info, "/r/rec.mp4.partial", 0)
+    ledger.put_range(info, 0, 0, 50, 20)
+    ledger.put_range(info, 1, 50, 100, 70)
+    ledger.put_range(info, 0, 0, 50, 40)
+    resume = ledger.get_resume(info)
+    assert resume['remote'] == "/r/rec.mp4.partial"
+    assert resume['ranges'] == {0: {'start': 0, 'end': 50, 'offset': 40},
+                                1: {'start': 50, 'end': 100, 'offset': 70}}
+    ledger.clear_resume(info)
+    assert ledger.get_resume(info) is None
+
+
+def test_live_parts(ledger, tmp_path):
+    path = str(tmp_path / "live.mkv")
+    ledger.put_live_part(path, 0, 0, 10, "0000007b")
+    ledger.put_live_part(path, 1, 10, 10, "000001c8")
+    assert ledger.get_live_parts(path) == {
+        0: {'idx': 0, 'offset': 0, 'length': 10, 'crc32': "0000007b"},
+        1: {'idx': 1, 'offset': 10, 'length': 10, 'crc32': "000001c8"},
+    }
+    ledger.clear_live_parts(path)
+    assert ledger.get_live_parts(path) == {}
+
+
+def test_claims(ledger, tmp_path):
+    path = str(tmp_path / "rec.mp4")
+    assert ledger.try_claim(path, 100, "t1", lambda row: False) == (True, None)
+    # 같은 프로세스는 다시 점유해도 성공
+    assert ledger.try_claim(path, 100, "t1", lambda row: False) == (True, None)
+
+    ok, holder = ledger.try_claim(path, 200, "t2", lambda row: False)
+    assert not ok and holder['pid'] == 100
+
+    # 점유한 프로세스가 끝났으면 가져옴
+    ok, previous = ledger.try_claim(path, 200, "t2", lambda row: True)
+    assert ok and previous['pid'] == 100
+    assert ledger.get_claim(path)['pid'] == 200
+
+    ledger.release_claims(200)
+    assert ledger.get_claim(path) is None
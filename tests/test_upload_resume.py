@@ -0,0 +1,87 @@
+"""이어받기 업로드 (로컬 전송 방식, 중간에 끊긴 뒤 이어서 전송)"""
+
+import os
+import threading
+
+import pytest
+
+from upload_ledger import UploadLedger
+from upload_resume import ResumableUploader, LocalTransport, PARTIAL_SUFFIX
+
+CHUNK = 64 * 1024
+
+
+class CutTransport(LocalTransport):
+    """budget 바이트를 쓴 뒤 연결이 끊긴 것처럼 ConnectionError (모든 연결이 공유)"""
+
+    def __init__(self, root, budget):
+        super().__init__(root)
+        self.budget = budget
+
+    def open_at(self, remote, offset, truncate=True):
+        f = super().open_at(remote, offset, truncate)
+        budget = self.budget
+        write = f.write
+
+        def limited(data):
+            with budget["lock"]:
+                if budget["left"] is not None:
+                    if len(data) > budget["left"]:
+                        raise ConnectionError("연결 끊김 (테스트)")
+                    budget["left"] -= len(data)
+            return write(data)
+
+        f.write = limited
+        return f
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "rec.mp4"
+    path.write_bytes(os.urandom(CHUNK * 10 + 123))
+    st = path.stat()
+    return {'path': str(path), 'name': path.name, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+@pytest.mark.parametrize("streams", [1, 3])
+def test_resume_after_disconnect(tmp_path, source, streams):
+    remote_root = tmp_path / "remote"
+    budget = {"left": CHUNK * 6, "lock": threading.Lock()}
+    sent = []
+
+    with UploadLedger(tmp_path / "ledger.db") as ledger:
+        uploader = ResumableUploader(lambda: CutTransport(str(remote_root), budget), ledger,
+                                     chunk_size=CHUNK, streams=streams)
+        with pytest.raises(ConnectionError):
+            uploader.upload(source, "/rec", progress=lambda done, total, this: sent.append(this))
+        saved = ledger.get_resume(source)
+        assert saved['remote'] == "/rec/rec.mp4" + PARTIAL_SUFFIX
+        # 여러 연결이면 어느 구간이 먼저 끊기는지에 따라 달라짐 (마지막 구간은 청크보다 짧은 조각 포함)
+        confirmed = sum(r['offset'] - r['start'] for r in saved['ranges'].values())
+        assert 0 < confirmed <= CHUNK * 6
+
+        budget["left"] = None
+        sent.clear()
+        final, resumed_from = uploader.upload(source, "/rec",
+                                              progress=lambda done, total, this: sent.append(this))
+
+        assert final == "/rec/rec.mp4"
+        assert resumed_from == confirmed
+        assert sent[-1] == source['size'] - confirmed     # 이어서 보낸 만큼만 전송
+        assert ledger.get_resume(source) is None
+
+    uploaded = remote_root / "rec" / "rec.mp4"
+    assert uploaded.read_bytes() == open(source['path'], 'rb').read()
+    assert not (remote_root / "rec" / ("rec.mp4" + PARTIAL_SUFFIX)).exists()
+
+
+def test_stale_partial_starts_over(tmp_path, source):
+    """장부에 위치가 있어도 원격 임시 파일이 없으면 처음부터"""
+    remote_root = tmp_path / "remote"
+    with UploadLedger(tmp_path / "ledger.db") as ledger:
+        ledger.put_resume(source, "/rec/rec.mp4" + PARTIAL_SUFFIX, CHUNK)
+        ledger.put_range(source, 0, 0, source['size'], CHUNK)
+        uploader = ResumableUploader(lambda: LocalTransport(str(remote_root)), ledger, chunk_size=CHUNK)
+        _, resumed_from = uploader.upload(source, "/rec")
+    assert resumed_from == 0
+    assert (remote_root / "rec" / "rec.mp4").read_bytes() == open(source['path'], 'rb').read()
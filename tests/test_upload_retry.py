@@ -0,0 +1,76 @@
+"""실패 분류 / 백오프 / 원격별 차단기"""
+
+import pytest
+
+import upload_retry
+from upload_retry import classify_failure, RetryPolicy, CircuitBreaker
+
+
+@pytest.mark.parametrize("message", [
+    "Failed to copy: dial tcp 10.0.0.5:22: connect: connection refused",
+    "couldn't connect SSH: ssh: handshake failed: EOF",
+    "read tcp 10.0.0.2:51000->10.0.0.5:22: read: connection reset by peer",
+    "write tcp 10.0.0.2:51000->10.0.0.5:22: write: broken pipe",
+    "dial tcp: lookup est.example: no such host",
+    "Unable to connect to 10.0.0.5: [Errno 110] Connection timed out",
+    "dial tcp 10.0.0.5:22: i/o timeout",
+    "sftp: connection lost: EOF",
+    "rc 서버 연결 실패: [Errno 111]",
+])
+def test_network_errors_are_unreachable(message):
+    failure = classify_failure(1, message)
+    assert failure.unreachable and failure.retryable
+    assert failure.category == "unreachable"
+
+
+@pytest.mark.parametrize("message", [
+    "read /rec/a.mp4: unexpected EOF",
+    "Failed to copy: --timeout 5m0s exceeded while reading source",
+    "이어받기 전송 오류 (90%에서 중단): timed out",
+    "검증 실패: 원격 md5 timeout",
+    "rclone rcat 입력 중단: [Errno 32] Broken pipe",
+])
+def test_local_errors_do_not_trip_breaker(message):
+    assert not classify_failure(5, message).unreachable
+
+
+def test_exit_codes():
+    assert classify_failure(5).category == "temporary"
+    assert classify_failure(5).retryable
+    assert not classify_failure(4).retryable
+    assert not classify_failure(7).retryable
+    assert classify_failure(None, "rclone이 설치되지 않았습니다.").category == "not_installed"
+    assert classify_failure(99).category == "unknown"
+
+
+def test_backoff_is_capped(monkeypatch):
+    monkeypatch.setattr(upload_retry.random, "uniform", lambda low, high: high)
+    policy = RetryPolicy(max_attempts=5, base_sec=10, max_sec=60)
+    assert [policy.delay(n) for n in range(1, 6)] == [10, 20, 40, 60, 60]
+    assert RetryPolicy(max_attempts=0).max_attempts == 1
+
+
+def test_breaker_opens_and_probes(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(upload_retry.time, "time", lambda: now[0])
+    unreachable = classify_failure(1, "connection refused")
+    breaker = CircuitBreaker("est", threshold=2, cooldown_sec=60)
+
+    # 파일 문제는 연결 실패로 세지 않음
+    breaker.record_failure(classify_failure(4, "file not found"))
+    breaker.record_failure(unreachable)
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure(unreachable)
+    assert breaker.state == "open" and not breaker.allow()
+
+    # cooldown 후 시험 1건만 허용, 실패하면 다시 차단
+    now[0] += 60
+    assert breaker.state == "half-open"
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure(unreachable)
+    assert breaker.state == "open"
+
+    now[0] += 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
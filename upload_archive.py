@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업로드 완료 파일 이동 (같은 드라이브면 바로 이름 변경, 다른 드라이브면 백그라운드 복사)
+
+- 같은 드라이브(st_dev 같음): os.replace 한 번으로 끝 (원자적, 복사 없음)
+- 다른 드라이브: 백그라운드 스레드가 속도 제한을 걸고 <이름>.partial로 복사 →
+  수정 시간 복사 → 이름 변경 → 원본 삭제. 업로드는 이동을 기다리지 않고 바로 다음 파일로 넘어감
+  (녹화 중인 OBS와 디스크 I/O를 나눠 쓰도록 max_rate로 제한)
+
+config.yaml:
+    archive:
+      background: true      # 다른 드라이브면 백그라운드로 이동 (false면 업로드 중에 바로 이동)
+      max_rate: "50M"       # 백그라운드 복사 속도 제한 (rclone 표기, 단위 없으면 KiB/s, "0" = 무제한)
+
+upload_recording.py에서 import해서 사용:
+    from upload_archive import same_volume, ArchiveMover
+"""
+
+import os
+import time
+import queue
+import shutil
+import threading
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def same_volume(src, dst_dir):
+    """두 경로가 같은 드라이브(볼륨)에 있는지"""
+    return os.stat(src).st_dev == os.stat(dst_dir).st_dev
+
+
+def copy_throttled(src, dst, rate=None, chunk_size=CHUNK_SIZE):
+    """
+    속도 제한 복사 후 원본 삭제 (중간에 끊기면 dst.partial만 남고 원본은 그대로)
+
+    Args:
+        rate: 최대 bytes/s (None이면 무제한)
+    """
+    tmp = dst + '.partial'
+    started = time.monotonic()
+    copied = 0
+    with open(src, 'rb') as fin, open(tmp, 'wb') as fout:
+        while True:
+            chunk = fin.read(chunk_size)
+            if not chunk:
+                break
+            fout.write(chunk)
+            copied += len(chunk)
+            if rate:
+                # 지금까지 복사한 양이 rate를 넘지 않도록 대기
+                ahead = copied / rate - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        fout.flush()
+        os.fsync(fout.fileno())
+    # 수정 시간을 유지해야 장부(경로+크기+수정시간)와 다시 맞춰볼 수 있음
+    shutil.copystat(src, tmp)
+    os.replace(tmp, dst)
+    os.remove(src)
+
+
+class ArchiveMover:
+    """다른 드라이브로의 이동을 하나씩 처리하는 백그라운드 스레드"""
+
+    def __init__(self, rate=None, logger=None):
+        self.rate = rate
+        self.logger = logger
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _log(self, msg, level="info"):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+    def is_pending(self, src):
+        with self._lock:
+            return src in self._pending
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, src, dst, on_done=None, extras=()):
+        """
+        이동 예약. 이미 예약된 파일이면 False
+
+        Args:
+            on_done: callback(성공 여부) - 이동 스레드에서 호출
+            extras: 본 파일 이동 뒤 같이 옮길 작은 파일들 [(원본, 대상)] (사이드카 등)
+        """
+        with self._lock:
+            if src in self._pending:
+                return False
+            self._pending.add(src)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._queue.put((src, dst, on_done, extras))
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            src, dst, on_done, extras = item
+            ok = False
+            started = time.time()
+            try:
+                size = os.path.getsize(src)
+                copy_throttled(src, dst, self.rate)
+                for extra_src, extra_dst in extras:
+                    if os.path.exists(extra_src):
+                        shutil.move(extra_src, extra_dst)
+                ok = True
+                elapsed = max(time.time() - started, 0.001)
+                self._log(f"백그라운드 이동 완료: {os.path.basename(src)} "
+                          f"({size / 1024 ** 2:.0f}MB, {size / elapsed / 1024 ** 2:.1f}MB/s)")
+            except Exception as e:
+                self._log(f"백그라운드 이동 실패 (다음 실행 시 재시도): {os.path.basename(src)} - {e}", "warning")
+            finally:
+                with self._lock:
+                    self._pending.discard(src)
+                if on_done:
+                    try:
+                        on_done(ok)
+                    except Exception as e:
+                        self._log(f"이동 완료 처리 실패: {os.path.basename(src)} - {e}", "warning")
+                self._queue.task_done()
+
+    def drain(self):
+        """예약된 이동이 모두 끝날 때까지 대기"""
+        self._queue.join()
+
+    def stop(self):
+        """남은 이동을 끝내고 스레드 종료"""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+녹화 파일 쓰기 완료 판정
+
+세 가지 검사를 조합합니다.
+  1. 크기 안정성: 짧은 구간(stable_sec) 동안 크기/수정시간 변화 없음
+  2. 배타적 열기: 다른 프로세스(OBS)가 파일을 열고 있지 않음 (Windows만)
+  3. 컨테이너 검사: MP4/MOV는 moov 박스 존재 + 박스 구조가 파일 끝과 일치,
+                    MKV는 Segment 크기 확정 + Cues 존재
+
+upload_recording.py에서 import해서 사용:
+    from upload_complete import CompletionDetector
+"""
+
+import os
+import struct
+import time
+
+# MKV(EBML) 요소 ID
+EBML_HEADER = 0x1A45DFA3
+MKV_SEGMENT = 0x18538067
+MKV_SEEKHEAD = 0x114D9B74
+MKV_SEEK = 0x4DBB
+MKV_SEEK_ID = 0x53AB
+MKV_SEEK_POSITION = 0x53AC
+MKV_CUES = 0x1C53BB6B
+
+MP4_EXTENSIONS = ('.mp4', '.mov', '.m4v')
+MKV_EXTENSIONS = ('.mkv', '.webm')
+
+
+# ============================================
+# 배타적 열기 검사
+# ============================================
+def exclusive_open_probe(path):
+    """
+    공유 없이 열 수 있는지 확인 (Windows: CreateFileW dwShareMode=0)
+
+    Returns:
+        True (열 수 있음) / False (다른 프로세스가 사용 중) / None (지원 안 함)
+    """
+    if os.name != 'nt':
+        return None
+
+    import ctypes
+    from ctypes import wintypes
+
+    GENERIC_READ = 0x80000000
+    OPEN_EXISTING = 3
+    FILE_ATTRIBUTE_NORMAL = 0x80
+    INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+    ERROR_SHARING_VIOLATION = 32
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.CreateFileW.argtypes = [
+        wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+        wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE,
+    ]
+
+    handle = kernel32.CreateFileW(
+        str(path), GENERIC_READ, 0, None, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, None
+    )
+    if handle == INVALID_HANDLE_VALUE:
+        if ctypes.get_last_error() == ERROR_SHARING_VIOLATION:
+            return False
+        return None
+    kernel32.CloseHandle(handle)
+    return True
+
+
+# ============================================
+# 컨테이너 검사
+# ============================================
+def check_mp4(path):
+    """MP4/MOV 최상위 박스를 따라가며 moov 존재와 구조 완결성 확인"""
+    file_size = os.path.getsize(path)
+    found_moov = False
+    pos = 0
+
+    with open(path, 'rb') as f:
+        while pos < file_size:
+            f.seek(pos)
+            header = f.read(8)
+            if len(header) < 8:
+                return False, "박스 헤더 잘림"
+
+            size, box_type = struct.unpack('>I4s', header)
+            if size == 1:
+                large = f.read(8)
+                if len(large) < 8:
+                    return False, "박스 헤더 잘림"
+                size = struct.unpack('>Q', large)[0]
+            elif size == 0:
+                # 파일 끝까지 이어지는 박스 (OBS가 아직 크기를 쓰지 않은 mdat)
+                size = file_size - pos
+
+            if size < 8:
+                return False, f"잘못된 박스 크기: {box_type!r}"
+            if box_type == b'moov':
+                found_moov = True
+            pos += size
+
+    if pos != file_size:
+        return False, "마지막 박스가 파일 끝을 넘어감 (쓰기 중)"
+    if not found_moov:
+        return False, "moov 박스 없음 (쓰기 중)"
+    return True, "정상"
+
+
+def _read_vint(f, keep_marker):
+    """EBML 가변 길이 정수 읽기. (값, 바이트수, 모두 1인지) 반환"""
+    first = f.read(1)
+    if not first:
+        return None, 0, False
+    b = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not (b & mask):
+        mask >>= 1
+        length += 1
+    if length > 8:
+        return None, 0, False
+
+    rest = f.read(length - 1)
+    if len(rest) < length - 1:
+        return None, 0, False
+
+    value = b if keep_marker else (b & (mask - 1))
+    for c in rest:
+        value = (value << 8) | c
+
+    all_ones = (not keep_marker) and value == (1 << (7 * length)) - 1
+    return value, length, all_ones
+
+
+def _read_element_header(f):
+    """EBML 요소 헤더 읽기. (ID, 데이터 크기, 크기 미정 여부)"""
+    elem_id, _, _ = _read_vint(f, keep_marker=True)
+    if elem_id is None:
+        return None, None, False
+    size, _, unknown = _read_vint(f, keep_marker=False)
+    if size is None:
+        return None, None, False
+    return elem_id, size, unknown
+
+
+def _seekhead_cues_position(f, end):
+    """SeekHead에서 Cues 위치 (Segment 데이터 기준 상대 위치) 찾기"""
+    while f.tell() < end:
+        elem_id, size, unknown = _read_element_header(f)
+        if elem_id is None or unknown:
+            return None
+        data_end = f.tell() + size
+        if elem_id == MKV_SEEK:
+            seek_id = seek_pos = None
+            while f.tell() < data_end:
+                child_id, child_size, _ = _read_element_header(f)
+                if child_id is None:
+                    return None
+                data = f.read(child_size)
+                if child_id == MKV_SEEK_ID:
+                    seek_id = int.from_bytes(data, 'big')
+                elif child_id == MKV_SEEK_POSITION:
+                    seek_pos = int.from_bytes(data, 'big')
+            if seek_id == MKV_CUES and seek_pos is not None:
+                return seek_pos
+        f.seek(data_end)
+    return None
+
+
+def check_mkv(path):
+    """MKV Segment 크기 확정 + Cues 요소 존재 확인"""
+    file_size = os.path.getsize(path)
+
+    with open(path, 'rb') as f:
+        elem_id, size, _ = _read_element_header(f)
+        if elem_id != EBML_HEADER:
+            return False, "EBML 헤더 없음"
+        f.seek(size, os.SEEK_CUR)
+
+        elem_id, seg_size, unknown = _read_element_header(f)
+        if elem_id != MKV_SEGMENT:
+            return False, "Segment 없음"
+        if unknown:
+            return False, "Segment 크기 미정 (쓰기 중)"
+
+        seg_start = f.tell()
+        seg_end = seg_start + seg_size
+        if seg_end > file_size:
+            return False, "Segment가 파일 끝을 넘어감 (쓰기 중)"
+
+        # 1) SeekHead가 가리키는 Cues 위치 확인 (대용량 파일도 몇 번의 읽기로 끝남)
+        elem_id, size, unknown = _read_element_header(f)
+        if elem_id == MKV_SEEKHEAD and not unknown:
+            cues_pos = _seekhead_cues_position(f, f.tell() + size)
+            if cues_pos is not None:
+                f.seek(seg_start + cues_pos)
+                elem_id, _, _ = _read_element_header(f)
+                if elem_id == MKV_CUES:
+                    return True, "정상"
+
+        # 2) SeekHead에 없으면 최상위 요소를 따라가며 찾기
+        pos = seg_start
+        while pos < seg_end:
+            f.seek(pos)
+            elem_id, size, unknown = _read_element_header(f)
+            if elem_id is None or unknown:
+                return False, "요소 크기 미정 (쓰기 중)"
+            if elem_id == MKV_CUES:
+                return True, "정상"
+            pos = f.tell() + size
+
+    return False, "Cues 없음 (쓰기 중)"
+
+
+def check_container(path):
+    """확장자에 맞는 컨테이너 검사. 모르는 형식은 통과"""
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext in MP4_EXTENSIONS:
+            return check_mp4(path)
+        if ext in MKV_EXTENSIONS:
+            return check_mkv(path)
+    except OSError as e:
+        return False, f"읽기 실패: {e}"
+    return True, "검사 안 함"
+
+
+# ============================================
+# 완료 판정
+# ============================================
+class CompletionDetector:
+    """
+    쓰기 완료 판정기
+
+    config.yaml:
+        completion:
+          stable_sec: 3          # 크기/수정시간이 이 시간 동안 그대로면 안정
+          exclusive_probe: true  # 배타적 열기 검사 (Windows)
+          container_check: true  # MP4 moov / MKV Cues 검사
+    """
+
+    def __init__(self, stable_sec=3, exclusive_probe=True, container_check=True):
+        self.stable_sec = stable_sec
+        self.exclusive_probe = exclusive_probe
+        self.container_check = container_check
+        self._seen = {}  # 경로 -> ((크기, 수정시간), 처음 관측 시각)
+
+    @classmethod
+    def from_config(cls, config):
+        cfg = config.get('completion') or {}
+        return cls(
+            stable_sec=cfg.get('stable_sec', 3),
+            exclusive_probe=cfg.get('exclusive_probe', True),
+            container_check=cfg.get('container_check', True),
+        )
+
+    def observe(self, path, st):
+        """크기/수정시간 관측. stable_sec 이상 변화 없었으면 True"""
+        sig = (st.st_size, st.st_mtime_ns)
+        now = time.monotonic()
+        last = self._seen.get(path)
+        if last is None or last[0] != sig:
+            self._seen[path] = (sig, now)
+            return False
+        return now - last[1] >= self.stable_sec
+
+    def forget(self, path):
+        self._seen.pop(path, None)
+
+    def verify(self, path):
+        """배타적 열기 + 컨테이너 검사. (완료 여부, 사유)"""
+        if self.exclusive_probe and exclusive_open_probe(path) is False:
+            return False, "다른 프로세스가 사용 중"
+        if self.container_check:
+            return check_container(path)
+        return True, "정상"
+
+    def is_complete(self, path, st, closed=False):
+        """
+        감시 모드용 판정 (반복 호출)
+
+        Args:
+            closed: 쓰기 종료 이벤트를 받은 경우 크기 안정성 대기 생략
+        """
+        if not self.observe(path, st) and not closed:
+            return False, "크기 변화 확인 중"
+        ok, reason = self.verify(path)
+        if ok:
+            self.forget(path)
+        return ok, reason
+
+    def filter_complete(self, paths):
+        """
+        일괄 판정 (1회 실행용): 모든 파일을 한 번에 샘플링하므로 대기는 stable_sec 한 번뿐
+
+        Returns:
+            {경로: (완료 여부, 사유)}
+        """
+        first = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            first[path] = (st.st_size, st.st_mtime_ns)
+
+        if first and self.stable_sec > 0:
+            time.sleep(self.stable_sec)
+
+        results = {}
+        for path, sig in first.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if (st.st_size, st.st_mtime_ns) != sig:
+                results[path] = (False, "크기 변화 중")
+                continue
+            results[path] = self.verify(path)
+        return results
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+동시 업로드 수 자동 조절 (AIMD)
+
+interval_sec마다 실제 처리량과 오류 수를 보고 동시 업로드 수를 바꿉니다.
+  - 연결 끊김/타임아웃 등 오류 발생, 또는 처리량이 크게 떨어짐 → 곱셈 감소 (x decrease)
+  - 오류 없이 모든 자리가 사용 중이고 대기 중인 파일이 있음 → 1 증가
+  - 늘렸는데 처리량이 그대로 → 이전 값으로 되돌리고 몇 구간 동안 유지
+모든 변경은 로그에 남습니다.
+
+config.yaml:
+    adaptive:
+      enabled: true
+      min_jobs: 1
+      max_jobs: 6
+      interval_sec: 30      # 판단 주기(초)
+      decrease: 0.5         # 오류 시 곱할 값
+      tolerance: 0.05       # 이만큼(5%) 이상 변해야 처리량이 바뀐 것으로 판단
+
+upload_recording.py에서 import해서 사용:
+    from upload_concurrency import AimdController
+"""
+
+import math
+import threading
+import time
+
+HOLD_WINDOWS = 3
+
+
+class AimdController:
+    """동시 실행 수 제한 + AIMD 조절 (스레드 안전)"""
+
+    def __init__(self, min_jobs=1, max_jobs=4, start=None, interval_sec=30,
+                 decrease=0.5, tolerance=0.05, logger=None):
+        self.min_jobs = max(1, int(min_jobs))
+        self.max_jobs = max(self.min_jobs, int(max_jobs))
+        self.limit = min(self.max_jobs, max(self.min_jobs, int(start or self.min_jobs)))
+        self.interval_sec = interval_sec
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.logger = logger
+
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+        self._window_start = time.time()
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._last_bytes = {}          # 경로 -> 마지막으로 본 전송 바이트
+        self._prev_rate = None         # 이전 구간 처리량
+        self._prev_limit = None        # 이전 구간 동시 수
+        self._hold = 0                 # 남은 유지 구간 수 (되돌린 직후 바로 다시 늘리지 않도록)
+        self.history = []              # [(시각, 이전 값, 새 값, 처리량, 오류 수, 사유)]
+
+    @classmethod
+    def from_config(cls, config, start=None, logger=None):
+        cfg = config.get('adaptive') or {}
+        return cls(
+            min_jobs=cfg.get('min_jobs', 1),
+            max_jobs=cfg.get('max_jobs', 4),
+            start=start,
+            interval_sec=cfg.get('interval_sec', 30),
+            decrease=cfg.get('decrease', 0.5),
+            tolerance=cfg.get('tolerance', 0.05),
+            logger=logger,
+        )
+
+    # ----------------------------------------
+    # 동시 실행 제한
+    # ----------------------------------------
+    def acquire(self):
+        """실행 가능해질 때까지 대기"""
+        with self._cond:
+            self.waiting += 1
+            while self.active >= self.limit:
+                self._cond.wait(timeout=1)
+                self._maybe_adjust()
+            self.waiting -= 1
+            self.active += 1
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    # ----------------------------------------
+    # 측정
+    # ----------------------------------------
+    def observe(self, file_info, stats):
+        """진행 통계 콜백 (TransferStats): 파일별 누적 바이트의 증가분을 처리량에 더함"""
+        with self._cond:
+            last = self._last_bytes.get(file_info['path'], 0)
+            if stats.bytes > last:
+                self._window_bytes += stats.bytes - last
+            # 재시도로 처음부터 다시 보내면 줄어들 수 있음
+            self._last_bytes[file_info['path']] = stats.bytes
+            self._maybe_adjust()
+
+    def record_failure(self, failure):
+        """전송 실패 1건 (upload_retry.Failure). 연결/일시 오류만 혼잡 신호로 봄"""
+        with self._cond:
+            if failure.unreachable or failure.retryable:
+                self._window_errors += 1
+            self._maybe_adjust()
+
+    def finish(self, file_info):
+        with self._cond:
+            self._last_bytes.pop(file_info['path'], None)
+
+    # ----------------------------------------
+    # 조절
+    # ----------------------------------------
+    def _set_limit(self, new, rate, reason):
+        old = self.limit
+        self.limit = new
+        self.history.append((time.time(), old, new, rate, self._window_errors, reason))
+        if self.logger:
+            self.logger.info(
+                f"동시 업로드 수 변경: {old} -> {new} ({reason}, "
+                f"처리량 {rate / 1024 / 1024:.1f}MB/s, 오류 {self._window_errors})"
+            )
+        self._cond.notify_all()
+
+    def _maybe_adjust(self):
+        """interval_sec가 지났으면 이번 구간 결과로 동시 수 조절 (_cond 잡은 상태에서 호출)"""
+        now = time.time()
+        elapsed = now - self._window_start
+        if elapsed < self.interval_sec:
+            return
+
+        rate = self._window_bytes / elapsed
+        errors = self._window_errors
+        prev_rate, prev_limit = self._prev_rate, self._prev_limit
+        limit = self.limit
+        busy = self.active >= limit and self.waiting > 0
+        new = limit
+        reason = None
+
+        if errors:
+            new = max(self.min_jobs, int(math.floor(limit * self.decrease)))
+            reason = "오류 발생"
+        elif (prev_rate and prev_limit == limit and self.active >= limit
+              and rate < prev_rate * (1 - self.tolerance)):
+            # 같은 동시 수에서 처리량이 떨어짐 (회선/서버 혼잡)
+            new = max(self.min_jobs, int(math.floor(limit * self.decrease)))
+            reason = "처리량 감소"
+        elif (prev_rate is not None and prev_limit is not None and limit > prev_limit
+              and rate <= prev_rate * (1 + self.tolerance)):
+            new = prev_limit
+            reason = "늘려도 처리량 그대로"
+            self._hold = HOLD_WINDOWS
+        elif busy and limit < self.max_jobs and not self._hold:
+            new = limit + 1
+            reason = "오류 없음, 대기 파일 있음"
+
+        if self._hold and reason is None:
+            self._hold -= 1
+        self._prev_rate = rate if self.active else prev_rate
+        self._prev_limit = limit
+        if new != limit:
+            self._set_limit(new, rate, reason)
+
+        self._window_start = now
+        self._window_bytes = 0
+        self._window_errors = 0
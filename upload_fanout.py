@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+여러 원격으로 동시 업로드 (원본 파일은 한 번만 읽음)
+
+파일을 청크 단위로 한 번 읽어 원격마다 띄운 `rclone rcat`의 입력으로 동시에 나눠 보냅니다.
+원격별로 대기열이 있어 느린 원격이 있어도 다른 원격은 버퍼만큼 앞서 나갈 수 있고,
+실패한 원격은 빠지고 나머지는 계속 전송합니다.
+rclone.bandwidth_schedule의 시간대별 제한은 호출하는 쪽(progress)에서 원본 읽기 속도로 적용합니다.
+원격별 완료 여부는 장부에 기록되어 재시도 시 끝난 원격은 다시 보내지 않습니다.
+
+config.yaml:
+    destinations:
+      - name: "main"
+        remote_name: "est-sftp"
+        remote_path: "/recordings"
+        bandwidth_limit: "0"
+        required: true            # false면 실패해도 이동(archive)을 막지 않음
+      - name: "backup"
+        remote_name: "backup-nas"
+        remote_path: "/backup/recordings"
+        bandwidth_limit: "5M"
+        required: true
+
+upload_recording.py에서 import해서 사용:
+    from upload_fanout import get_destinations, tee_upload
+"""
+
+import queue
+import threading
+import subprocess
+
+from bandwidth_schedule import normalize_limit
+
+CHUNK_SIZE = 8 * 1024 * 1024
+QUEUE_CHUNKS = 4      # 원격별로 앞서 읽어 둘 수 있는 청크 수
+
+
+def get_destinations(config):
+    """설정의 업로드 대상 목록 (destinations가 없으면 None)"""
+    entries = config.get('destinations')
+    if not entries:
+        return None
+
+    folder_name = config.get('folder_name', '')
+    destinations = []
+    for i, entry in enumerate(entries):
+        base = entry.get('remote_path', '/recordings')
+        folder = f"{base}/{folder_name}" if folder_name else base
+        destinations.append({
+            'name': entry.get('name') or entry['remote_name'],
+            'remote': f"{entry['remote_name']}:{folder}/",
+            'bwlimit': normalize_limit(entry.get('bandwidth_limit')),
+            'required': entry.get('required', True),
+        })
+    names = [d['name'] for d in destinations]
+    if len(set(names)) != len(names):
+        raise ValueError(f"destinations의 name이 중복됩니다: {names}")
+    return destinations
+
+
+class _Sink:
+    """원격 1곳으로 보내는 rclone rcat 프로세스 + 쓰기 스레드"""
+
+    def __init__(self, dest, file_info):
+        self.dest = dest
+        self.remote_file = f"{dest['remote']}{file_info['name']}"
+        self.queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self.error = None
+        self.failed = threading.Event()
+
+        cmd = ['rclone', 'rcat', self.remote_file, '--size', str(file_info['size'])]
+        if dest['bwlimit'] != 'off':
+            cmd.extend(['--bwlimit', dest['bwlimit']])
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.PIPE)
+        self._stderr = []
+        self._err_thread = threading.Thread(target=self._read_stderr, daemon=True)
+        self._err_thread.start()
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            self._stderr.append(line.decode('utf-8', errors='replace').strip())
+            del self._stderr[:-20]
+
+    def _write(self):
+        try:
+            while True:
+                chunk = self.queue.get()
+                if chunk is None:
+                    break
+                self.process.stdin.write(chunk)
+        except (BrokenPipeError, OSError) as e:
+            self.error = f"rclone rcat 입력 중단: {e}"
+            self.failed.set()
+            # 막혀 있는 읽기 쪽이 더 기다리지 않도록 남은 청크 비우기
+            while self.queue.get() is not None:
+                pass
+        finally:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+
+    def put(self, chunk):
+        if not self.failed.is_set():
+            self.queue.put(chunk)
+
+    def finish(self):
+        """입력 종료 후 결과 대기 → (성공 여부, 종료 코드, 오류 메시지)"""
+        self.queue.put(None)
+        self._thread.join()
+        code = self.process.wait()
+        self._err_thread.join(timeout=5)
+        if code == 0 and not self.error:
+            return True, 0, ""
+        detail = self._stderr[-1] if self._stderr else self.error or ""
+        return False, code, f"rclone rcat 오류 (코드: {code}): {detail}"
+
+
+def tee_upload(file_info, destinations, progress=None):
+    """
+    파일을 한 번 읽어 여러 원격에 동시에 업로드
+
+    Args:
+        destinations: get_destinations 항목 중 이번에 보낼 원격들
+        progress: callback(읽은 바이트, 전체 바이트)
+
+    Returns:
+        {원격 이름: (성공 여부, 종료 코드, 원격 경로 또는 오류 메시지)}
+    """
+    sinks = []
+    results = {}
+    for dest in destinations:
+        try:
+            sinks.append(_Sink(dest, file_info))
+        except FileNotFoundError:
+            results[dest['name']] = (False, None, "rclone이 설치되지 않았습니다. https://rclone.org/downloads/")
+
+    done = 0
+    try:
+        with open(file_info['path'], 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                alive = [s for s in sinks if not s.failed.is_set()]
+                if not alive:
+                    break
+                for sink in alive:
+                    sink.put(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, file_info['size'])
+    finally:
+        for sink in sinks:
+            ok, code, message = sink.finish()
+            if ok and done != file_info['size']:
+                ok, message = False, "로컬 파일 읽기가 끝까지 진행되지 않음"
+            results[sink.dest['name']] = (ok, code, sink.remote_file if ok else message)
+    return results
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업로드 기록 장부 (SQLite)
+
+녹화 파일마다 (경로, 크기, 수정시간) 기준으로 업로드 상태를 기록합니다.
+  discovered → uploading → uploaded → archived
+
+- 각 단계는 트랜잭션으로 기록되므로 중간에 죽어도 마지막 상태부터 재개
+- uploaded 상태 파일은 다시 전송하지 않고 이동(archive)만 수행
+- 파일 해시도 같은 키로 저장 (멀티 GB 파일을 다시 읽지 않도록)
+- 녹화 중 업로드(라이브 모드)한 조각 목록 저장 (재시작 시 이어서)
+- 전송 시도마다 결과(종료 코드, 실패 분류) 기록
+- 이어받기 업로드의 확정 위치(offset) 저장
+- 여러 원격으로 업로드할 때 원격별 완료 여부 기록
+- 겹쳐 실행된 업로드가 같은 파일을 보내지 않도록 파일별 점유(프로세스) 기록
+
+upload_recording.py에서 import해서 사용:
+    from upload_ledger import UploadLedger
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+# 상태값
+DISCOVERED = "discovered"
+UPLOADING = "uploading"
+UPLOADED = "uploaded"
+ARCHIVED = "archived"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT    NOT NULL,
+    name        TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    state       TEXT    NOT NULL,
+    remote      TEXT,
+    error       TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    updated_at  REAL    NOT NULL,
+    UNIQUE (path, size, mtime_ns)
+);
+CREATE INDEX IF NOT EXISTS idx_files_state ON files(state);
+CREATE TABLE IF NOT EXISTS digests (
+    path        TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    algo        TEXT    NOT NULL,
+    digest      TEXT    NOT NULL,
+    PRIMARY KEY (path, size, mtime_ns, algo)
+);
+CREATE TABLE IF NOT EXISTS live_parts (
+    path        TEXT    NOT NULL,
+    idx         INTEGER NOT NULL,
+    offset      INTEGER NOT NULL,
+    length      INTEGER NOT NULL,
+    crc32       TEXT    NOT NULL,
+    PRIMARY KEY (path, idx)
+);
+CREATE TABLE IF NOT EXISTS attempt_log (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    attempt     INTEGER NOT NULL,
+    started_at  REAL    NOT NULL,
+    duration    REAL    NOT NULL,
+    exit_code   INTEGER,
+    category    TEXT    NOT NULL,
+    error       TEXT
+);
+CREATE TABLE IF NOT EXISTS resume (
+    path        TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    remote      TEXT    NOT NULL,
+    offset      INTEGER NOT NULL,
+    updated_at  REAL    NOT NULL,
+    PRIMARY KEY (path, size, mtime_ns)
+);
+CREATE TABLE IF NOT EXISTS resume_ranges (
+    path        TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    idx         INTEGER NOT NULL,
+    start       INTEGER NOT NULL,
+    "end"       INTEGER NOT NULL,
+    offset      INTEGER NOT NULL,
+    PRIMARY KEY (path, size, mtime_ns, idx)
+);
+CREATE TABLE IF NOT EXISTS destinations (
+    path        TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    dest        TEXT    NOT NULL,
+    state       TEXT    NOT NULL,
+    remote      TEXT,
+    error       TEXT,
+    updated_at  REAL    NOT NULL,
+    PRIMARY KEY (path, size, mtime_ns, dest)
+);
+CREATE TABLE IF NOT EXISTS claims (
+    path        TEXT    PRIMARY KEY,
+    pid         INTEGER NOT NULL,
+    started     TEXT,
+    claimed_at  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attempt_log_path ON attempt_log(path, size, mtime_ns);
+"""
+
+
+def file_key(file_info):
+    """장부 키 (경로, 크기, 수정시간 ns)"""
+    return (
+        os.path.normcase(os.path.abspath(file_info['path'])),
+        int(file_info['size']),
+        int(file_info['mtime_ns']),
+    )
+
+
+class UploadLedger:
+    """업로드 상태 장부 (스레드 안전)"""
+
+    def __init__(self, db_path):
+        db_path = str(db_path)
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----------------------------------------
+    # 조회
+    # ----------------------------------------
+    def get(self, file_info):
+        """파일의 장부 레코드 (없으면 None)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT * FROM files WHERE path=? AND size=? AND mtime_ns=?",
+                file_key(file_info),
+            ).fetchone()
+
+    def get_state(self, file_info):
+        """파일의 현재 상태 (없으면 None)"""
+        row = self.get(file_info)
+        return row['state'] if row else None
+
+    def rows(self, state=None):
+        """상태별 레코드 목록"""
+        with self._lock:
+            if state is None:
+                return self._conn.execute("SELECT * FROM files ORDER BY id").fetchall()
+            return self._conn.execute(
+                "SELECT * FROM files WHERE state=? ORDER BY id", (state,)
+            ).fetchall()
+
+    # ----------------------------------------
+    # 상태 기록
+    # ----------------------------------------
+    def discover(self, file_info):
+        """새 파일 등록 (이미 있으면 그대로). 현재 상태 반환"""
+        path, size, mtime_ns = file_key(file_info)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO files (path, name, size, mtime_ns, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, file_info['name'], size, mtime_ns, DISCOVERED, time.time()),
+            )
+            row = self._conn.execute(
+                "SELECT state FROM files WHERE path=? AND size=? AND mtime_ns=?",
+                (path, size, mtime_ns),
+            ).fetchone()
+        return row['state']
+
+    def mark(self, file_info, state, remote=None, error=None):
+        """상태 변경 (트랜잭션)"""
+        path, size, mtime_ns = file_key(file_info)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO files (path, name, size, mtime_ns, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, file_info['name'], size, mtime_ns, state, time.time()),
+            )
+            self._conn.execute(
+                "UPDATE files SET state=?, remote=COALESCE(?, remote), error=?, "
+                "attempts=attempts + ?, updated_at=? "
+                "WHERE path=? AND size=? AND mtime_ns=?",
+                (state, remote, error, 1 if state == UPLOADING else 0, time.time(),
+                 path, size, mtime_ns),
+            )
+
+    def record_attempt(self, file_info, attempt, started_at, duration, exit_code, category, error=None):
+        """전송 시도 1회 기록 (category: success / temporary / unreachable / fatal ...)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO attempt_log (path, size, mtime_ns, attempt, started_at, duration, "
+                "exit_code, category, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                file_key(file_info) + (attempt, started_at, duration, exit_code, category, error),
+            )
+
+    def get_attempts(self, file_info):
+        """파일의 전송 시도 기록 (오래된 순)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT * FROM attempt_log WHERE path=? AND size=? AND mtime_ns=? ORDER BY id",
+                file_key(file_info),
+            ).fetchall()
+
+    # ----------------------------------------
+    # 원격별 상태 (여러 원격 업로드)
+    # ----------------------------------------
+    def get_destination_states(self, file_info):
+        """{원격 이름: 상태}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dest, state FROM destinations WHERE path=? AND size=? AND mtime_ns=?",
+                file_key(file_info),
+            ).fetchall()
+        return {row['dest']: row['state'] for row in rows}
+
+    def mark_destination(self, file_info, dest, state, remote=None, error=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO destinations "
+                "(path, size, mtime_ns, dest, state, remote, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                file_key(file_info) + (dest, state, remote, error, time.time()),
+            )
+
+    # ----------------------------------------
+    # 해시 캐시
+    # ----------------------------------------
+    def get_digests(self, file_info):
+        """저장된 해시 {알고리즘: digest}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT algo, digest FROM digests WHERE path=? AND size=? AND mtime_ns=?",
+                file_key(file_info),
+            ).fetchall()
+        return {row['algo']: row['digest'] for row in rows}
+
+    def put_digests(self, file_info, digests):
+        """해시 저장"""
+        key = file_key(file_info)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO digests (path, size, mtime_ns, algo, digest) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [key + (algo, digest) for algo, digest in digests.items()],
+            )
+
+    # ----------------------------------------
+    # 이어받기 업로드 위치
+    # ----------------------------------------
+    def get_resume(self, file_info):
+        """
+        {'remote': 원격 임시 경로, 'offset': 시작 시 확정된 바이트,
+         'ranges': {구간 번호: {'start', 'end', 'offset'}}} (없으면 None)
+        """
+        key = file_key(file_info)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT remote, offset FROM resume WHERE path=? AND size=? AND mtime_ns=?", key,
+            ).fetchone()
+            ranges = self._conn.execute(
+                'SELECT idx, start, "end", offset FROM resume_ranges '
+                "WHERE path=? AND size=? AND mtime_ns=?", key,
+            ).fetchall()
+        if not row:
+            return None
+        result = dict(row)
+        result['ranges'] = {r['idx']: {'start': r['start'], 'end': r['end'], 'offset': r['offset']}
+                            for r in ranges}
+        return result
+
+    def put_resume(self, file_info, remote, offset):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resume (path, size, mtime_ns, remote, offset, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                file_key(file_info) + (remote, offset, time.time()),
+            )
+
+    def put_range(self, file_info, idx, start, end, offset):
+        """구간별 확정 위치 저장 (여러 연결로 동시 전송 시 구간마다)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO resume_ranges (path, size, mtime_ns, idx, start, "end", offset) '
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                file_key(file_info) + (idx, start, end, offset),
+            )
+
+    def clear_resume(self, file_info):
+        key = file_key(file_info)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM resume WHERE path=? AND size=? AND mtime_ns=?", key)
+            self._conn.execute("DELETE FROM resume_ranges WHERE path=? AND size=? AND mtime_ns=?", key)
+
+    # ----------------------------------------
+    # 라이브 업로드 조각 (쓰는 중인 파일이라 경로만 키로 사용)
+    # ----------------------------------------
+    def get_live_parts(self, path):
+        """{조각 번호: {'offset', 'length', 'crc32'}}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, offset, length, crc32 FROM live_parts WHERE path=?",
+                (os.path.normcase(os.path.abspath(path)),),
+            ).fetchall()
+        return {row['idx']: dict(row) for row in rows}
+
+    def put_live_part(self, path, idx, offset, length, crc32):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO live_parts (path, idx, offset, length, crc32) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (os.path.normcase(os.path.abspath(path)), idx, offset, length, crc32),
+            )
+
+    def clear_live_parts(self, path):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM live_parts WHERE path=?",
+                (os.path.normcase(os.path.abspath(path)),),
+            )
+
+    # ----------------------------------------
+    # 작업 점유 (겹쳐 실행된 업로드끼리, 경로만 키로 사용)
+    # ----------------------------------------
+    def try_claim(self, path, pid, started, is_stale):
+        """
+        파일 점유. 비어 있거나 점유한 프로세스가 이미 끝났으면 가져옴
+
+        Args:
+            started: 프로세스 시작 시각 표기 (PID 재사용 구분용, 모르면 None)
+            is_stale: callback(점유 레코드) → 점유한 프로세스가 끝났는지
+
+        Returns:
+            (성공 여부, 다른 프로세스의 점유 레코드 또는 None)
+        """
+        key = os.path.normcase(os.path.abspath(path))
+        for _ in range(3):
+            with self._lock, self._conn:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO claims (path, pid, started, claimed_at) VALUES (?, ?, ?, ?)",
+                    (key, pid, started, time.time()),
+                )
+                if cur.rowcount:
+                    return True, None
+                row = self._conn.execute("SELECT * FROM claims WHERE path=?", (key,)).fetchone()
+            if row is None:
+                continue   # 그사이 해제됨 → 다시 시도
+            if row['pid'] == pid and row['started'] == started:
+                return True, None
+            if not is_stale(row):
+                return False, row
+
+            # 끝난 프로세스의 점유 → 그 레코드가 그대로일 때만 가져옴 (다른 실행과 경쟁 방지)
+            with self._lock, self._conn:
+                cur = self._conn.execute(
+                    "UPDATE claims SET pid=?, started=?, claimed_at=? "
+                    "WHERE path=? AND pid=? AND started IS ?",
+                    (pid, started, time.time(), key, row['pid'], row['started']),
+                )
+            if cur.rowcount:
+                return True, row
+        return False, None
+
+    def release_claim(self, path, pid):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM claims WHERE path=? AND pid=?",
+                (os.path.normcase(os.path.abspath(path)), pid),
+            )
+
+    def release_claims(self, pid):
+        """프로세스가 점유한 파일 전부 해제"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM claims WHERE pid=?", (pid,))
+
+    def get_claim(self, path):
+        """파일 점유 레코드 (없으면 None)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT * FROM claims WHERE path=?", (os.path.normcase(os.path.abspath(path)),)
+            ).fetchone()
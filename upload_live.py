@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+녹화 중 업로드 (라이브 모드)
+
+OBS가 아직 쓰고 있는 녹화 파일을 고정 크기 조각(part)으로 나눠, 다 써진 조각부터 먼저 올립니다.
+녹화가 끝나면 모든 조각을 다시 해시해서 바뀐 조각(OBS가 마지막에 다시 쓰는 파일 앞부분의
+헤더 등)과 마지막 조각만 추가로 올리고, 조각 목록(manifest)을 올려 서버에 등록합니다.
+
+원격 구조:
+    {remote}/.live/{파일명}/part-00000, part-00001, ...
+    {remote}/{파일명}.manifest.json
+
+서버에서 조각 합치기:
+    python upload_live.py --stitch /recordings/강의장/파일명.mp4.manifest.json
+
+OBS 자동 파일 분할(split) 기능을 쓰는 경우 각 분할 파일이 완성된 파일이므로
+감시 모드(--watch)만으로 분할 파일이 끝날 때마다 바로 올라갑니다.
+
+upload_recording.py에서 import해서 사용:
+    from upload_live import LiveIngest
+"""
+
+import os
+import sys
+import json
+import zlib
+import argparse
+import subprocess
+from datetime import datetime
+
+from obs_governor import FULL
+from bandwidth_schedule import lower_limit
+
+PART_NAME = "part-{:05d}"
+
+
+def crc32_of(data):
+    return f"{zlib.crc32(data) & 0xFFFFFFFF:08x}"
+
+
+def read_part(path, offset, length):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+class LiveIngest:
+    """
+    녹화 중인 파일의 조각 업로드 관리
+
+    config.yaml:
+        live:
+          part_mb: 256         # 조각 크기(MB)
+          margin_mb: 16        # 파일 끝에서 이만큼은 아직 쓰는 중으로 간주
+
+    destinations가 있으면 조각/manifest를 모든 원격으로 보내고 필수 원격마다 검증
+    """
+
+    def __init__(self, config, ledger, remote_path, bwlimit="off", logger=None, destinations=None,
+                 governor=None, current_limit=None):
+        live_cfg = config.get('live') or {}
+        self.part_size = int(live_cfg.get('part_mb', 256) * 1024 * 1024)
+        self.margin = int(live_cfg.get('margin_mb', 16) * 1024 * 1024)
+        self.ledger = ledger
+        self.remote_path = remote_path
+        self.bwlimit = bwlimit
+        self.logger = logger
+        # OBS 녹화 중 조절기 (obs_governor.IoGovernor) + 지금 시간대의 대역폭 제한 (rclone 표기)
+        self.governor = governor
+        self.current_limit = current_limit
+        # 조각을 보낼 원격 [(이름, 원격 경로, 대역폭, 필수 여부)] (destinations가 있으면 모든 원격)
+        if destinations:
+            self.targets = [(d['name'], d['remote'], d['bwlimit'], d['required']) for d in destinations]
+            self.remote_path = destinations[0]['remote']
+        else:
+            self.targets = [(None, remote_path, bwlimit, True)]
+
+    def _log(self, msg, level="info"):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+    def parts_dir(self, name, remote_path=None):
+        return f"{remote_path or self.remote_path}.live/{name}/"
+
+    def _rcat(self, remote_file, data, bwlimit="off"):
+        """rclone rcat으로 바이트 업로드 (OBS 녹화 중이면 낮은 우선순위)"""
+        cmd = ['rclone', 'rcat', remote_file, '--size', str(len(data))]
+        if bwlimit and bwlimit != 'off':
+            cmd.extend(['--bwlimit', bwlimit])
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   **(self.governor.popen_kwargs() if self.governor else {}))
+        if self.governor:
+            self.governor.track(process)
+        try:
+            _, stderr = process.communicate(data)
+        finally:
+            if self.governor:
+                self.governor.untrack(process)
+        if process.returncode != 0:
+            err = stderr.decode('utf-8', errors='replace').strip()[-200:]
+            raise RuntimeError(f"rclone rcat 오류 (코드: {process.returncode}): {err}")
+
+    def _send(self, relative, data):
+        """
+        모든 원격으로 업로드 (선택 원격 실패는 경고만, 필수 원격 실패는 예외)
+
+        OBS 녹화 중이면 조절기에 따라 녹화가 끝날 때까지 기다리거나 속도를 낮춤
+
+        Args:
+            relative: 원격 폴더 기준 경로 (예: ".live/파일명/part-00000")
+        """
+        governor = self.governor
+        if governor:
+            waited = governor.wait()
+            if waited >= 1:
+                self._log(f"[라이브] OBS 녹화 중 대기 {waited:.0f}초: {relative}")
+        for dest, remote_path, bwlimit, required in self.targets:
+            if dest is not None and self.current_limit:
+                # 원격별 고정 제한과 지금 시간대 제한 중 낮은 값
+                bwlimit = lower_limit(bwlimit, self.current_limit())
+            if governor and governor.level != FULL:
+                # 녹화 중이면 지금 제한과 녹화 중 제한 중 낮은 값 (기본 원격은 시간대별 타임테이블 대신 지금 값)
+                if dest is None:
+                    bwlimit = self.current_limit() if self.current_limit else 'off'
+                bwlimit = governor.limit(bwlimit)
+            try:
+                self._rcat(remote_path + relative, data, bwlimit)
+            except RuntimeError as e:
+                if required:
+                    raise
+                self._log(f"[라이브] [{dest}] 업로드 실패 (선택 원격): {relative} - {e}", "warning")
+
+    def _ship(self, path, name, idx, offset, length):
+        data = read_part(path, offset, length)
+        crc = crc32_of(data)
+        self._send(f".live/{name}/{PART_NAME.format(idx)}", data)
+        self.ledger.put_live_part(path, idx, offset, len(data), crc)
+        return crc
+
+    def has_parts(self, path):
+        return bool(self.ledger.get_live_parts(path))
+
+    def poll(self, path):
+        """
+        쓰는 중인 파일에서 다 써진 조각 업로드
+
+        Returns:
+            이번에 올린 조각 수
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return 0
+
+        name = os.path.basename(path)
+        shipped = self.ledger.get_live_parts(path)
+        sent = 0
+        idx = 0
+        while (idx + 1) * self.part_size + self.margin <= size:
+            if idx not in shipped:
+                self._ship(path, name, idx, idx * self.part_size, self.part_size)
+                self._log(f"[라이브] 조각 업로드: {name} #{idx}")
+                sent += 1
+            idx += 1
+        return sent
+
+    def finalize(self, file_info):
+        """
+        녹화 완료 후 바뀐 조각/남은 조각 업로드 + manifest 등록
+
+        Returns:
+            manifest 원격 경로
+        """
+        path = file_info['path']
+        name = file_info['name']
+        size = file_info['size']
+        shipped = self.ledger.get_live_parts(path)
+
+        parts = []
+        resent = 0
+        offset = 0
+        idx = 0
+        while offset < size:
+            length = min(self.part_size, size - offset)
+            data = read_part(path, offset, length)
+            crc = crc32_of(data)
+            old = shipped.get(idx)
+            if old is None or old['length'] != length or old['crc32'] != crc:
+                self._send(f".live/{name}/{PART_NAME.format(idx)}", data)
+                self.ledger.put_live_part(path, idx, offset, length, crc)
+                resent += 1
+            parts.append({'name': PART_NAME.format(idx), 'offset': offset, 'length': length, 'crc32': crc})
+            offset += length
+            idx += 1
+
+        manifest = {
+            'file': name,
+            'size': size,
+            'part_size': self.part_size,
+            'parts_dir': f".live/{name}",
+            'parts': parts,
+            'created': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._send(f"{name}.manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+        manifest_remote = f"{self.remote_path}{name}.manifest.json"
+        self._log(f"[라이브] 완료: {name} (조각 {len(parts)}개, 녹화 후 전송 {resent}개)")
+        return manifest_remote
+
+    def verify(self, file_info, verify_cfg=None):
+        """
+        원격 조각 확인 (원격마다 한 번의 목록 조회). 필수 원격이 모두 통과해야 통과
+
+        verify_cfg에 hash가 있으면 조각마다 로컬 해시를 계산해 원격 해시와 비교
+
+        Returns:
+            (통과 여부, 사유)
+        """
+        from upload_verify import list_remote, _new_hasher
+        from upload_ledger import UPLOADED
+
+        parts = self.ledger.get_live_parts(file_info['path'])
+        if sum(p['length'] for p in parts.values()) != file_info['size']:
+            return False, "조각 합계 크기 불일치"
+
+        hash_type = (verify_cfg or {}).get('hash')
+        require_hash = (verify_cfg or {}).get('require_hash', False)
+        names = [PART_NAME.format(idx) for idx in sorted(parts)]
+        local_hashes = {}
+
+        def local_hash(idx):
+            if idx not in local_hashes:
+                h = _new_hasher(hash_type)
+                h.update(read_part(file_info['path'], parts[idx]['offset'], parts[idx]['length']))
+                local_hashes[idx] = h.hexdigest()
+            return local_hashes[idx]
+
+        reasons = []
+        for dest, remote_path, _, required in self.targets:
+            label = f"{dest}: " if dest else ""
+            problem = None
+            hashed = 0
+            try:
+                listing = list_remote(self.parts_dir(file_info['name'], remote_path), names, hash_type)
+            except RuntimeError as e:
+                listing = {}
+                problem = f"원격 조회 실패: {e}"
+            for idx in sorted(parts) if problem is None else ():
+                remote = listing.get(PART_NAME.format(idx))
+                if remote is None or remote['size'] != parts[idx]['length']:
+                    problem = f"조각 #{idx} 불일치"
+                    break
+                remote_hash = remote['hashes'].get(hash_type) if hash_type else None
+                if hash_type and remote_hash is None:
+                    if require_hash:
+                        problem = f"원격이 {hash_type} 해시를 지원하지 않음"
+                        break
+                    continue
+                if remote_hash is not None:
+                    if remote_hash != local_hash(idx):
+                        problem = f"조각 #{idx} {hash_type} 불일치"
+                        break
+                    hashed += 1
+
+            if problem:
+                if required:
+                    return False, f"{label}{problem}"
+                self._log(f"[라이브] [{dest}] 검증 실패 (선택 원격): {file_info['name']} - {problem}", "warning")
+                reasons.append(f"{label}{problem}")
+                continue
+            if dest:
+                self.ledger.mark_destination(file_info, dest, UPLOADED,
+                                             remote=f"{remote_path}{file_info['name']}.manifest.json")
+            what = f"{hash_type} 일치" if hashed == len(parts) and hashed else "크기 일치"
+            reasons.append(f"{label}조각 {len(parts)}개 {what}")
+        return True, ', '.join(reasons)
+
+
+def stitch(manifest_path, output=None):
+    """
+    (서버에서 실행) manifest에 따라 조각을 합쳐 원본 파일 복원
+
+    Returns:
+        출력 파일 경로
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    parts_dir = os.path.join(base, manifest['parts_dir'])
+    output = output or os.path.join(base, manifest['file'])
+    tmp = output + ".stitching"
+
+    with open(tmp, 'wb') as out:
+        for part in manifest['parts']:
+            with open(os.path.join(parts_dir, part['name']), 'rb') as f:
+                data = f.read()
+            if len(data) != part['length'] or crc32_of(data) != part['crc32']:
+                out.close()
+                os.remove(tmp)
+                raise ValueError(f"조각 손상: {part['name']}")
+            out.write(data)
+
+    if os.path.getsize(tmp) != manifest['size']:
+        os.remove(tmp)
+        raise ValueError("합친 파일 크기 불일치")
+    os.replace(tmp, output)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description='라이브 업로드 조각 합치기 (서버용)')
+    parser.add_argument('--stitch', metavar='MANIFEST', required=True, help='manifest.json 경로')
+    parser.add_argument('--output', help='출력 파일 (기본: manifest 옆 원래 파일명)')
+    parser.add_argument('--cleanup', action='store_true', help='합친 후 조각 폴더/manifest 삭제')
+    args = parser.parse_args()
+
+    try:
+        output = stitch(args.stitch, args.output)
+    except (OSError, ValueError) as e:
+        print(f"✗ 합치기 실패: {e}")
+        sys.exit(1)
+    print(f"✓ 합치기 완료: {output}")
+
+    if args.cleanup:
+        import shutil
+        with open(args.stitch, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        shutil.rmtree(os.path.join(os.path.dirname(os.path.abspath(args.stitch)), manifest['parts_dir']))
+        os.remove(args.stitch)
+
+
+if __name__ == "__main__":
+    main()
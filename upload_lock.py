@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업로드 중복 실행 방지 (실행 잠금 + 파일별 점유)
+
+작업 스케줄러가 10분마다 실행하는데 큰 파일 업로드가 10분을 넘기면 다음 실행이 같은 파일을
+또 보내게 됩니다. 이를 막기 위해
+  - 실행 잠금: state/upload.lock을 OS 파일 잠금으로 잡음 (프로세스가 죽으면 OS가 자동 해제)
+  - 파일별 점유: 장부의 claims 테이블에 (경로, PID, 프로세스 시작 시각) 기록.
+    점유한 프로세스가 이미 끝났으면(PID 없음 또는 다른 프로세스가 PID 재사용) 가져옴
+
+config.yaml:
+    run_lock:
+      on_busy: "exit"       # exit = 다른 실행이 있으면 바로 종료 / share = 점유되지 않은 파일만 업로드
+
+upload_recording.py에서 import해서 사용:
+    from upload_lock import RunLock, ClaimOwner
+"""
+
+import os
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# Windows 잠금 위치 (PID를 적는 앞부분과 겹치지 않게 파일 끝 너머 1바이트를 잠금)
+_LOCK_OFFSET = 1024
+
+
+# ============================================
+# 프로세스 확인
+# ============================================
+def _win_process_handle(pid):
+    import ctypes
+    from ctypes import wintypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    return kernel32, kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+
+
+def pid_alive(pid):
+    """PID가 실행 중인 프로세스인지"""
+    if pid <= 0:
+        return False
+    if os.name == 'nt':
+        # os.kill(pid, 0)은 Windows에서 프로세스를 종료시키므로 사용하지 않음
+        import ctypes
+        from ctypes import wintypes
+
+        STILL_ACTIVE = 259
+        kernel32, handle = _win_process_handle(pid)
+        if not handle:
+            # 권한 부족이면 살아 있는 것으로 간주
+            return ctypes.get_last_error() == 5
+        try:
+            code = wintypes.DWORD()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            return code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def process_started(pid):
+    """
+    프로세스 시작 시각 표기 (PID 재사용 구분용, 알 수 없으면 None)
+    """
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32, handle = _win_process_handle(pid)
+        if not handle:
+            return None
+        try:
+            created, exited, kernel, user = (wintypes.FILETIME() for _ in range(4))
+            if not kernel32.GetProcessTimes(handle, ctypes.byref(created), ctypes.byref(exited),
+                                            ctypes.byref(kernel), ctypes.byref(user)):
+                return None
+            return str((created.dwHighDateTime << 32) | created.dwLowDateTime)
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            # comm에 공백/괄호가 들어갈 수 있으므로 마지막 ')' 뒤부터 (22번째 필드 = starttime)
+            return f.read().rsplit(')', 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+# ============================================
+# 실행 잠금
+# ============================================
+class RunLock:
+    """한 번에 하나의 업로드 실행만 잡을 수 있는 잠금 파일"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._f = None
+
+    def acquire(self):
+        """잠금 시도 (기다리지 않음). 잡았으면 True"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        f = open(self.path, 'a+')
+        try:
+            if os.name == 'nt':
+                f.seek(_LOCK_OFFSET)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._f = f
+        return True
+
+    def holder(self):
+        """잠금을 잡은 프로세스 PID (모르면 None)"""
+        try:
+            with open(self.path, 'r') as f:
+                return int(f.read(32).strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+    def release(self):
+        if self._f is None:
+            return
+        try:
+            if os.name == 'nt':
+                self._f.seek(_LOCK_OFFSET)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+# ============================================
+# 파일별 점유
+# ============================================
+class ClaimOwner:
+    """현재 프로세스 이름으로 장부에 파일 점유 기록"""
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.pid = os.getpid()
+        self.started = process_started(self.pid)
+
+    @staticmethod
+    def is_stale(row):
+        """점유한 프로세스가 끝났는지 (PID가 다른 프로세스에 재사용된 경우 포함)"""
+        if not pid_alive(row['pid']):
+            return True
+        started = process_started(row['pid'])
+        return bool(row['started'] and started and started != row['started'])
+
+    def claim(self, file_info):
+        """
+        Returns:
+            (성공 여부, 다른 프로세스의 점유 레코드 또는 None)
+        """
+        return self.ledger.try_claim(file_info['path'], self.pid, self.started, self.is_stale)
+
+    def claimed_by_other(self, file_info):
+        """다른 실행 중인 프로세스가 점유했으면 그 PID (아니면 None)"""
+        row = self.ledger.get_claim(file_info['path'])
+        if row is None or row['pid'] == self.pid or self.is_stale(row):
+            return None
+        return row['pid']
+
+    def release(self, file_info):
+        self.ledger.release_claim(file_info['path'], self.pid)
+
+    def release_all(self):
+        self.ledger.release_claims(self.pid)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업로드 순서 결정 + 기한 내 완료 예측
+
+config.yaml:
+    queue:
+      policy: "oldest"           # oldest / newest / smallest / largest
+      priority:                  # 파일명 패턴별 우선순위 (높을수록 먼저)
+        - pattern: "*특강*"
+          priority: 10
+      deadline: "08:50"          # 이 시각까지 끝나야 함 (지났으면 다음 날)
+      expected_speed: "10M"      # 예상 업로드 속도 (없으면 최근 전송 기록 평균)
+
+녹화 파일 옆에 "파일명.priority" 파일(숫자 한 줄)을 두면 패턴보다 우선합니다.
+
+upload_recording.py에서 import해서 사용:
+    from upload_queue import order_files, UploadQueue, estimate_finish
+"""
+
+import json
+import heapq
+import fnmatch
+import threading
+import itertools
+from datetime import datetime, timedelta
+
+from bandwidth_schedule import limit_at, parse_rate
+
+POLICIES = {
+    'oldest': lambda f: (f.get('mtime_ns', 0),),
+    'newest': lambda f: (-f.get('mtime_ns', 0),),
+    'smallest': lambda f: (f['size'],),
+    'largest': lambda f: (-f['size'],),
+}
+
+
+def read_sidecar_priority(path):
+    """녹화 파일 옆 .priority 파일의 우선순위 (없으면 None)"""
+    try:
+        with open(path + '.priority', 'r', encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return None
+
+
+def file_priority(file_info, rules):
+    """파일 우선순위 (사이드카 > 패턴 > 0)"""
+    sidecar = read_sidecar_priority(file_info['path'])
+    if sidecar is not None:
+        return sidecar
+    for rule in rules or []:
+        if fnmatch.fnmatch(file_info['name'], rule.get('pattern', '')):
+            return int(rule.get('priority', 0))
+    return 0
+
+
+def make_sort_key(config):
+    """정렬 키 함수 (우선순위 높은 것 먼저, 같으면 정책 순)"""
+    queue_cfg = config.get('queue') or {}
+    policy = queue_cfg.get('policy', 'oldest')
+    if policy not in POLICIES:
+        raise ValueError(f"알 수 없는 queue.policy: {policy} ({', '.join(POLICIES)})")
+    rules = queue_cfg.get('priority') or []
+    policy_key = POLICIES[policy]
+
+    def key(file_info):
+        return (-file_priority(file_info, rules),) + policy_key(file_info) + (file_info['name'],)
+
+    return key
+
+
+def order_files(config, files):
+    """업로드 순서대로 정렬"""
+    return sorted(files, key=make_sort_key(config))
+
+
+class UploadQueue:
+    """
+    우선순위 작업 대기열 (감시 모드용, 스레드 안전)
+
+    put(item, key)로 넣고 get()은 key가 가장 작은 항목부터. None은 종료 신호(항상 마지막).
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._count = itertools.count()
+        self._cond = threading.Condition()
+
+    def put(self, item, key=()):
+        with self._cond:
+            order = (1,) if item is None else (0,) + tuple(key)
+            heapq.heappush(self._heap, (order, next(self._count), item))
+            self._cond.notify()
+
+    def get(self):
+        with self._cond:
+            while not self._heap:
+                self._cond.wait()
+            return heapq.heappop(self._heap)[2]
+
+
+# ============================================
+# 기한 내 완료 예측
+# ============================================
+def parse_deadline(value, now=None):
+    """"HH:MM" → 다음 해당 시각 datetime"""
+    now = now or datetime.now()
+    h, m = str(value).split(':')
+    deadline = now.replace(hour=int(h), minute=int(m), second=0, microsecond=0)
+    if deadline <= now:
+        deadline += timedelta(days=1)
+    return deadline
+
+
+def recent_speed(log_dir, days=7, samples=20):
+    """최근 전송 기록(throughput_*.jsonl)의 평균 속도 중앙값 (bytes/s, 없으면 None)"""
+    speeds = []
+    today = datetime.now()
+    for i in range(days):
+        path = log_dir / f"throughput_{(today - timedelta(days=i)).strftime('%Y%m%d')}.jsonl"
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('success') and entry.get('avg_speed'):
+                    speeds.append(entry['avg_speed'])
+    speeds = speeds[-samples:]
+    if not speeds:
+        return None
+    speeds.sort()
+    return speeds[len(speeds) // 2]
+
+
+def estimate_finish(files, speed, rules, default_limit, start=None):
+    """
+    순서대로 업로드할 때 파일별 예상 완료 시각
+
+    분 단위로 min(예상 속도, 그 시간대 대역폭 제한)만큼 전송된다고 가정
+
+    Returns:
+        [(file_info, 예상 완료 datetime)]
+    """
+    now = start or datetime.now()
+    t = now
+    carry = 0.0  # 현재 분에서 이미 쓴 바이트
+    result = []
+    for file_info in files:
+        remaining = float(file_info['size'])
+        while remaining > 0:
+            limit = parse_rate(limit_at(rules, default_limit, t.weekday(), t.hour * 60 + t.minute))
+            rate = speed if limit is None else min(speed, limit)
+            minute_end = t.replace(second=0, microsecond=0) + timedelta(minutes=1)
+            budget = rate * (minute_end - t).total_seconds() - carry
+            if rate <= 0 or budget <= 0:
+                t, carry = minute_end, 0.0
+                continue
+            if remaining <= budget:
+                t = t + timedelta(seconds=remaining / rate)
+                carry = 0.0
+                remaining = 0
+            else:
+                remaining -= budget
+                t, carry = minute_end, 0.0
+            if t - now > timedelta(days=30):
+                t = datetime.max
+                break
+        result.append((file_info, t))
+    return result
@@ -3,31 +3,81 @@
 """
 강의장 녹화 파일 업로드 (EST/Jellyfin용)
 
-- 녹화 폴더에서 새 파일 감지
+- 녹화 폴더에서 새 파일 감지 (쓰기 완료 판정 후)
 - rclone으로 서버 업로드 (진행률 표시)
-- 업로드 완료 파일 이동
+- 여러 원격(백업 등)으로 동시 업로드, 원본은 한 번만 읽음 (destinations)
+- 여러 파일 동시 업로드 (--jobs, adaptive로 처리량에 맞춰 자동 조절)
+- 상주 rclone rcd 사용 시 SFTP 연결 재사용 (rclone.mode: rc)
+- 시간대별 대역폭 제한 (rclone.bandwidth_schedule)
+- OBS 녹화 중에는 업로드를 멈추거나 속도/우선순위를 낮춤 (obs_governor)
+- 업로드 후 원격 해시/크기 검증 (로컬 해시는 장부에 캐시)
+- 업로드 순서 정책/우선순위 + 마감 시각 내 완료 예측 (queue)
+- 일시적 실패는 지수 백오프로 재시도, 서버 연결이 안 되면 남은 파일 전송 중단 (retry)
+- 대용량 파일은 끊겨도 이어서 전송 (resume), 여러 연결로 나눠 전송 (multistream)
+- 업로드 완료 파일 이동 (다른 드라이브면 백그라운드, archive), 디스크가 차면 원격 확인된 오래된 파일부터 삭제 (retention)
+- 업로드 상태 장부(SQLite)로 중복 업로드 방지 및 중단 후 재개
+- 작업 스케줄러로 겹쳐 실행되면 바로 종료하거나 맡지 않은 파일만 업로드 (run_lock)
+- 서버에 이미 있는 파일은 원격 목록 캐시와 비교해 건너뜀 (inventory)
+- 감시 모드: 녹화가 끝나는 즉시 업로드 (--watch)
+- 라이브 모드: 녹화 중에도 다 써진 조각부터 업로드 (--live)
 
 사용법:
-  python upload_recording.py          # 대화형 모드
-  python upload_recording.py --auto   # 자동 모드 (작업 스케줄러용)
+  python upload_recording.py             # 대화형 모드
+  python upload_recording.py --auto      # 자동 모드 (작업 스케줄러용)
+  python upload_recording.py --jobs 3    # 3개 파일 동시 업로드
+  python upload_recording.py --watch     # 감시 모드 (상주 실행)
+  python upload_recording.py --live      # 라이브 모드 (감시 + 녹화 중 조각 업로드)
+  python upload_recording.py --cleanup   # 디스크 공간 정리만 실행
 """
 
 import os
-import re
 import sys
 import time
 import shutil
 import logging
 import argparse
+import threading
 import subprocess
 import yaml
 from pathlib import Path
 from datetime import datetime
 
+from upload_ledger import UploadLedger, UPLOADING, UPLOADED, ARCHIVED, DISCOVERED
+from upload_watch import make_watcher
+from upload_complete import CompletionDetector
+from rclone_rc import ensure_daemon
+from bandwidth_schedule import parse_schedule, parse_rate, current_limit, to_rclone_timetable, BandwidthUpdater
+from upload_live import LiveIngest
+from upload_queue import order_files, make_sort_key, UploadQueue, parse_deadline, recent_speed, estimate_finish
+from upload_resume import ResumableUploader, make_transport, sftp_settings_from_rclone, PARAMIKO_AVAILABLE
+from upload_concurrency import AimdController
+from upload_fanout import get_destinations, tee_upload
+from remote_inventory import RemoteInventory
+from upload_retention import RetentionEngine
+from upload_archive import same_volume, ArchiveMover
+from upload_lock import RunLock, ClaimOwner
+from obs_governor import IoGovernor, FULL, PAUSE
+from upload_retry import RetryPolicy, classify_failure, get_breaker
+from upload_verify import get_verify_config, get_digests, verify_remote
+from rclone_stats import TransferStats, ThroughputLog, parse_log_line, is_retry_message
+
 # 설정 파일 경로
 SCRIPT_DIR = Path(__file__).parent
 CONFIG_PATH = SCRIPT_DIR / "config.yaml"
 LOG_DIR = SCRIPT_DIR / "logs"
+STATE_DIR = SCRIPT_DIR / "state"
+
+# 파일별 전송 결과 기록 (logs/throughput_YYYYMMDD.jsonl)
+THROUGHPUT = ThroughputLog(LOG_DIR)
+
+# 동시 업로드 시 콘솔 출력이 섞이지 않도록
+print_lock = threading.Lock()
+
+
+def console(msg='', **kwargs):
+    """스레드 안전 콘솔 출력"""
+    with print_lock:
+        print(msg, **kwargs)
 
 
 def setup_logging(auto_mode=False):
@@ -60,49 +110,70 @@ def load_config():
         return yaml.safe_load(f)
 
 
-def get_new_files(config):
-    """업로드할 새 파일 목록"""
+def open_ledger(config):
+    """업로드 장부 열기"""
+    return UploadLedger(config.get('ledger_path', STATE_DIR / "upload_ledger.db"))
+
+
+def make_file_info(path, st):
+    """업로드 대상 파일 정보"""
+    return {
+        'name': os.path.basename(path),
+        'path': path,
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+    }
+
+
+def get_new_files(config, ledger, detector=None):
+    """업로드할 새 파일 목록 (장부에서 archived 상태인 파일 제외, 쓰기 완료된 파일만)"""
     recording_folder = config['recording_folder']
-    uploaded_folder = config.get('uploaded_folder', os.path.join(recording_folder, 'uploaded'))
     extensions = config.get('extensions', ['.mp4', '.mkv'])
+    if detector is None:
+        detector = CompletionDetector.from_config(config)
 
-    # 업로드 완료 폴더 생성
-    os.makedirs(uploaded_folder, exist_ok=True)
+    # 후보 파일 찾기
+    candidates = []
+    with os.scandir(recording_folder) as entries:
+        for entry in entries:
+            # 파일인지 확인
+            if not entry.is_file():
+                continue
 
-    # 이미 업로드된 파일 목록
-    uploaded_files = set()
-    if os.path.exists(uploaded_folder):
-        uploaded_files = set(os.listdir(uploaded_folder))
+            # 확장자 확인
+            ext = os.path.splitext(entry.name)[1].lower()
+            if ext not in extensions:
+                continue
 
-    # 새 파일 찾기
-    new_files = []
-    for file in os.listdir(recording_folder):
-        file_path = os.path.join(recording_folder, file)
+            file_info = make_file_info(entry.path, entry.stat())
 
-        # 파일인지 확인
-        if not os.path.isfile(file_path):
-            continue
+            # 장부 확인 (이미 처리 완료된 파일 제외)
+            if ledger.get_state(file_info) == ARCHIVED:
+                continue
 
-        # 확장자 확인
-        ext = os.path.splitext(file)[1].lower()
-        if ext not in extensions:
-            continue
+            candidates.append(file_info)
+
+    if not candidates:
+        return []
+
+    # 파일이 아직 쓰기 중인지 확인 (크기 안정성 + 배타적 열기 + 컨테이너 검사)
+    checks = detector.filter_complete([f['path'] for f in candidates])
 
-        # 이미 업로드된 파일 제외
-        if file in uploaded_files:
+    new_files = []
+    for file_info in candidates:
+        ok, reason = checks.get(file_info['path'], (False, "파일 없음"))
+        if not ok:
+            print(f"  건너뜀 ({reason}): {file_info['name']}")
             continue
 
-        # 파일이 아직 쓰기 중인지 확인 (최근 수정 시간)
-        mtime = os.path.getmtime(file_path)
-        if time.time() - mtime < 60:  # 1분 이내 수정된 파일은 건너뜀
-            print(f"  건너뜀 (쓰기 중): {file}")
+        # 샘플링 이후 값으로 다시 기록
+        file_info = make_file_info(file_info['path'], os.stat(file_info['path']))
+        state = ledger.discover(file_info)
+        if state == ARCHIVED:
             continue
 
-        new_files.append({
-            'name': file,
-            'path': file_path,
-            'size': os.path.getsize(file_path)
-        })
+        file_info['state'] = state
+        new_files.append(file_info)
 
     return new_files
 
@@ -116,46 +187,178 @@ def format_size(size_bytes):
     return f"{size_bytes:.1f}PB"
 
 
-def upload_with_rclone(config, file_info):
-    """rclone으로 파일 업로드"""
-    file_name = file_info['name']
-    file_path = file_info['path']
-    file_size = file_info['size']
+def format_eta(seconds):
+    """남은 시간 포맷 (rclone 표기와 비슷하게)"""
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h{m}m{s}s"
+    if m:
+        return f"{m}m{s}s"
+    return f"{s}s"
 
-    remote_name = config.get('rclone', {}).get('remote_name', 'est-sftp')
-    bandwidth_limit = config.get('rclone', {}).get('bandwidth_limit', '0')
+
+def get_remote_dir(config):
+    """업로드 대상 서버 폴더 (remote 이름 없이)"""
     remote_path_base = config.get('rclone', {}).get('remote_path', '/recordings')
     folder_name = config.get('folder_name', '')
 
-    # 원격 경로
     if folder_name:
-        remote_path = f"{remote_name}:{remote_path_base}/{folder_name}/"
+        return f"{remote_path_base}/{folder_name}"
+    return remote_path_base
+
+
+def get_remote_path(config):
+    """업로드 대상 원격 경로 (remote:경로/)"""
+    remote_name = config.get('rclone', {}).get('remote_name', 'est-sftp')
+    return f"{remote_name}:{get_remote_dir(config)}/"
+
+
+def print_upload_start(file_info, remote_path, show_bar):
+    """업로드 시작 안내 출력"""
+    if show_bar:
+        console(f"\n업로드 시작: {file_info['name']}")
+        console(f"  크기: {format_size(file_info['size'])}")
+        console(f"  대상: {remote_path}")
+        console("-" * 50)
     else:
-        remote_path = f"{remote_name}:{remote_path_base}/"
+        console(f"  [{file_info['name']}] 업로드 시작 ({format_size(file_info['size'])}) -> {remote_path}")
+
+
+def progress_printer(file_name, show_bar):
+    """
+    진행률 출력 함수 생성
+
+    Args:
+        show_bar: True면 한 줄 진행률 바(\r), False면 파일명 붙은 줄 단위 진행률
+                  (동시 업로드 시 출력이 섞이지 않도록)
+    """
+    last_step = [-1]
+
+    def update(percent, speed, eta):
+        if show_bar:
+            bar_width = 30
+            filled = int(bar_width * percent / 100)
+            bar = '█' * filled + '░' * (bar_width - filled)
+            console(f"\r  [{bar}] {percent}% | {speed} | ETA: {eta}    ", end='', flush=True)
+        elif percent // 10 != last_step[0]:
+            # 10% 단위로만 한 줄씩 출력
+            last_step[0] = percent // 10
+            console(f"  [{file_name}] {percent}% | {speed} | ETA: {eta}")
+
+    return update
+
+
+def finish_stats(stats, file_info, started):
+    """마지막 통계 보정 (stats가 한 번도 안 온 작은 파일 등)"""
+    if stats is None:
+        stats = TransferStats(total_bytes=file_info['size'])
+    if not stats.elapsed:
+        stats.elapsed = round(time.time() - started, 2)
+    return stats
+
+
+def get_bandwidth_schedule(config):
+    """(스케줄 규칙, 기본 제한)"""
+    rclone_cfg = config.get('rclone', {})
+    return (
+        parse_schedule(rclone_cfg.get('bandwidth_schedule')),
+        rclone_cfg.get('bandwidth_limit', '0'),
+    )
+
+
+def get_bandwidth_timetable(config):
+    """rclone --bwlimit 값 ("off", "50M" 또는 요일/시간 타임테이블)"""
+    rules, default = get_bandwidth_schedule(config)
+    return to_rclone_timetable(rules, default)
+
+
+def get_stream_count(config, file_info):
+    """
+    파일 1개를 몇 개의 연결로 나눠 보낼지
+
+    config.yaml:
+        multistream:
+          min_size_mb: 2048   # 이 크기 이상인 파일만
+          streams: 4          # 동시 연결 수
+    """
+    ms_cfg = config.get('multistream') or {}
+    streams = int(ms_cfg.get('streams', 1))
+    if streams > 1 and file_info['size'] >= ms_cfg.get('min_size_mb', 2048) * 1024 * 1024:
+        return streams
+    return 1
+
+
+def upload_with_rclone(config, file_info, show_bar=True, progress_callback=None, ledger=None):
+    """
+    rclone으로 파일 업로드
+
+    rclone.mode가 "rc"면 상주 rclone rcd에 job으로 제출, 아니면 rclone copy 실행
+    (resume.enabled이고 resume.min_size_mb 이상인 파일은 이어받기 방식으로 전송,
+     destinations가 있으면 파일을 한 번 읽어 모든 원격으로 동시에 전송)
+
+    Args:
+        progress_callback: callback(file_info, TransferStats) - 통계가 갱신될 때마다 호출
 
-    # rclone 명령어
+    Returns:
+        (성공 여부, 원격 경로 또는 오류 메시지, rclone 종료 코드 또는 None)
+    """
+    destinations = get_destinations(config)
+    if destinations:
+        return upload_with_fanout(config, file_info, destinations, ledger=ledger, show_bar=show_bar,
+                                  progress_callback=progress_callback)
+
+    resume_cfg = config.get('resume') or {}
+    if (ledger is not None and resume_available(resume_cfg)
+            and file_info['size'] >= resume_cfg.get('min_size_mb', 512) * 1024 * 1024):
+        return upload_with_resume(config, file_info, ledger, show_bar=show_bar,
+                                  progress_callback=progress_callback)
+
+    if config.get('rclone', {}).get('mode', 'copy') == 'rc':
+        return upload_with_rc(config, file_info, show_bar=show_bar,
+                              progress_callback=progress_callback)
+
+    file_name = file_info['name']
+    file_path = file_info['path']
+
+    remote_path = get_remote_path(config)
+
+    # rclone 명령어 (JSON 로그로 통계 출력)
     cmd = [
         'rclone', 'copy',
         file_path,
         remote_path,
-        '--progress',
-        '--stats-one-line',
+        '--use-json-log',
         '--stats', '2s',
+        '--stats-log-level', 'NOTICE',
         '-v'
     ]
 
-    if bandwidth_limit and bandwidth_limit != '0':
+    # 큰 파일은 구간을 나눠 여러 연결로 전송 (원격 backend가 지원하는 경우)
+    streams = get_stream_count(config, file_info)
+    if streams > 1:
+        cmd.extend(['--multi-thread-streams', str(streams), '--multi-thread-cutoff', '0'])
+
+    # 대역폭 제한 (시간대별 스케줄은 rclone 타임테이블로 전달 → 전송 중에도 적용)
+    # OBS 녹화 중이면 이번 파일은 녹화 중 제한으로 (copy 모드는 전송 중에 바꿀 수 없음)
+    bandwidth_limit = get_bandwidth_timetable(config)
+    governor = get_governor(config)
+    if governor and governor.level != FULL:
+        rules, default = get_bandwidth_schedule(config)
+        bandwidth_limit = governor.limit(current_limit(rules, default))
+    if bandwidth_limit != 'off':
         cmd.extend(['--bwlimit', bandwidth_limit])
 
-    print(f"\n업로드 시작: {file_name}")
-    print(f"  크기: {format_size(file_size)}")
-    print(f"  대상: {remote_path}")
-    print("-" * 50)
+    print_upload_start(file_info, remote_path, show_bar)
+    update = progress_printer(file_name, show_bar)
 
-    # 진행률 정규식
-    progress_pattern = re.compile(
-        r'Transferred:\s+[\d.]+\s+\w+\s*/\s*[\d.]+\s+\w+,\s*(\d+)%,\s*([\d.]+\s*\w+/s),\s*ETA\s*(\S+)'
-    )
+    started = time.time()
+    stats = None
+    retries = 0
+    last_error = ""
 
     try:
         process = subprocess.Popen(
@@ -163,91 +366,988 @@ def upload_with_rclone(config, file_info):
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
-            bufsize=1
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            **(governor.popen_kwargs() if governor else {})
         )
+        if governor:
+            governor.track(process)
 
         for line in process.stdout:
-            match = progress_pattern.search(line)
-            if match:
-                percent = int(match.group(1))
-                speed = match.group(2)
-                eta = match.group(3)
-
-                # 콘솔 출력
-                bar_width = 30
-                filled = int(bar_width * percent / 100)
-                bar = '█' * filled + '░' * (bar_width - filled)
-                print(f"\r  [{bar}] {percent}% | {speed} | ETA: {eta}    ", end='', flush=True)
+            record, raw_stats = parse_log_line(line)
+            if record is None:
+                # JSON이 아닌 출력 (치명적 오류 등)
+                if line.strip():
+                    last_error = line.strip()
+                continue
+            if is_retry_message(record):
+                retries += 1
+            if record.get('level') in ('error', 'critical', 'fatal'):
+                last_error = record.get('msg', '')
+            if raw_stats is None:
+                continue
+
+            stats = TransferStats.from_rclone(raw_stats, retries=retries)
+            update(stats.percent, f"{format_size(stats.speed)}/s", format_eta(stats.eta))
+            if progress_callback:
+                progress_callback(file_info, stats)
 
         process.wait()
-        print()  # 줄바꿈
+        if governor:
+            governor.untrack(process)
+        if show_bar:
+            console()  # 줄바꿈
+
+        stats = finish_stats(stats, file_info, started)
+        stats.retries = retries
+        stats.last_error = stats.last_error or last_error
+        success = process.returncode == 0
+        THROUGHPUT.record(file_info, stats, success, 'copy', remote_path)
 
-        if process.returncode == 0:
-            return True, f"{remote_path}{file_name}"
+        if success:
+            return True, f"{remote_path}{file_name}", 0
         else:
-            return False, f"rclone 오류 (코드: {process.returncode})"
+            detail = f": {last_error}" if last_error else ""
+            return False, f"rclone 오류 (코드: {process.returncode}){detail}", process.returncode
 
     except FileNotFoundError:
-        return False, "rclone이 설치되지 않았습니다. https://rclone.org/downloads/"
+        return False, "rclone이 설치되지 않았습니다. https://rclone.org/downloads/", None
+    except Exception as e:
+        return False, str(e), None
+
+
+# OBS 녹화 감지 (실행 중 1개만)
+_governor_lock = threading.Lock()
+_governor_state = {'governor': None, 'checked': False}
+
+
+def get_governor(config):
+    """OBS 녹화 중 업로드 속도/우선순위 조절기 (obs_governor.enabled가 아니면 None)"""
+    with _governor_lock:
+        if not _governor_state['checked']:
+            _governor_state['checked'] = True
+            governor = IoGovernor.from_config(config, logger=logging.getLogger(__name__))
+            _governor_state['governor'] = governor.start() if governor else None
+        return _governor_state['governor']
+
+
+def shutdown_governor():
+    with _governor_lock:
+        governor = _governor_state['governor']
+        _governor_state['governor'] = None
+        _governor_state['checked'] = False
+    if governor:
+        governor.stop()
+
+
+# rclone rcd 연결 (rc 모드, 실행 중 1개만)
+_rc_lock = threading.Lock()
+_rc_state = {'client': None, 'process': None, 'bandwidth': None}
+
+
+def get_rc_client(config):
+    """상주 rclone rcd 클라이언트 (없으면 시작 또는 연결)"""
+    with _rc_lock:
+        if _rc_state['client'] is None:
+            rclone_cfg = config.get('rclone', {})
+            client, process = ensure_daemon(rclone_cfg.get('rc') or {},
+                                            auth_path=STATE_DIR / "rclone_rc_auth.json")
+
+            # 대역폭 제한 (스케줄이 바뀌거나 OBS 녹화가 시작/종료되면 실행 중인 전송에도 바로 적용)
+            rules, default = get_bandwidth_schedule(config)
+            governor = get_governor(config)
+            updater = BandwidthUpdater(
+                client, rules, default, logger=logging.getLogger(__name__),
+                adjust=governor.limit if governor else None,
+            ).start()
+            if governor:
+                governor.add_listener(lambda g: updater.apply())
+            _rc_state['bandwidth'] = updater
+
+            _rc_state['client'] = client
+            _rc_state['process'] = process
+        return _rc_state['client']
+
+
+def shutdown_rc(config):
+    """이번 실행에서 시작한 rcd 종료 (keep_alive면 유지)"""
+    with _rc_lock:
+        client = _rc_state['client']
+        if _rc_state['bandwidth']:
+            _rc_state['bandwidth'].stop()
+        keep_alive = (config.get('rclone', {}).get('rc') or {}).get('keep_alive', True)
+        if client and _rc_state['process'] and not keep_alive:
+            client.quit()
+        _rc_state['client'] = None
+        _rc_state['process'] = None
+        _rc_state['bandwidth'] = None
+
+
+def upload_with_rc(config, file_info, show_bar=True, progress_callback=None):
+    """rclone rcd에 복사 job을 제출하고 완료까지 상태 polling"""
+    file_name = file_info['name']
+    remote_path = get_remote_path(config)
+    poll_sec = (config.get('rclone', {}).get('rc') or {}).get('poll_sec', 1)
+
+    print_upload_start(file_info, remote_path, show_bar)
+    update = progress_printer(file_name, show_bar)
+
+    started = time.time()
+    stats = None
+
+    try:
+        client = get_rc_client(config)
+        streams = get_stream_count(config, file_info)
+        jobid = client.copyfile_async(
+            os.path.dirname(os.path.abspath(file_info['path'])), file_name,
+            remote_path.rstrip('/'), file_name,
+            options={'MultiThreadStreams': streams, 'MultiThreadCutoff': '0'} if streams > 1 else None,
+        )
+
+        while True:
+            status = client.job_status(jobid)
+            stats = TransferStats.from_rclone(client.stats(group=f"job/{jobid}"))
+            if not stats.total_bytes:
+                stats.total_bytes = file_info['size']
+            update(stats.percent, f"{format_size(stats.speed)}/s", format_eta(stats.eta))
+            if progress_callback:
+                progress_callback(file_info, stats)
+            if status.get('finished'):
+                break
+            time.sleep(poll_sec)
+
+        if show_bar:
+            console()  # 줄바꿈
+
+        stats = finish_stats(stats, file_info, started)
+        if status.get('duration'):
+            stats.elapsed = round(status['duration'], 2)
+        success = bool(status.get('success'))
+        THROUGHPUT.record(file_info, stats, success, 'rc', remote_path)
+
+        if success:
+            return True, f"{remote_path}{file_name}", 0
+        return False, f"rclone rc 오류: {status.get('error') or 'unknown'}", None
+
+    except Exception as e:
+        return False, str(e), None
+
+
+_resume_state = {'warned': False}
+
+
+def resume_available(resume_cfg):
+    """이어받기 사용 여부 (sftp인데 paramiko가 없으면 경고 1번 후 rclone 전송으로 대체)"""
+    if not resume_cfg.get('enabled'):
+        return False
+    if resume_cfg.get('transport', 'sftp') == 'sftp' and not PARAMIKO_AVAILABLE:
+        if not _resume_state['warned']:
+            _resume_state['warned'] = True
+            logging.getLogger(__name__).warning(
+                "paramiko가 설치되지 않아 이어받기 대신 rclone으로 전송합니다 (pip install -r requirements.txt)"
+            )
+        return False
+    return True
+
+
+def upload_with_resume(config, file_info, ledger, show_bar=True, progress_callback=None):
+    """임시 이름으로 청크 전송 → 확정 위치를 장부에 저장 → 완료 시 rename (중단 시 이어서)"""
+    resume_cfg = config.get('resume') or {}
+    remote_path = get_remote_path(config)
+    rules, default = get_bandwidth_schedule(config)
+
+    print_upload_start(file_info, remote_path, show_bar)
+    update = progress_printer(file_info['name'], show_bar)
+
+    started = time.time()
+    stats = TransferStats(total_bytes=file_info['size'])
+
+    governor = get_governor(config)
+    paused = [0.0]   # OBS 녹화로 멈춘 시간 (속도 계산에서 제외)
+
+    def progress(done, total, sent):
+        # 대역폭 제한 (청크 단위로 속도 조절, OBS 녹화 중이면 멈추거나 더 낮춤)
+        limit = parse_rate(current_limit(rules, default))
+        if governor:
+            paused[0] += governor.wait()
+            limit = governor.rate(limit)
+        elapsed = time.time() - started - paused[0]
+        if limit and sent / limit > elapsed:
+            time.sleep(sent / limit - elapsed)
+            elapsed = time.time() - started - paused[0]
+        stats.bytes = done
+        stats.elapsed = round(elapsed, 2)
+        stats.speed = sent / elapsed if elapsed else 0.0
+        stats.eta = int((total - done) / stats.speed) if stats.speed else None
+        update(stats.percent, f"{format_size(stats.speed)}/s", format_eta(stats.eta))
+        if progress_callback:
+            progress_callback(file_info, stats)
+
+    try:
+        # 접속 정보는 rclone 리모트 설정에서 한 번만 읽어 구간별 연결에 같이 사용
+        sftp_settings = None
+        if resume_cfg.get('transport', 'sftp') == 'sftp':
+            sftp_settings = sftp_settings_from_rclone(config.get('rclone', {}).get('remote_name', 'est-sftp'))
+        uploader = ResumableUploader(lambda: make_transport(resume_cfg, sftp_settings=sftp_settings), ledger,
+                                     chunk_size=int(resume_cfg.get('chunk_mb', 8) * 1024 * 1024),
+                                     streams=get_stream_count(config, file_info))
+        _, resumed_from = uploader.upload(file_info, get_remote_dir(config), progress=progress)
+        success, result = True, f"{remote_path}{file_info['name']}"
+        if resumed_from:
+            logging.getLogger(__name__).info(
+                f"이어받기: {file_info['name']} ({format_size(resumed_from)}부터)"
+            )
+    except Exception as e:
+        success, result = False, f"이어받기 전송 오류 ({stats.percent}%에서 중단): {e}"
+    finally:
+        if show_bar:
+            console()  # 줄바꿈
+
+    stats = finish_stats(stats, file_info, started)
+    THROUGHPUT.record(file_info, stats, success, f"resume-{resume_cfg.get('transport', 'sftp')}", remote_path)
+    return success, result, None
+
+
+# 원격 파일 목록 캐시 (실행 중 1개만, destinations가 있으면 필수 원격마다 1개)
+_inventory_lock = threading.Lock()
+_inventory_state = {'inventories': None}
+
+
+def get_inventories(config, logger=None):
+    """
+    원격 목록 캐시 [(원격 이름 또는 None, RemoteInventory)] (inventory.enabled가 아니면 빈 목록)
+
+    destinations가 있으면 필수 원격마다 목록을 만들어 모든 필수 원격에 있는 파일만 일치로 봄
+    """
+    inv_cfg = config.get('inventory') or {}
+    if not inv_cfg.get('enabled'):
+        return []
+    with _inventory_lock:
+        if _inventory_state['inventories'] is None:
+            hash_type = get_verify_config(config)['hash'] if inv_cfg.get('hash') else None
+            destinations = get_destinations(config)
+            if destinations:
+                targets = [(d['name'], d['remote'], f"remote_inventory_{d['name']}.json", None)
+                           for d in destinations if d['required']]
+            else:
+                rc_client = None
+                if config.get('rclone', {}).get('mode', 'copy') == 'rc':
+                    rc_client = get_rc_client(config)
+                targets = [(None, get_remote_path(config), "remote_inventory.json", rc_client)]
+            _inventory_state['inventories'] = [
+                (name, RemoteInventory(
+                    STATE_DIR / cache_name,
+                    remote_dir,
+                    ttl_sec=inv_cfg.get('ttl_min', 60) * 60,
+                    full_refresh_sec=inv_cfg.get('full_refresh_hours', 24) * 3600,
+                    hash_type=hash_type,
+                    rc_client=rc_client,
+                    logger=logger,
+                ))
+                for name, remote_dir, cache_name, rc_client in targets
+            ]
+        return _inventory_state['inventories']
+
+
+def apply_inventory(config, files, ledger, logger, auto_mode=True):
+    """
+    원격에 이미 있는 파일 처리 (inventory.on_match: archive면 업로드된 것으로 기록, skip이면 제외)
+
+    destinations가 있으면 모든 필수 원격에 있어야 일치로 봄
+
+    Returns:
+        계속 처리할 파일 목록 (archive된 파일은 state=uploaded로 포함 → 이동만 수행)
+    """
+    inventories = get_inventories(config, logger)
+    if not inventories or not files:
+        return files
+
+    try:
+        for _, inventory in inventories:
+            inventory.refresh()
+    except Exception as e:
+        logger.warning(f"원격 목록 조회 실패, 비교 생략: {e}")
+        return files
+
+    on_match = (config.get('inventory') or {}).get('on_match', 'archive')
+    verify_cfg = get_verify_config(config)
+
+    def check(file_info):
+        digests = ledger.get_digests(file_info)
+        for _, inventory in inventories:
+            remote = inventory.get(file_info['name'])
+            if (inventory.hash_type and remote and remote['size'] == file_info['size']
+                    and remote['hashes'].get(inventory.hash_type)):
+                # 이름+크기가 같을 때만 해시 계산 (장부에 캐시됨)
+                digests = get_digests(file_info, ledger, verify_cfg)
+                break
+        return [(name, inventory, inventory.match(file_info, digests)) for name, inventory in inventories]
+
+    pending = [f for f in files if f.get('state') != UPLOADED]
+    matched = [f for f in pending if all(ok for _, _, (ok, _) in check(f))]
+    if matched and on_match == 'archive':
+        # 목록이 오래됐을 수 있으므로 일치한 파일만 원격에서 다시 확인
+        try:
+            for _, inventory in inventories:
+                inventory.recheck([f['name'] for f in matched])
+        except Exception as e:
+            logger.warning(f"원격 재확인 실패, 비교 생략: {e}")
+            return files
+
+    result = []
+    for file_info in files:
+        if file_info.get('state') == UPLOADED:
+            result.append(file_info)
+            continue
+
+        matches = check(file_info) if any(f is file_info for f in matched) else None
+        if not matches or not all(ok for _, _, (ok, _) in matches):
+            result.append(file_info)
+            continue
+
+        reason = ', '.join(f"{name}: {r}" if name else r for name, _, (_, r) in matches)
+        logger.info(f"원격에 이미 있음 ({reason}): {file_info['name']}")
+        if not auto_mode:
+            console(f"  원격에 이미 있음 ({reason}): {file_info['name']}")
+        if on_match == 'archive':
+            for name, inventory, _ in matches:
+                if name:
+                    ledger.mark_destination(file_info, name, UPLOADED,
+                                            remote=f"{inventory.remote_dir}{file_info['name']}")
+            ledger.mark(file_info, UPLOADED, remote=f"{inventories[0][1].remote_dir}{file_info['name']}")
+            file_info['state'] = UPLOADED
+            result.append(file_info)
+    return result
+
+
+def upload_with_fanout(config, file_info, destinations, ledger=None, show_bar=True, progress_callback=None):
+    """파일을 한 번 읽어 여러 원격으로 동시 전송 (이미 끝난 원격은 건너뜀)"""
+    logger = logging.getLogger(__name__)
+    states = ledger.get_destination_states(file_info) if ledger else {}
+    pending = [d for d in destinations if states.get(d['name']) != UPLOADED]
+
+    print_upload_start(file_info, ', '.join(d['remote'] for d in pending), show_bar)
+    update = progress_printer(file_info['name'], show_bar)
+
+    started = time.time()
+    stats = TransferStats(total_bytes=file_info['size'])
+    governor = get_governor(config)
+    paused = [0.0]   # OBS 녹화로 멈춘 시간 (속도 계산에서 제외)
+    # 시간대별 제한은 원본 읽기 속도로 적용 (모든 원격이 같은 청크를 받으므로 원격마다 같은 속도)
+    rules, _ = get_bandwidth_schedule(config)
+
+    def progress(done, total):
+        # 대역폭 스케줄 + OBS 녹화 중이면 원본 읽기를 멈추거나 속도 제한
+        limit = parse_rate(current_limit(rules, 'off'))
+        if governor:
+            paused[0] += governor.wait()
+            limit = governor.rate(limit)
+        elapsed = time.time() - started - paused[0]
+        if limit and done / limit > elapsed:
+            time.sleep(done / limit - elapsed)
+        stats.bytes = done
+        stats.elapsed = round(time.time() - started - paused[0], 2)
+        stats.speed = done / stats.elapsed if stats.elapsed else 0.0
+        stats.eta = int((total - done) / stats.speed) if stats.speed else None
+        update(stats.percent, f"{format_size(stats.speed)}/s", format_eta(stats.eta))
+        if progress_callback:
+            progress_callback(file_info, stats)
+
+    try:
+        results = tee_upload(file_info, pending, progress=progress) if pending else {}
     except Exception as e:
-        return False, str(e)
+        results = {d['name']: (False, None, str(e)) for d in pending}
+    finally:
+        if show_bar:
+            console()  # 줄바꿈
+
+    failure = None
+    for dest in pending:
+        ok, code, message = results[dest['name']]
+        if ledger:
+            ledger.mark_destination(file_info, dest['name'], UPLOADED if ok else DISCOVERED,
+                                    remote=message if ok else None, error=None if ok else message)
+        if ok:
+            logger.info(f"[{dest['name']}] 전송 완료: {file_info['name']}")
+            continue
+        logger.warning(f"[{dest['name']}] 전송 실패: {file_info['name']} - {message}")
+        if dest['required'] and failure is None:
+            failure = (f"[{dest['name']}] {message}", code)
+
+    stats = finish_stats(stats, file_info, started)
+    THROUGHPUT.record(file_info, stats, failure is None, 'fanout', ' '.join(d['remote'] for d in pending))
+    if failure:
+        return False, failure[0], failure[1]
+    return True, f"{destinations[0]['remote']}{file_info['name']}", 0
+
+
+_mover_lock = threading.Lock()
+_mover_state = {'mover': None}
+
+
+def get_mover(config, logger=None):
+    """다른 드라이브 이동용 백그라운드 스레드 (archive.background가 false면 None)"""
+    archive_cfg = config.get('archive') or {}
+    if not archive_cfg.get('background', True):
+        return None
+    with _mover_lock:
+        if _mover_state['mover'] is None:
+            _mover_state['mover'] = ArchiveMover(parse_rate(archive_cfg.get('max_rate', '50M')),
+                                                 logger=logger or logging.getLogger(__name__))
+        return _mover_state['mover']
+
+
+def shutdown_mover(logger):
+    """남은 백그라운드 이동이 끝날 때까지 대기"""
+    with _mover_lock:
+        mover = _mover_state['mover']
+        _mover_state['mover'] = None
+    if mover is None:
+        return
+    count = mover.pending_count()
+    if count:
+        logger.info(f"백그라운드 이동 완료 대기: {count}개")
+        console(f"백그라운드 파일 이동 완료 대기 중... ({count}개)")
+    mover.stop()
 
 
-def move_to_uploaded(config, file_info):
-    """업로드 완료 파일 이동"""
+def move_to_uploaded(config, file_info, on_moved=None):
+    """
+    업로드 완료 파일 이동
+
+    같은 드라이브면 이름 변경으로 바로 이동하고, 다른 드라이브면 백그라운드 이동을 예약
+    (끝나면 on_moved(성공 여부) 호출)
+
+    Returns:
+        True = 이동 완료, None = 백그라운드 이동 예약(또는 이미 진행 중), False = 실패
+    """
     uploaded_folder = config.get('uploaded_folder')
     if not uploaded_folder:
-        return
+        return True
 
-    os.makedirs(uploaded_folder, exist_ok=True)
     src = file_info['path']
     dst = os.path.join(uploaded_folder, file_info['name'])
 
     try:
-        shutil.move(src, dst)
-        print(f"  파일 이동됨: {uploaded_folder}")
+        os.makedirs(uploaded_folder, exist_ok=True)
+        if same_volume(src, uploaded_folder):
+            os.replace(src, dst)
+            # 우선순위 사이드카 파일도 같이 이동
+            if os.path.exists(src + '.priority'):
+                os.replace(src + '.priority', dst + '.priority')
+            console(f"  파일 이동됨: {uploaded_folder}")
+            return True
+
+        mover = get_mover(config)
+        if mover is None:
+            shutil.move(src, dst)
+            if os.path.exists(src + '.priority'):
+                shutil.move(src + '.priority', dst + '.priority')
+            console(f"  파일 이동됨: {uploaded_folder}")
+            return True
+
+        if mover.submit(src, dst, on_moved, extras=[(src + '.priority', dst + '.priority')]):
+            console(f"  백그라운드 이동 예약 (다른 드라이브): {file_info['name']}")
+        return None
     except Exception as e:
-        print(f"  파일 이동 실패: {e}")
+        console(f"  파일 이동 실패: {e}")
+        return False
 
 
-def main():
-    # 명령행 인자 파싱
-    parser = argparse.ArgumentParser(description='강의장 녹화 파일 업로드 (EST)')
-    parser.add_argument('--auto', action='store_true', help='자동 모드 (작업 스케줄러용)')
-    args = parser.parse_args()
+def upload_with_retry(config, file_info, logger, ledger, show_bar=True, controller=None):
+    """
+    upload_with_rclone + 재시도/차단기. 시도마다 장부에 기록
 
-    auto_mode = args.auto
-    logger = setup_logging(auto_mode)
+    Args:
+        controller: AimdController (진행 통계/실패를 동시 업로드 수 조절에 반영)
 
-    if not auto_mode:
-        print("=" * 60)
-        print("     강의장 녹화 파일 업로드 (EST)")
-        print("=" * 60)
-        print()
+    Returns:
+        (성공 여부, 원격 경로 또는 오류 메시지)
+    """
+    policy = RetryPolicy.from_config(config)
+    remote_name = config.get('rclone', {}).get('remote_name', 'est-sftp')
+    destinations = get_destinations(config)
+    if destinations:
+        # 여러 원격 업로드는 필수 원격 중 하나라도 안 되면 완료할 수 없으므로 묶어서 판단
+        remote_name = '+'.join(d['name'] for d in destinations if d['required'])
+    breaker = get_breaker(config, remote_name, logger)
+
+    progress_callback = controller.observe if controller else None
+    result = ""
+    for attempt in range(1, policy.max_attempts + 1):
+        if not breaker.allow():
+            result = f"원격 연결 차단 중 ({remote_name}), 다음에 재시도"
+            ledger.record_attempt(file_info, attempt, time.time(), 0, None, "circuit_open", result)
+            return False, result
+
+        started = time.time()
+        success, result, exit_code = upload_with_rclone(config, file_info, show_bar=show_bar,
+                                                        progress_callback=progress_callback, ledger=ledger)
+        duration = round(time.time() - started, 2)
 
-    logger.info("=" * 40)
-    logger.info("업로드 작업 시작")
+        if success:
+            breaker.record_success()
+            ledger.record_attempt(file_info, attempt, started, duration, exit_code, "success")
+            return True, result
+
+        failure = classify_failure(exit_code, result)
+        breaker.record_failure(failure)
+        if controller:
+            controller.record_failure(failure)
+        ledger.record_attempt(file_info, attempt, started, duration, exit_code, failure.category, result)
+        if not failure.retryable or attempt == policy.max_attempts:
+            break
+
+        delay = policy.delay(attempt)
+        logger.warning(
+            f"전송 실패 ({failure.category}), {delay:.0f}초 후 재시도 "
+            f"[{attempt}/{policy.max_attempts}]: {file_info['name']} - {result}"
+        )
+        time.sleep(delay)
 
-    # 설정 로드
-    config = load_config()
+    return False, result
 
-    logger.info(f"강의장: {config.get('classroom_name', 'N/A')}")
-    logger.info(f"녹화 폴더: {config['recording_folder']}")
 
+def transfer_one(config, file_info, logger, auto_mode, ledger, show_bar=True, controller=None):
+    """파일 1개 전송 (검증/이동은 finalize_files에서). 성공 여부 반환"""
+    if file_info.get('state') == UPLOADED:
+        # 이전 실행에서 업로드/검증은 끝났고 이동만 실패한 파일 → 재전송하지 않음
+        logger.info(f"이미 업로드됨, 이동만 수행: {file_info['name']}")
+        return True
+
+    # OBS 녹화 중 pause면 녹화가 끝날 때까지 대기
+    governor = get_governor(config)
+    if governor and governor.level == PAUSE:
+        logger.info(f"OBS 녹화 중이라 업로드 대기: {file_info['name']}")
+        waited = governor.wait()
+        logger.info(f"녹화 종료, 업로드 재개 ({format_eta(waited)} 대기)")
+
+    logger.info(f"업로드 시작: {file_info['name']}")
+    ledger.mark(file_info, UPLOADING)
+
+    # 업로드 (일시적 실패는 백오프 후 재시도, 원격이 차단 상태면 시도하지 않음)
+    success, result = upload_with_retry(config, file_info, logger, ledger, show_bar=show_bar,
+                                        controller=controller)
+    if controller:
+        controller.finish(file_info)
+
+    if not success:
+        ledger.mark(file_info, DISCOVERED, error=result)
+        logger.error(f"업로드 실패: {file_info['name']} - {result}")
+        if not auto_mode:
+            console(f"✗ 업로드 실패: {file_info['name']}")
+            console(f"  오류: {result}")
+        return False
+
+    # 검증 전까지는 uploading 상태 유지 (원격 경로만 기록)
+    ledger.mark(file_info, UPLOADING, remote=result)
+    logger.info(f"전송 완료: {file_info['name']}")
+    return True
+
+
+def verify_destinations(checked, destinations, verify_cfg, logger, ledger):
+    """
+    원격마다 한 번씩 목록 조회해 검증. 필수 원격이 모두 통과해야 통과
+
+    검증에 실패한 원격은 장부에서 미완료로 되돌려 다음 시도 때 그 원격만 다시 보냄
+    """
+    results = {f['path']: (True, []) for f, _ in checked}
+    for dest in destinations:
+        # 이번에 이 원격으로 전송이 끝난 파일만 (선택 원격이 실패한 경우 제외)
+        sent = [(f, d) for f, d in checked
+                if ledger.get_destination_states(f).get(dest['name']) == UPLOADED]
+        if not sent:
+            continue
+        try:
+            dest_results = verify_remote(sent, dest['remote'], verify_cfg)
+        except Exception as e:
+            dest_results = {f['path']: (False, f"원격 검증 실패: {e}") for f, _ in sent}
+
+        for file_info, _ in sent:
+            ok, reason = dest_results[file_info['path']]
+            if not ok:
+                ledger.mark_destination(file_info, dest['name'], DISCOVERED, error=f"검증 실패: {reason}")
+                logger.warning(f"[{dest['name']}] 검증 실패: {file_info['name']} - {reason}")
+            all_ok, reasons = results[file_info['path']]
+            reasons.append(f"{dest['name']}: {reason}")
+            results[file_info['path']] = (all_ok and (ok or not dest['required']), reasons)
+
+    for file_info, _ in checked:
+        states = ledger.get_destination_states(file_info)
+        missing = [d['name'] for d in destinations if d['required'] and states.get(d['name']) != UPLOADED]
+        ok, reasons = results[file_info['path']]
+        if missing:
+            ok = False
+            reasons.append(f"미완료 원격: {', '.join(missing)}")
+        results[file_info['path']] = (ok, ', '.join(reasons))
+    return results
+
+
+def verify_files(config, files, logger, ledger):
+    """
+    전송한 파일들을 한 번에 원격 검증 (로컬 해시는 장부에 캐시)
+
+    Returns:
+        {경로: (통과 여부, 사유)}
+    """
+    verify_cfg = get_verify_config(config)
+    if not verify_cfg['enabled'] or not files:
+        return {f['path']: (True, "검증 안 함") for f in files}
+
+    results = {}
+    checked = []
+    for file_info in files:
+        try:
+            checked.append((file_info, get_digests(file_info, ledger, verify_cfg)))
+        except OSError as e:
+            results[file_info['path']] = (False, f"로컬 해시 계산 실패: {e}")
+
+    destinations = get_destinations(config)
+    if checked and destinations:
+        results.update(verify_destinations(checked, destinations, verify_cfg, logger, ledger))
+    elif checked:
+        rc_client = None
+        if config.get('rclone', {}).get('mode', 'copy') == 'rc':
+            rc_client = get_rc_client(config)
+        try:
+            results.update(verify_remote(checked, get_remote_path(config), verify_cfg, rc_client))
+        except Exception as e:
+            for file_info, _ in checked:
+                results[file_info['path']] = (False, f"원격 검증 실패: {e}")
+
+    for file_info, digests in checked:
+        ok, reason = results[file_info['path']]
+        logger.info(
+            f"검증 {'통과' if ok else '실패'}: {file_info['name']} - {reason} "
+            f"({', '.join(f'{k}={v}' for k, v in sorted(digests.items()))})"
+        )
+    return results
+
+
+def finalize_files(config, files, logger, auto_mode, ledger, checks=None):
+    """
+    전송 끝난 파일들 검증 → uploaded 기록 → 이동(archived)
+
+    Args:
+        checks: 이미 검증한 결과 {경로: (통과 여부, 사유)} (없으면 원격 검증 수행)
+
+    Returns:
+        {경로: 성공 여부}
+    """
+    if checks is None:
+        to_verify = [f for f in files if f.get('state') != UPLOADED]
+        checks = verify_files(config, to_verify, logger, ledger)
+
+    inventories = get_inventories(config)
+    results = {}
+    for file_info in files:
+        if file_info.get('state') != UPLOADED:
+            ok, reason = checks[file_info['path']]
+            if not ok:
+                ledger.mark(file_info, DISCOVERED, error=f"검증 실패: {reason}")
+                logger.error(f"업로드 검증 실패: {file_info['name']} - {reason}")
+                if not auto_mode:
+                    console(f"✗ 업로드 검증 실패: {file_info['name']}")
+                    console(f"  사유: {reason}")
+                results[file_info['path']] = False
+                continue
+
+            ledger.mark(file_info, UPLOADED)
+            for _, inventory in inventories:
+                inventory.add(file_info, ledger.get_digests(file_info))
+            logger.info(f"업로드 완료: {file_info['name']}")
+            if not auto_mode:
+                console(f"✓ 업로드 완료: {file_info['name']}")
+
+        # 파일 이동 (업로드 + 검증 성공한 파일만). 다른 드라이브면 백그라운드 이동 후 기록
+        def on_moved(ok, file_info=file_info):
+            if ok:
+                ledger.mark(file_info, ARCHIVED)
+            get_claim_owner(ledger).release(file_info)
+
+        moved = move_to_uploaded(config, file_info, on_moved)
+        if moved:
+            ledger.mark(file_info, ARCHIVED)
+        elif moved is False:
+            logger.warning(f"파일 이동 실패 (다음 실행 시 재시도): {file_info['name']}")
+        results[file_info['path']] = True
+
+    if any(results.values()):
+        for _, inventory in inventories:
+            inventory.save()
+    return results
+
+
+_claim_state = {'owner': None}
+
+
+def get_claim_owner(ledger):
+    """이 프로세스의 파일 점유 기록기"""
+    owner = _claim_state['owner']
+    if owner is None or owner.ledger is not ledger:
+        owner = _claim_state['owner'] = ClaimOwner(ledger)
+    return owner
+
+
+def claim_file(file_info, logger, ledger):
+    """파일 점유. 다른 실행이 업로드 중이면 False"""
+    owner = get_claim_owner(ledger)
+    ok, other = owner.claim(file_info)
+    if not ok:
+        pid = other['pid'] if other else '?'
+        logger.info(f"다른 실행이 업로드 중이라 건너뜀: {file_info['name']} (PID {pid})")
+        return False
+    if other:
+        logger.info(f"끝난 실행(PID {other['pid']})이 맡았던 파일 이어서 처리: {file_info['name']}")
+
+    # 목록을 만든 뒤 다른 실행이 처리를 끝냈을 수 있으므로 장부 상태 다시 확인
+    state = ledger.get_state(file_info)
+    if state == ARCHIVED or not os.path.exists(file_info['path']):
+        owner.release(file_info)
+        logger.info(f"다른 실행이 이미 처리함: {file_info['name']}")
+        return False
+    if state:
+        file_info['state'] = state
+    return True
+
+
+def release_file(file_info, ledger):
+    """점유 해제 (백그라운드 이동 중이면 이동이 끝날 때 해제)"""
+    mover = _mover_state['mover']
+    if mover is None or not mover.is_pending(file_info['path']):
+        get_claim_owner(ledger).release(file_info)
+
+
+def upload_one(config, file_info, logger, auto_mode, ledger, show_bar=True, controller=None):
+    """파일 1개 전송 + 검증 + 이동. 성공 여부 반환"""
+    if not claim_file(file_info, logger, ledger):
+        return False
+    try:
+        if not transfer_one(config, file_info, logger, auto_mode, ledger, show_bar=show_bar,
+                            controller=controller):
+            return False
+        return finalize_files(config, [file_info], logger, auto_mode, ledger)[file_info['path']]
+    finally:
+        release_file(file_info, ledger)
+
+
+def upload_live_one(config, file_info, logger, ledger, live):
+    """녹화 중 조각 업로드한 파일 마무리 (바뀐 조각 재전송 + manifest 등록 + 검증 + 이동)"""
+    if not claim_file(file_info, logger, ledger):
+        return False
+    try:
+        if file_info.get('state') != UPLOADED:
+            ledger.mark(file_info, UPLOADING)
+            try:
+                manifest = live.finalize(file_info)
+                # 필수 원격 모두 + verify.hash 설정대로 조각 검증 (verify.enabled가 아니면 크기만)
+                verify_cfg = get_verify_config(config)
+                ok, reason = live.verify(file_info, verify_cfg if verify_cfg['enabled'] else None)
+            except Exception as e:
+                manifest, ok, reason = None, False, str(e)
+
+            if not ok:
+                # 원격 조각을 믿을 수 없으므로 다음 시도 때 조각을 모두 다시 보냄
+                ledger.clear_live_parts(file_info['path'])
+                ledger.mark(file_info, DISCOVERED, error=f"라이브 업로드 실패: {reason}")
+                logger.error(f"라이브 업로드 실패: {file_info['name']} - {reason}")
+                return False
+            ledger.mark(file_info, UPLOADING, remote=manifest)
+            logger.info(f"검증 통과: {file_info['name']} - {reason}")
+            checks = {file_info['path']: (True, reason)}
+        else:
+            checks = {}
+
+        ok = finalize_files(config, [file_info], logger, True, ledger, checks=checks)[file_info['path']]
+        if ok:
+            ledger.clear_live_parts(file_info['path'])
+        return ok
+    finally:
+        release_file(file_info, ledger)
+
+
+def make_controller(config, jobs, logger):
+    """adaptive.enabled면 동시 업로드 수 자동 조절기 (jobs에서 시작), 아니면 None"""
+    if not (config.get('adaptive') or {}).get('enabled'):
+        return None
+    controller = AimdController.from_config(config, start=jobs, logger=logger)
+    logger.info(f"동시 업로드 수 자동 조절: {controller.min_jobs}~{controller.max_jobs} (시작 {controller.limit})")
+    return controller
+
+
+def upload_files(config, files, jobs, logger, auto_mode, ledger):
+    """
+    여러 파일 전송 (jobs > 1이면 워커 풀로 동시 전송) 후 한 번에 검증/이동
+
+    adaptive.enabled면 동시 수를 처리량/오류에 따라 min_jobs~max_jobs 사이에서 자동 조절
+
+    Returns:
+        파일 순서대로 성공 여부 리스트 (다른 실행이 맡은 파일은 None)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    controller = make_controller(config, jobs, logger)
+    if controller:
+        jobs = min(controller.max_jobs, len(files))
+    show_bar = jobs == 1
+    claimed = []     # 이 실행이 점유한 파일 (검증/이동까지 끝난 뒤 해제)
+
+    def worker(file_info):
+        if not claim_file(file_info, logger, ledger):
+            return None
+        claimed.append(file_info)
+        try:
+            if controller is None:
+                return transfer_one(config, file_info, logger, auto_mode, ledger, show_bar=show_bar)
+            with controller:
+                return transfer_one(config, file_info, logger, auto_mode, ledger, show_bar=show_bar,
+                                    controller=controller)
+        except Exception as e:
+            logger.exception(f"업로드 중 예외: {file_info['name']} - {e}")
+            return False
+
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            transferred = list(pool.map(worker, files))
+    else:
+        transferred = [worker(file_info) for file_info in files]
+
+    done = [f for f, ok in zip(files, transferred) if ok]
+    try:
+        finalized = finalize_files(config, done, logger, auto_mode, ledger)
+    finally:
+        for file_info in claimed:
+            release_file(file_info, ledger)
+    return [None if ok is None else finalized.get(f['path'], False) for f, ok in zip(files, transferred)]
+
+
+def report_deadline(config, files, logger, auto_mode):
+    """
+    queue.deadline까지 끝나지 않을 것으로 예상되는 파일 안내
+
+    속도는 queue.expected_speed 또는 최근 전송 기록, 시간대별 대역폭 제한도 반영
+    """
+    queue_cfg = config.get('queue') or {}
+    if not queue_cfg.get('deadline') or not files:
+        return
+
+    speed = parse_rate(queue_cfg.get('expected_speed') or '0') or recent_speed(LOG_DIR)
+    if not speed:
+        logger.info("마감 예측 생략: 예상 속도 정보 없음 (queue.expected_speed 설정 필요)")
+        return
+
+    deadline = parse_deadline(queue_cfg['deadline'])
+    rules, default = get_bandwidth_schedule(config)
+    late = [(f, t) for f, t in estimate_finish(files, speed, rules, default) if t > deadline]
+    if not late:
+        logger.info(f"마감 {deadline:%m-%d %H:%M}까지 전체 완료 예상 ({format_size(speed)}/s 기준)")
+        return
+
+    logger.warning(f"마감 {deadline:%m-%d %H:%M}까지 끝나지 않을 파일: {len(late)}개 ({format_size(speed)}/s 기준)")
     if not auto_mode:
-        print(f"강의장: {config.get('classroom_name', 'N/A')}")
-        print(f"녹화 폴더: {config['recording_folder']}")
-        print()
+        print(f"\n⚠ 마감 {deadline:%H:%M}까지 끝나지 않을 것으로 예상되는 파일: {len(late)}개")
+    for f, t in late:
+        eta = "예측 불가" if t == datetime.max else f"{t:%m-%d %H:%M}"
+        logger.warning(f"  - {f['name']} (예상 완료 {eta})")
+        if not auto_mode:
+            print(f"  - {f['name']} (예상 완료 {eta})")
+
+
+def check_archived_remote(config, files, ledger):
+    """
+    정리 대상 파일이 원격에 그대로 있는지 확인 (삭제 직전 재확인)
+
+    Args:
+        files: [(현재 file_info, 장부 키 file_info)]
+
+    Returns:
+        {경로: (확인 여부, 사유)}
+    """
+    verify_cfg = get_verify_config(config)
+    checked = []
+    results = {}
+    for file_info, key in files:
+        digests = ledger.get_digests(key)
+        if verify_cfg['hash'] and verify_cfg['hash'] not in digests:
+            try:
+                digests = get_digests(file_info, ledger, verify_cfg)
+            except OSError as e:
+                results[file_info['path']] = (False, f"로컬 해시 계산 실패: {e}")
+                continue
+        checked.append((file_info, digests))
+    if not checked:
+        return results
+
+    destinations = get_destinations(config)
+    if destinations:
+        targets = [(d['name'], d['remote']) for d in destinations if d['required']]
+    else:
+        targets = [(None, get_remote_path(config))]
+
+    rc_client = None
+    if not destinations and config.get('rclone', {}).get('mode', 'copy') == 'rc':
+        rc_client = get_rc_client(config)
+
+    passed = {f['path']: True for f, _ in checked}
+    reasons = {f['path']: [] for f, _ in checked}
+    for name, remote in targets:
+        try:
+            dest_results = verify_remote(checked, remote, verify_cfg, rc_client)
+        except Exception as e:
+            dest_results = {f['path']: (False, f"원격 확인 실패: {e}") for f, _ in checked}
+        for file_info, _ in checked:
+            ok, reason = dest_results[file_info['path']]
+            passed[file_info['path']] = passed[file_info['path']] and ok
+            reasons[file_info['path']].append(f"{name}: {reason}" if name else reason)
+
+    for path in passed:
+        results[path] = (passed[path], ', '.join(reasons[path]))
+    return results
+
+
+def run_retention(config, logger, ledger, auto_mode=True, engine=None):
+    """
+    디스크 사용률이 기준을 넘었으면 원격 확인된 업로드 완료 파일을 오래된 순으로 삭제
+
+    Returns:
+        (삭제한 파일 수, 확보한 바이트)
+    """
+    engine = engine or RetentionEngine.from_config(config, ledger, logger)
+    if engine is None:
+        return 0, 0
+    try:
+        evicted, reclaimed = engine.run(lambda files: check_archived_remote(config, files, ledger))
+    except Exception as e:
+        logger.warning(f"디스크 공간 정리 실패: {e}")
+        return 0, 0
+    if evicted and not auto_mode:
+        print(f"✓ 디스크 공간 정리: {evicted}개 삭제, {format_size(reclaimed)} 확보")
+    return evicted, reclaimed
+
+
+def run_once(config, args, logger, ledger):
+    """새 파일 검색 → 업로드 → 결과 요약 (1회 실행)"""
+    auto_mode = args.auto
 
     # 새 파일 찾기
     if not auto_mode:
         print("새 파일 검색 중...")
-    new_files = get_new_files(config)
+    new_files = get_new_files(config, ledger)
+    # 서버에 이미 있는 파일은 다시 보내지 않음 (장부가 비어 있을 때 대비)
+    new_files = order_files(config, apply_inventory(config, new_files, ledger, logger, auto_mode))
+
+    # 겹쳐 실행된 다른 업로드가 맡은 파일은 제외
+    owner = get_claim_owner(ledger)
+    for f in [f for f in new_files if owner.claimed_by_other(f)]:
+        logger.info(f"다른 실행이 업로드 중: {f['name']}")
+        new_files.remove(f)
 
     if not new_files:
         logger.info("업로드할 새 파일 없음")
         if not auto_mode:
             print("\n업로드할 새 파일이 없습니다.")
+        run_retention(config, logger, ledger, auto_mode)
         return
 
     logger.info(f"발견된 파일: {len(new_files)}개")
@@ -259,6 +1359,9 @@ def main():
         for f in new_files:
             print(f"  - {f['name']} ({format_size(f['size'])})")
 
+    report_deadline(config, new_files, logger, auto_mode)
+
+    if not auto_mode:
         # 대화형 모드에서만 확인
         print()
         confirm = input("업로드를 시작할까요? (Y/n): ").strip().lower()
@@ -268,41 +1371,278 @@ def main():
             return
 
     # 업로드 시작
-    success_count = 0
-    fail_count = 0
+    jobs = max(1, min(args.jobs, len(new_files)))
+    if jobs > 1:
+        logger.info(f"동시 업로드: {jobs}개")
+    results = upload_files(config, new_files, jobs, logger, auto_mode, ledger)
+    # 업로드는 이동을 기다리지 않고 진행, 끝나기 전에 남은 백그라운드 이동만 마무리
+    shutdown_mover(logger)
 
-    for file_info in new_files:
-        logger.info(f"업로드 시작: {file_info['name']}")
-
-        # 업로드
-        success, result = upload_with_rclone(config, file_info)
-
-        if success:
-            logger.info(f"업로드 완료: {file_info['name']}")
-            if not auto_mode:
-                print(f"✓ 업로드 완료: {file_info['name']}")
-
-            # 파일 이동
-            move_to_uploaded(config, file_info)
-            success_count += 1
-        else:
-            logger.error(f"업로드 실패: {file_info['name']} - {result}")
-            if not auto_mode:
-                print(f"✗ 업로드 실패: {file_info['name']}")
-                print(f"  오류: {result}")
-            fail_count += 1
+    success_count = sum(1 for ok in results if ok)
+    skip_count = sum(1 for ok in results if ok is None)
+    fail_count = len(results) - success_count - skip_count
 
     # 결과 요약
-    logger.info(f"작업 완료: {success_count}개 성공, {fail_count}개 실패")
+    skipped = f", {skip_count}개 다른 실행이 처리" if skip_count else ""
+    logger.info(f"작업 완료: {success_count}개 성공, {fail_count}개 실패{skipped}")
+    evicted, reclaimed = run_retention(config, logger, ledger, auto_mode)
     logger.info("=" * 40)
 
     if not auto_mode:
         print()
         print("=" * 60)
-        print(f"  완료: {success_count}개 성공, {fail_count}개 실패")
+        print(f"  완료: {success_count}개 성공, {fail_count}개 실패{skipped}")
+        if evicted:
+            print(f"  정리: {evicted}개 삭제, {format_size(reclaimed)} 확보")
         print("=" * 60)
 
 
+def watch_loop(config, args, logger, ledger):
+    """
+    감시 모드: 녹화 폴더 이벤트를 받아 쓰기가 끝난 파일을 바로 업로드 대기열에 넣음
+
+    config.yaml:
+        watch:
+          backend: auto        # auto / native / polling
+          poll_interval: 2     # polling 주기(초)
+          check_interval: 5    # 대기 파일 완료 여부 확인 주기(초)
+          retry_sec: 300       # 업로드 실패 시 재시도 대기(초)
+
+    args.live면 쓰는 중인 파일도 live.interval_sec마다 다 써진 조각을 먼저 업로드
+    """
+    watch_cfg = config.get('watch') or {}
+    recording_folder = config['recording_folder']
+    extensions = [ext.lower() for ext in config.get('extensions', ['.mp4', '.mkv'])]
+    check_interval = watch_cfg.get('check_interval', 5)
+    retry_sec = watch_cfg.get('retry_sec', 300)
+    jobs = max(1, args.jobs)
+    controller = make_controller(config, jobs, logger)
+    if controller:
+        jobs = controller.max_jobs
+
+    detector = CompletionDetector.from_config(config)
+    sort_key = make_sort_key(config)
+    retention = RetentionEngine.from_config(config, ledger, logger)
+    retention_interval = (config.get('retention') or {}).get('interval_min', 10) * 60
+    retention_last = 0
+    work = UploadQueue()  # ('upload', file_info) 또는 ('live', 경로). 조각 업로드 먼저, 그다음 정책 순
+    pending = {}     # 경로 -> {'not_before': 확인 가능 시각, 'closed': 쓰기 종료 이벤트 여부}
+    active = set()   # 대기열에 있거나 업로드 중인 경로
+    state_lock = threading.Lock()
+
+    live = None
+    live_last = {}   # 경로 -> 마지막 조각 확인 시각
+    live_interval = (config.get('live') or {}).get('interval_sec', 60)
+    if getattr(args, 'live', False):
+        # 지금 시간대의 제한 (destinations가 있으면 원격별 bandwidth_limit 위에 스케줄 구간만 적용)
+        rules, default = get_bandwidth_schedule(config)
+        if get_destinations(config):
+            default = 'off'
+
+        def live_limit():
+            return current_limit(rules, default)
+
+        live = LiveIngest(config, ledger, get_remote_path(config),
+                          bwlimit=get_bandwidth_timetable(config), logger=logger,
+                          destinations=get_destinations(config), governor=get_governor(config),
+                          current_limit=live_limit)
+
+    def on_event(path, event):
+        with state_lock:
+            if event == "deleted":
+                pending.pop(path, None)
+                detector.forget(path)
+            else:
+                pending[path] = {'not_before': 0, 'closed': event == "closed"}
+
+    def live_poll(path):
+        try:
+            live.poll(path)
+        except Exception as e:
+            logger.warning(f"[라이브] 조각 업로드 실패: {os.path.basename(path)} - {e}")
+        finally:
+            with state_lock:
+                active.discard(path)
+
+    def worker():
+        while True:
+            item = work.get()
+            if item is None:
+                return
+            kind, file_info = item
+            if kind == 'live':
+                live_poll(file_info)
+                continue
+
+            ok = False
+            try:
+                if live and live.has_parts(file_info['path']):
+                    ok = upload_live_one(config, file_info, logger, ledger, live)
+                elif controller:
+                    with controller:
+                        ok = upload_one(config, file_info, logger, True, ledger, show_bar=False,
+                                        controller=controller)
+                else:
+                    ok = upload_one(config, file_info, logger, True, ledger, show_bar=False)
+            except Exception as e:
+                logger.exception(f"업로드 중 예외: {file_info['name']} - {e}")
+            finally:
+                with state_lock:
+                    active.discard(file_info['path'])
+                    if not ok and os.path.exists(file_info['path']):
+                        pending.setdefault(file_info['path'], {
+                            'not_before': time.time() + retry_sec, 'closed': True,
+                        })
+
+    def check_file(path, closed):
+        """
+        완료 확인 + 장부/원격 목록 대조 (state_lock 밖에서 호출: 파일 읽기, rclone lsjson이 느릴 수 있음)
+
+        Returns:
+            (더 확인할 필요 없는지, 대기열에 넣을 file_info 또는 None)
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return True, None
+        ok, reason = detector.is_complete(path, st, closed=closed)
+        if not ok:
+            return False, None
+
+        file_info = make_file_info(path, st)
+        state = ledger.discover(file_info)
+        if state == ARCHIVED:
+            return True, None
+
+        file_info['state'] = state
+        if not apply_inventory(config, [file_info], ledger, logger):
+            return True, None
+        return True, file_info
+
+    watcher = make_watcher(
+        recording_folder, extensions,
+        backend=watch_cfg.get('backend', 'auto'),
+        interval=watch_cfg.get('poll_interval', 2),
+    )
+    watcher.start(on_event)
+    logger.info(f"감시 모드 시작 ({watcher.name}): {recording_folder}")
+
+    # 기존 파일도 한 번 확인
+    with os.scandir(recording_folder) as entries:
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions:
+                on_event(entry.path, "created")
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(jobs)]
+    for t in threads:
+        t.start()
+
+    try:
+        while True:
+            now = time.time()
+            with state_lock:
+                due = [(path, item) for path, item in pending.items()
+                       if path not in active and item['not_before'] <= now]
+            for path, item in due:
+                # 확인은 잠금 밖에서 하고, 대기/진행 목록을 바꿀 때만 잠금
+                done, file_info = check_file(path, item['closed'])
+                with state_lock:
+                    if path not in pending:
+                        continue  # 확인하는 동안 삭제됨
+                    if done:
+                        del pending[path]
+                        live_last.pop(path, None)
+                        if file_info:
+                            active.add(path)
+                            work.put(('upload', file_info), key=(1,) + sort_key(file_info))
+                    elif live and now - live_last.get(path, 0) >= live_interval:
+                        # 아직 쓰는 중 → 다 써진 조각만 먼저 업로드
+                        live_last[path] = now
+                        active.add(path)
+                        work.put(('live', path), key=(0,))
+                        continue
+                if file_info:
+                    logger.info(f"업로드 대기열 추가: {file_info['name']} ({format_size(file_info['size'])})")
+            if retention and now - retention_last >= retention_interval:
+                retention_last = now
+                run_retention(config, logger, ledger, engine=retention)
+            time.sleep(check_interval)
+    finally:
+        if retention and retention.total_reclaimed:
+            logger.info(f"감시 모드 중 디스크 정리로 {format_size(retention.total_reclaimed)} 확보")
+        logger.info("감시 모드 종료")
+        watcher.stop()
+        for _ in threads:
+            work.put(None)
+        for t in threads:
+            t.join()
+        shutdown_mover(logger)
+
+
+def main():
+    # 명령행 인자 파싱
+    parser = argparse.ArgumentParser(description='강의장 녹화 파일 업로드 (EST)')
+    parser.add_argument('--auto', action='store_true', help='자동 모드 (작업 스케줄러용)')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N', help='동시 업로드 파일 수 (기본 1)')
+    parser.add_argument('--watch', action='store_true', help='감시 모드 (녹화 폴더를 감시하며 상주 실행)')
+    parser.add_argument('--live', action='store_true', help='녹화 중에도 다 써진 조각부터 업로드 (--watch 포함)')
+    parser.add_argument('--cleanup', action='store_true', help='업로드 없이 디스크 공간 정리만 실행 (retention)')
+    args = parser.parse_args()
+
+    auto_mode = args.auto
+    logger = setup_logging(auto_mode)
+
+    if not auto_mode:
+        print("=" * 60)
+        print("     강의장 녹화 파일 업로드 (EST)")
+        print("=" * 60)
+        print()
+
+    logger.info("=" * 40)
+    logger.info("업로드 작업 시작")
+
+    # 설정 로드
+    config = load_config()
+
+    logger.info(f"강의장: {config.get('classroom_name', 'N/A')}")
+    logger.info(f"녹화 폴더: {config['recording_folder']}")
+
+    if not auto_mode:
+        print(f"강의장: {config.get('classroom_name', 'N/A')}")
+        print(f"녹화 폴더: {config['recording_folder']}")
+        print()
+
+    try:
+        with open_ledger(config) as ledger, RunLock(STATE_DIR / "upload.lock") as run_lock:
+            # 작업 스케줄러로 겹쳐 실행된 경우 (이전 실행이 아직 업로드 중)
+            if not run_lock.acquire():
+                holder = run_lock.holder()
+                if (config.get('run_lock') or {}).get('on_busy', 'exit') != 'share':
+                    logger.info(f"다른 업로드가 실행 중이라 종료 (PID {holder})")
+                    if not auto_mode:
+                        print(f"✗ 다른 업로드가 실행 중입니다 (PID {holder}).")
+                    return
+                logger.info(f"다른 업로드가 실행 중 (PID {holder}), 맡지 않은 파일만 업로드")
+
+            try:
+                if args.cleanup:
+                    if not (config.get('retention') or {}).get('enabled'):
+                        print("✗ retention.enabled가 꺼져 있습니다. config.yaml을 확인해주세요.")
+                    else:
+                        evicted, reclaimed = run_retention(config, logger, ledger, auto_mode)
+                        if not evicted and not auto_mode:
+                            print("정리할 필요가 없거나 삭제할 수 있는 파일이 없습니다.")
+                elif args.watch or args.live:
+                    watch_loop(config, args, logger, ledger)
+                else:
+                    run_once(config, args, logger, ledger)
+            finally:
+                get_claim_owner(ledger).release_all()
+    finally:
+        shutdown_rc(config)
+        shutdown_governor()
+
+
 if __name__ == "__main__":
     try:
         main()
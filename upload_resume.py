@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+이어받기 가능한 업로드 (대용량 녹화 파일용)
+
+rclone copy는 중간에 끊기면 처음부터 다시 보냅니다. 여기서는
+  1. 원격에 임시 이름(파일명.partial)으로 청크 단위 기록
+  2. 청크가 끝날 때마다 확정된 위치(offset)를 장부에 저장
+  3. 다시 실행하면 저장된 위치부터 이어서 전송
+  4. 다 보내면 최종 이름으로 원자적 rename
+합니다.
+
+전송 방식(transport):
+  - sftp:  SFTP 서버에 직접 기록 (paramiko 필요, 접속 정보는 rclone 리모트 설정에서 읽음)
+  - local: 로컬/네트워크 폴더에 기록 (테스트, 벤치마크, NAS 공유 폴더용)
+
+config.yaml:
+    resume:
+      enabled: true
+      min_size_mb: 512        # 이 크기 이상인 파일만 이어받기 방식으로 전송
+      chunk_mb: 8             # 청크 크기 (청크마다 위치 저장)
+      transport: "sftp"       # sftp / local
+      local_root: ""          # transport: local일 때 원격 경로의 기준 폴더
+
+sftp의 host/port/user/pass/key_file/key_file_pass는 rclone.remote_name 리모트 설정(rclone config dump)에서
+읽으므로 접속 정보를 config.yaml에 따로 적지 않습니다.
+
+multistream.streams > 1이면 큰 파일을 구간으로 나눠 연결 여러 개로 동시에 기록합니다.
+(구간별 확정 위치를 따로 저장하므로 이어받기도 그대로 동작)
+
+벤치마크 (로컬 폴더 + 지연 주입):
+    python upload_resume.py --benchmark --size-mb 512 --interrupt-at 0.9      # 이어받기 vs 처음부터
+    python upload_resume.py --benchmark-streams --size-mb 256 --latency 0.05  # 연결 1/2/4/8개
+
+upload_recording.py에서 import해서 사용:
+    from upload_resume import ResumableUploader, make_transport
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import posixpath
+import subprocess
+
+try:
+    import paramiko
+    PARAMIKO_AVAILABLE = True
+except ImportError:
+    PARAMIKO_AVAILABLE = False
+
+PARTIAL_SUFFIX = ".partial"
+
+
+# ============================================
+# 전송 방식
+# ============================================
+class LocalTransport:
+    """로컬 폴더를 원격처럼 사용 (원격 경로는 root 아래 상대 경로)"""
+
+    name = "local"
+
+    def __init__(self, root):
+        self.root = root
+
+    def _local(self, remote):
+        return os.path.join(self.root, remote.lstrip("/\\"))
+
+    def size(self, remote):
+        """원격 파일 크기 (없으면 None)"""
+        try:
+            return os.path.getsize(self._local(remote))
+        except OSError:
+            return None
+
+    def open_at(self, remote, offset, truncate=True):
+        """offset부터 쓰기 위한 파일 객체 (truncate면 offset 뒤는 잘라냄)"""
+        path = self._local(remote)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(path, "r+b" if os.path.exists(path) else "wb")
+        if truncate:
+            f.truncate(offset)
+        f.seek(offset)
+        return f
+
+    def commit(self, f):
+        """지금까지 쓴 내용을 디스크에 확정"""
+        f.flush()
+        os.fsync(f.fileno())
+
+    def rename(self, src, dst):
+        os.replace(self._local(src), self._local(dst))
+
+    def remove(self, remote):
+        try:
+            os.remove(self._local(remote))
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        pass
+
+
+class SftpTransport:
+    """SFTP 서버에 직접 기록 (paramiko)"""
+
+    name = "sftp"
+
+    def __init__(self, host, port=22, user=None, password=None, key_file=None, key_file_pass=None, timeout=30):
+        if not PARAMIKO_AVAILABLE:
+            raise RuntimeError("paramiko가 설치되지 않았습니다. pip install -r requirements.txt")
+        pkey = None
+        if key_file:
+            # PKey.from_path는 paramiko 3.2부터 (키 형식 자동 판별)
+            passphrase = key_file_pass.encode() if key_file_pass else None
+            pkey = paramiko.PKey.from_path(key_file, passphrase)
+        self._transport = paramiko.Transport((host, int(port)))
+        self._transport.banner_timeout = timeout
+        self._transport.connect(username=user, password=password or None, pkey=pkey)
+        self.sftp = paramiko.SFTPClient.from_transport(self._transport)
+        self.sftp.get_channel().settimeout(timeout)
+
+    def size(self, remote):
+        try:
+            return self.sftp.stat(remote).st_size
+        except IOError:
+            return None
+
+    def _makedirs(self, folder):
+        parts = []
+        while folder not in ("", "/") and self.size(folder) is None:
+            parts.append(folder)
+            folder = posixpath.dirname(folder)
+        for path in reversed(parts):
+            self.sftp.mkdir(path)
+
+    def open_at(self, remote, offset, truncate=True):
+        self._makedirs(posixpath.dirname(remote))
+        f = self.sftp.open(remote, "r+" if self.size(remote) is not None else "w")
+        if truncate:
+            f.truncate(offset)
+        f.seek(offset)
+        f.set_pipelined(True)
+        return f
+
+    def commit(self, f):
+        # 파이프라인으로 보낸 쓰기 요청의 응답을 모두 받은 뒤에 확정으로 간주
+        f.flush()
+        f.stat()
+
+    def rename(self, src, dst):
+        self.sftp.posix_rename(src, dst)
+
+    def remove(self, remote):
+        try:
+            self.sftp.remove(remote)
+        except IOError:
+            pass
+
+    def close(self):
+        self.sftp.close()
+        self._transport.close()
+
+
+def _rclone_output(args, rclone_exe="rclone"):
+    result = subprocess.run([rclone_exe] + args, capture_output=True, text=True,
+                            encoding="utf-8", errors="replace")
+    if result.returncode != 0:
+        raise RuntimeError(f"rclone {args[0]} 실패: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def sftp_settings_from_rclone(remote_name, rclone_exe="rclone"):
+    """rclone 리모트 설정(rclone config dump)에서 SFTP 접속 정보 읽기 (pass는 reveal)"""
+    remotes = json.loads(_rclone_output(["config", "dump"], rclone_exe) or "{}")
+    remote = remotes.get(remote_name)
+    if remote is None:
+        raise RuntimeError(f"rclone 리모트가 없습니다: {remote_name}")
+    if remote.get("type") != "sftp":
+        raise RuntimeError(f"rclone 리모트가 sftp가 아닙니다: {remote_name} ({remote.get('type')})")
+    # pass / key_file_pass는 rclone config에 obscure되어 저장됨
+    password, key_file_pass = remote.get("pass"), remote.get("key_file_pass")
+    if password:
+        password = _rclone_output(["reveal", password], rclone_exe)
+    if key_file_pass:
+        key_file_pass = _rclone_output(["reveal", key_file_pass], rclone_exe)
+    return {
+        "host": remote["host"],
+        "port": int(remote.get("port") or 22),
+        "user": remote.get("user") or None,
+        "password": password or None,
+        "key_file": os.path.expanduser(remote["key_file"]) if remote.get("key_file") else None,
+        "key_file_pass": key_file_pass or None,
+    }
+
+
+def make_transport(resume_cfg, remote_name=None, rclone_exe="rclone", sftp_settings=None):
+    """
+    설정에 맞는 전송 방식 생성
+
+    sftp는 remote_name 리모트의 rclone 설정으로 접속 (sftp_settings를 넘기면 조회 생략)
+    """
+    kind = resume_cfg.get("transport", "sftp")
+    if kind == "local":
+        return LocalTransport(resume_cfg.get("local_root") or ".")
+    if kind == "sftp":
+        settings = sftp_settings or sftp_settings_from_rclone(remote_name, rclone_exe)
+        return SftpTransport(**settings)
+    raise ValueError(f"알 수 없는 resume.transport: {kind}")
+
+
+# ============================================
+# 이어받기 업로드
+# ============================================
+class ResumableUploader:
+    """
+    청크 단위 업로드 + 확정 위치 저장 + 완료 시 rename
+
+    streams > 1이면 파일을 구간(range)으로 나눠 연결 여러 개로 동시에 기록
+    (지연이 큰 회선에서 연결 1개의 처리량 한계를 넘기 위해)
+
+    state는 get_resume / put_resume / put_range / clear_resume을 가진 객체 (UploadLedger)
+    """
+
+    def __init__(self, transport_factory, state, chunk_size=8 * 1024 * 1024, streams=1):
+        self.transport_factory = transport_factory
+        self.state = state
+        self.chunk_size = chunk_size
+        self.streams = max(1, int(streams))
+        self._lock = threading.Lock()
+
+    def plan(self, file_info, partial, transport):
+        """
+        보낼 구간 목록
+
+        Returns:
+            ([{'idx', 'start', 'end', 'offset'}], 새로 시작 여부)
+        """
+        saved = self.state.get_resume(file_info)
+        if saved and saved["remote"] == partial and saved["ranges"]:
+            remote_size = transport.size(partial)
+            if remote_size is not None:
+                # 저장된 위치와 원격 임시 파일 크기 중 작은 값부터 (이전 구간 분할 그대로 사용)
+                return [
+                    dict(r, idx=idx, offset=max(r["start"], min(r["offset"], remote_size)))
+                    for idx, r in sorted(saved["ranges"].items())
+                ], False
+
+        total = file_info["size"]
+        step = -(-total // self.streams)
+        step = max(self.chunk_size, -(-step // self.chunk_size) * self.chunk_size)
+        ranges = []
+        for idx, start in enumerate(range(0, total, step)):
+            ranges.append({"idx": idx, "start": start, "end": min(total, start + step), "offset": start})
+        return ranges or [{"idx": 0, "start": 0, "end": 0, "offset": 0}], True
+
+    def _advance(self, n):
+        with self._lock:
+            self._done += n
+            if self._progress:
+                self._progress(self._done, self._total, self._done - self._resumed_from)
+
+    def _send_range(self, transport, file_info, partial, r, truncate):
+        """구간 1개 전송 (청크마다 확정 위치 저장)"""
+        offset, end = r["offset"], r["end"]
+        buf = bytearray(self.chunk_size)
+        view = memoryview(buf)
+        out = transport.open_at(partial, offset, truncate=truncate)
+        try:
+            with open(file_info["path"], "rb") as src:
+                src.seek(offset)
+                while offset < end and not self._failed.is_set():
+                    n = src.readinto(view[:min(self.chunk_size, end - offset)])
+                    if not n:
+                        raise IOError("로컬 파일이 예상보다 짧습니다 (전송 중 변경됨?)")
+                    out.write(view[:n])
+                    transport.commit(out)
+                    offset += n
+                    self.state.put_range(file_info, r["idx"], r["start"], end, offset)
+                    self._advance(n)
+        finally:
+            out.close()
+
+    def upload(self, file_info, remote_dir, progress=None):
+        """
+        파일 업로드 (중단됐던 위치부터)
+
+        Args:
+            remote_dir: 원격 폴더 경로 (remote 이름 없이, 예: /recordings/강의장)
+            progress: callback(전송된 바이트, 전체 바이트, 이번 실행에서 보낸 바이트)
+
+        Returns:
+            (최종 원격 경로, 시작 시 이미 보낸 바이트)
+        """
+        final = posixpath.join(remote_dir, file_info["name"])
+        partial = final + PARTIAL_SUFFIX
+
+        transports = [self.transport_factory()]
+        try:
+            ranges, fresh = self.plan(file_info, partial, transports[0])
+            if fresh:
+                transports[0].open_at(partial, 0).close()  # 빈 임시 파일 (이전 내용 제거)
+
+            self._done = sum(r["offset"] - r["start"] for r in ranges)
+            self._resumed_from = self._done
+            self._total = file_info["size"]
+            self._progress = progress
+            self._failed = threading.Event()
+            self.state.put_resume(file_info, partial, self._done)
+            for r in ranges:
+                self.state.put_range(file_info, r["idx"], r["start"], r["end"], r["offset"])
+
+            pending = [r for r in ranges if r["offset"] < r["end"]]
+            truncate = len(ranges) == 1
+            if len(pending) <= 1:
+                for r in pending:
+                    self._send_range(transports[0], file_info, partial, r, truncate)
+            else:
+                errors = []
+
+                def worker(transport, r):
+                    try:
+                        self._send_range(transport, file_info, partial, r, truncate)
+                    except BaseException as e:
+                        errors.append(e)
+                        self._failed.set()
+
+                threads = []
+                for i, r in enumerate(pending):
+                    if i > 0:
+                        transports.append(self.transport_factory())
+                    threads.append(threading.Thread(target=worker, args=(transports[i], r), daemon=True))
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                if errors:
+                    raise errors[0]
+
+            transports[0].rename(partial, final)
+            self.state.clear_resume(file_info)
+            return final, self._resumed_from
+        finally:
+            for transport in transports:
+                transport.close()
+
+
+# ============================================
+# 벤치마크
+# ============================================
+class _MemoryState:
+    """벤치마크용 장부 대체 (메모리)"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def get_resume(self, file_info):
+        return self.rows.get(file_info["path"])
+
+    def put_resume(self, file_info, remote, offset):
+        row = self.rows.setdefault(file_info["path"], {"remote": remote, "ranges": {}})
+        row.update(remote=remote, offset=offset)
+
+    def put_range(self, file_info, idx, start, end, offset):
+        self.rows[file_info["path"]]["ranges"][idx] = {"start": start, "end": end, "offset": offset}
+
+    def clear_resume(self, file_info):
+        self.rows.pop(file_info["path"], None)
+
+
+class _CutFile:
+    """쓴 바이트가 budget을 넘으면 연결이 끊긴 것처럼 ConnectionError (모든 연결이 budget 공유)"""
+
+    def __init__(self, f, budget):
+        self._f = f
+        self._budget = budget
+
+    def write(self, data):
+        with self._budget["lock"]:
+            left = self._budget["left"]
+            if left is not None:
+                if len(data) >= left:
+                    raise ConnectionError("연결 끊김 (벤치마크)")
+                self._budget["left"] = left - len(data)
+        return self._f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+class _SlowTransport(LocalTransport):
+    """
+    청크마다 지연(왕복 시간)을 넣어 지연이 큰 회선 흉내 (연결별로 따로 기다림)
+    budget이 있으면 그만큼 보낸 뒤 연결 끊김 흉내
+    """
+
+    def __init__(self, root, latency, budget=None):
+        super().__init__(root)
+        self.latency = latency
+        self.budget = budget
+
+    def open_at(self, remote, offset, truncate=True):
+        f = super().open_at(remote, offset, truncate)
+        return _CutFile(f, self.budget) if self.budget else f
+
+    def commit(self, f):
+        super().commit(f)
+        time.sleep(self.latency)
+
+
+def _make_source(work, size_mb):
+    src = os.path.join(work, "recording.mp4")
+    with open(src, "wb") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size_mb):
+            f.write(block)
+    return {"name": "recording.mp4", "path": src, "size": os.path.getsize(src)}
+
+
+def _same_file(a, b):
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        while True:
+            x, y = fa.read(1024 * 1024), fb.read(1024 * 1024)
+            if x != y:
+                return False
+            if not x:
+                return True
+
+
+def benchmark(size_mb=512, chunk_mb=8, interrupt_at=0.9, latency=0.0, streams=1):
+    """끊김 후 이어받기와 처음부터 다시 보내기 비교"""
+    work = tempfile.mkdtemp(prefix="resume_bench_")
+    try:
+        file_info = _make_source(work, size_mb)
+        stop_at = int(file_info["size"] * interrupt_at)
+
+        def run(resume):
+            remote = os.path.join(work, "remote")
+            shutil.rmtree(remote, ignore_errors=True)
+            budget = {"left": stop_at, "lock": threading.Lock()}
+            uploader = ResumableUploader(lambda: _SlowTransport(remote, latency, budget), _MemoryState(),
+                                         chunk_size=chunk_mb * 1024 * 1024, streams=streams)
+            sent = [0]
+
+            def progress(done, total, this_run):
+                sent[0] = this_run
+
+            started = time.perf_counter()
+            try:
+                uploader.upload(file_info, "/dst", progress=progress)
+            except ConnectionError:
+                pass
+            first = sent[0]
+            budget["left"] = None
+            if not resume:
+                uploader.state = _MemoryState()  # 이어받기 정보 없음 = 처음부터
+            uploader.upload(file_info, "/dst", progress=progress)
+            elapsed = time.perf_counter() - started
+            if not _same_file(file_info["path"], os.path.join(remote, "dst", file_info["name"])):
+                raise RuntimeError("업로드 결과가 원본과 다릅니다")
+            return first + sent[0], elapsed
+
+        restart_bytes, restart_sec = run(resume=False)
+        resume_bytes, resume_sec = run(resume=True)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    mb = 1024 * 1024
+    print(f"파일 {size_mb}MB, 청크 {chunk_mb}MB, 연결 {streams}개, "
+          f"{interrupt_at:.0%} 지점에서 끊김, 청크당 지연 {latency}s")
+    print(f"  처음부터 재전송: {restart_bytes / mb:8.1f}MB 전송, {restart_sec:6.2f}초")
+    print(f"  이어받기:        {resume_bytes / mb:8.1f}MB 전송, {resume_sec:6.2f}초")
+    print(f"  절약: {(restart_bytes - resume_bytes) / mb:.1f}MB, {restart_sec - resume_sec:.2f}초")
+
+
+def benchmark_streams(size_mb=256, chunk_mb=4, latency=0.05, stream_counts=(1, 2, 4, 8)):
+    """연결 1개 vs 여러 개 비교 (청크마다 latency초 지연 = 지연이 큰 회선)"""
+    work = tempfile.mkdtemp(prefix="streams_bench_")
+    results = []
+    try:
+        file_info = _make_source(work, size_mb)
+        for streams in stream_counts:
+            remote = os.path.join(work, "remote")
+            shutil.rmtree(remote, ignore_errors=True)
+            uploader = ResumableUploader(lambda: _SlowTransport(remote, latency), _MemoryState(),
+                                         chunk_size=chunk_mb * 1024 * 1024, streams=streams)
+            started = time.perf_counter()
+            uploader.upload(file_info, "/dst")
+            elapsed = time.perf_counter() - started
+            if not _same_file(file_info["path"], os.path.join(remote, "dst", file_info["name"])):
+                raise RuntimeError(f"연결 {streams}개: 업로드 결과가 원본과 다릅니다")
+            results.append((streams, elapsed))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(f"파일 {size_mb}MB, 청크 {chunk_mb}MB, 청크당 지연 {latency}s")
+    base = results[0][1]
+    for streams, elapsed in results:
+        print(f"  연결 {streams:2d}개: {elapsed:6.2f}초, {size_mb / elapsed:8.1f}MB/s (x{base / elapsed:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이어받기 업로드 도구")
+    parser.add_argument("--benchmark", action="store_true", help="로컬 전송으로 벤치마크")
+    parser.add_argument("--size-mb", type=int, default=512, help="테스트 파일 크기(MB)")
+    parser.add_argument("--chunk-mb", type=int, default=8, help="청크 크기(MB)")
+    parser.add_argument("--interrupt-at", type=float, default=0.9, help="끊기는 지점 (0~1)")
+    parser.add_argument("--latency", type=float, default=0.0, help="청크당 지연(초)")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1],
+                        help="동시 연결 수 (--benchmark-streams는 여러 개 비교)")
+    parser.add_argument("--benchmark-streams", action="store_true",
+                        help="연결 1개 vs 여러 개 속도 비교 (로컬 + 지연 주입)")
+    args = parser.parse_args()
+
+    if args.benchmark_streams:
+        counts = args.streams if len(args.streams) > 1 else [1, 2, 4, 8]
+        benchmark_streams(args.size_mb, args.chunk_mb, args.latency or 0.05, counts)
+    elif args.benchmark:
+        benchmark(args.size_mb, args.chunk_mb, args.interrupt_at, args.latency, args.streams[0])
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업로드 완료 파일 정리 (디스크 공간 확보)
+
+녹화 드라이브 사용률이 high_water_pct를 넘으면, 업로드·검증·이동까지 끝난(archived) 녹화 중
+오래된 것부터 삭제해 low_water_pct 아래로 내립니다. 삭제 직전에 원격에 같은 크기(해시가 있으면
+해시까지) 파일이 있는지 한 번 더 확인하고, 확인된 파일만 지웁니다.
+
+config.yaml:
+    retention:
+      enabled: true
+      high_water_pct: 90      # 사용률이 이 이상이면 정리 시작
+      low_water_pct: 80       # 이 아래가 될 때까지 삭제
+      min_age_hours: 24       # 업로드 완료 후 최소 보관 시간
+      interval_min: 10        # 감시 모드에서 확인 주기(분)
+
+upload_recording.py에서 import해서 사용:
+    from upload_retention import RetentionEngine
+"""
+
+import os
+import time
+import shutil
+
+from upload_ledger import ARCHIVED
+
+
+def volume_usage(path):
+    """(전체, 사용, 여유) 바이트. 전체는 예약 공간을 뺀 값 (df 사용률과 같은 기준)"""
+    usage = shutil.disk_usage(path)
+    return usage.used + usage.free, usage.used, usage.free
+
+
+def bytes_to_free(total, used, high_pct, low_pct):
+    """사용률이 high_pct 이상이면 low_pct까지 내리기 위해 지울 바이트 (아니면 0)"""
+    if used * 100 < total * high_pct:
+        return 0
+    return max(0, used - int(total * low_pct / 100))
+
+
+class RetentionEngine:
+    """archived 녹화를 오래된 순으로 삭제"""
+
+    def __init__(self, ledger, archive_folder, watch_folder=None, high_water_pct=90,
+                 low_water_pct=80, min_age_hours=24, extensions=('.mp4', '.mkv'), logger=None):
+        if low_water_pct >= high_water_pct:
+            raise ValueError("retention.low_water_pct는 high_water_pct보다 작아야 합니다")
+        self.ledger = ledger
+        self.archive_folder = archive_folder
+        self.watch_folder = watch_folder or archive_folder
+        self.high_water_pct = high_water_pct
+        self.low_water_pct = low_water_pct
+        self.min_age_sec = min_age_hours * 3600
+        self.extensions = [ext.lower() for ext in extensions]
+        self.logger = logger
+        self.total_reclaimed = 0
+        self._warned_volume = False
+
+    @classmethod
+    def from_config(cls, config, ledger, logger=None):
+        """retention.enabled가 아니면 None"""
+        cfg = config.get('retention') or {}
+        if not cfg.get('enabled'):
+            return None
+        return cls(
+            ledger,
+            config.get('uploaded_folder') or config['recording_folder'],
+            watch_folder=config['recording_folder'],
+            high_water_pct=cfg.get('high_water_pct', 90),
+            low_water_pct=cfg.get('low_water_pct', 80),
+            min_age_hours=cfg.get('min_age_hours', 24),
+            extensions=config.get('extensions', ['.mp4', '.mkv']),
+            logger=logger,
+        )
+
+    def _log(self, msg, level="info"):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+
+    def _monitored_folder(self):
+        """사용률을 볼 폴더 (보관 폴더가 다른 드라이브면 정리해도 녹화 드라이브가 비지 않으므로 보관 폴더 기준)"""
+        if not os.path.isdir(self.archive_folder):
+            return None
+        if os.stat(self.archive_folder).st_dev != os.stat(self.watch_folder).st_dev:
+            if not self._warned_volume:
+                self._log("업로드 완료 폴더가 녹화 폴더와 다른 드라이브입니다. "
+                          "정리해도 녹화 드라이브 공간은 늘지 않습니다.", "warning")
+                self._warned_volume = True
+        return self.archive_folder
+
+    def candidates(self):
+        """
+        삭제 가능한 파일 (archived + 최소 보관 시간 경과), 오래된 순
+
+        Returns:
+            [(file_info, 장부 키 file_info)] - 장부 키는 업로드 당시 경로 기준 (해시 캐시 조회용)
+        """
+        archived = {}
+        now = time.time()
+        for row in self.ledger.rows(ARCHIVED):
+            if now - row['updated_at'] < self.min_age_sec:
+                continue
+            archived[(row['name'], row['size'], row['mtime_ns'])] = {
+                'name': row['name'], 'path': row['path'], 'size': row['size'], 'mtime_ns': row['mtime_ns'],
+            }
+
+        result = []
+        with os.scandir(self.archive_folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in self.extensions:
+                    continue
+                st = entry.stat()
+                key = archived.get((entry.name, st.st_size, st.st_mtime_ns))
+                if key is None:
+                    continue
+                file_info = {'name': entry.name, 'path': entry.path,
+                             'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+                result.append((file_info, key))
+        result.sort(key=lambda item: item[0]['mtime_ns'])
+        return result
+
+    def run(self, remote_check, dry_run=False):
+        """
+        필요하면 정리 실행
+
+        Args:
+            remote_check: callback([(file_info, 장부 키)]) → {경로: (원격 확인 여부, 사유)}
+            dry_run: 삭제하지 않고 대상만 보고
+
+        Returns:
+            (삭제한 파일 수, 확보한 바이트)
+        """
+        folder = self._monitored_folder()
+        if folder is None:
+            return 0, 0
+
+        total, used, free = volume_usage(folder)
+        need = bytes_to_free(total, used, self.high_water_pct, self.low_water_pct)
+        if not need:
+            return 0, 0
+
+        self._log(f"디스크 사용률 {used * 100 / total:.1f}% (기준 {self.high_water_pct}%), "
+                  f"{need / 1024 ** 3:.1f}GB 정리 필요")
+
+        # 오래된 순으로 필요한 만큼만 골라 원격 확인 (한 번의 목록 조회)
+        picked = []
+        planned = 0
+        for file_info, key in self.candidates():
+            if planned >= need:
+                break
+            picked.append((file_info, key))
+            planned += file_info['size']
+        if not picked:
+            self._log("정리할 수 있는 업로드 완료 파일이 없습니다", "warning")
+            return 0, 0
+
+        checks = remote_check(picked)
+        evicted = 0
+        reclaimed = 0
+        for file_info, _ in picked:
+            ok, reason = checks.get(file_info['path'], (False, "확인 안 됨"))
+            if not ok:
+                self._log(f"원격 확인 실패, 보관: {file_info['name']} - {reason}", "warning")
+                continue
+            if not dry_run:
+                try:
+                    os.remove(file_info['path'])
+                except OSError as e:
+                    self._log(f"삭제 실패: {file_info['name']} - {e}", "warning")
+                    continue
+            evicted += 1
+            reclaimed += file_info['size']
+            self._log(f"{'삭제 예정' if dry_run else '삭제'}: {file_info['name']} "
+                      f"({file_info['size'] / 1024 ** 3:.2f}GB, {reason})")
+
+        if not dry_run:
+            self.total_reclaimed += reclaimed
+        total, used, free = volume_usage(folder)
+        self._log(f"정리 {'예정' if dry_run else '완료'}: {evicted}개, {reclaimed / 1024 ** 3:.2f}GB 확보 "
+                  f"(사용률 {used * 100 / total:.1f}%)")
+        return evicted, reclaimed
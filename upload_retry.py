@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업로드 재시도 + 원격별 차단기(circuit breaker)
+
+- rclone 종료 코드/오류 메시지로 실패 분류 (재시도 가능 / 재시도해도 안 되는 오류)
+- 재시도 가능한 실패는 지수 백오프(+무작위 지연)로 같은 실행 안에서 다시 시도
+- 같은 원격에 연속으로 연결이 안 되면 차단기를 열어 남은 파일은 rclone을 띄우지 않고 바로 실패 처리,
+  cooldown_sec 후 파일 1개로 다시 시험 (성공하면 닫힘)
+
+config.yaml:
+    retry:
+      max_attempts: 4           # 파일당 최대 시도 횟수 (1 = 재시도 안 함)
+      base_sec: 10              # 첫 재시도 대기(초), 이후 2배씩
+      max_sec: 300              # 재시도 대기 상한(초)
+      breaker_threshold: 3      # 연결 실패가 연속 이만큼이면 차단
+      breaker_cooldown_sec: 600 # 차단 후 다시 시험하기까지(초)
+
+upload_recording.py에서 import해서 사용:
+    from upload_retry import RetryPolicy, classify_failure, get_breaker
+"""
+
+import re
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+# rclone 종료 코드 (https://rclone.org/docs/#exit-code)
+EXIT_CODES = {
+    1: ("usage", False),            # 문법/사용법 오류
+    2: ("uncategorized", True),     # 분류되지 않은 오류
+    3: ("dir_not_found", False),    # 폴더 없음
+    4: ("file_not_found", False),   # 파일 없음
+    5: ("temporary", True),         # 일시적 오류 (재시도로 해결 가능)
+    6: ("no_retry", False),         # 재시도하면 안 되는 오류
+    7: ("fatal", False),            # 치명적 오류 (계정 정지 등)
+    8: ("max_transfer", False),     # --max-transfer 초과
+    9: ("no_transfer", False),      # 전송한 파일 없음
+    10: ("max_duration", True),     # --max-duration 초과
+}
+
+# 서버에 연결 자체가 안 되는 경우의 메시지 (차단기 대상)
+# "timeout"/"eof"만으로는 로컬 파일 읽기, --timeout 옵션 등과 구분되지 않으므로 네트워크 문구만
+UNREACHABLE_PATTERNS = (
+    "connection refused", "connection reset", "no route to host", "network is unreachable",
+    "i/o timeout", "connection timed out", "tls handshake timeout", "couldn't connect", "dial tcp",
+    "read tcp", "write tcp", "handshake failed", "host is down", "no such host", "rc 서버 연결 실패",
+)
+# EOF는 SSH/SFTP/TCP 연결 문맥에서만 (예: "ssh: handshake failed: EOF", "sftp: ... EOF")
+UNREACHABLE_EOF = re.compile(r"\b(ssh|sftp|tcp|tls|connection)\b.*\beof\b")
+
+
+@dataclass
+class Failure:
+    """실패 분류 결과"""
+    category: str
+    retryable: bool
+    unreachable: bool
+
+
+def classify_failure(exit_code, message=""):
+    """rclone 종료 코드 + 오류 메시지 → Failure"""
+    text = (message or "").lower()
+    unreachable = any(p in text for p in UNREACHABLE_PATTERNS) or bool(UNREACHABLE_EOF.search(text))
+    if unreachable:
+        # 접속 실패는 rclone이 1(파일시스템 생성 실패)로 끝나는 경우도 있어 메시지 우선
+        return Failure("unreachable", True, True)
+    if exit_code is None:
+        if "설치되지 않았습니다" in text:
+            return Failure("not_installed", False, False)
+        return Failure("uncategorized", True, False)
+    category, retryable = EXIT_CODES.get(exit_code, ("unknown", True))
+    return Failure(category, retryable, False)
+
+
+class RetryPolicy:
+    """지수 백오프 (full jitter: 0 ~ min(max, base * 2^n) 사이 무작위)"""
+
+    def __init__(self, max_attempts=4, base_sec=10, max_sec=300):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_sec = base_sec
+        self.max_sec = max_sec
+
+    @classmethod
+    def from_config(cls, config):
+        cfg = config.get('retry') or {}
+        return cls(
+            max_attempts=cfg.get('max_attempts', 4),
+            base_sec=cfg.get('base_sec', 10),
+            max_sec=cfg.get('max_sec', 300),
+        )
+
+    def delay(self, attempt):
+        """attempt번째 실패 후 대기 시간(초)"""
+        return random.uniform(0, min(self.max_sec, self.base_sec * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    원격 1개의 연결 상태
+
+    closed(정상) → 연결 실패 threshold회 연속 → open(차단) → cooldown 후 half-open(시험 1건)
+    """
+
+    def __init__(self, name, threshold=3, cooldown_sec=600, logger=None):
+        self.name = name
+        self.threshold = max(1, int(threshold))
+        self.cooldown_sec = cooldown_sec
+        self.logger = logger
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.cooldown_sec:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """지금 전송을 시도해도 되는지"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None and self.logger:
+                self.logger.info(f"원격 연결 복구, 차단 해제: {self.name}")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self, failure):
+        with self._lock:
+            if not failure.unreachable:
+                # 파일 자체 문제 등은 연결 상태와 무관
+                self.probing = False
+                return
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                if self.logger:
+                    self.logger.warning(
+                        f"원격 연결 실패 {self.failures}회, {self.cooldown_sec}초간 차단: {self.name}"
+                    )
+                self.opened_at = time.time()
+            self.probing = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(config, remote_name, logger=None):
+    """원격 이름별 차단기 (실행 중 공유)"""
+    with _breakers_lock:
+        if remote_name not in _breakers:
+            cfg = config.get('retry') or {}
+            _breakers[remote_name] = CircuitBreaker(
+                remote_name,
+                threshold=cfg.get('breaker_threshold', 3),
+                cooldown_sec=cfg.get('breaker_cooldown_sec', 600),
+                logger=logger,
+            )
+        return _breakers[remote_name]
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업로드 검증 (로컬 해시 + 원격 해시/크기 비교)
+
+- 로컬 해시: 메모리 맵으로 파일을 한 번만 읽으면서 여러 해시를 동시에 계산
+  (빠른 비암호 해시 crc32 또는 xxh3 + 원격 비교용 해시 + 선택적으로 SHA-256)
+- 계산 결과는 장부(upload_ledger)에 (경로, 크기, 수정시간) 기준으로 저장 → 재실행 시 다시 읽지 않음
+- 원격 검증: 업로드한 파일들을 한 번의 목록 조회(rclone lsjson / rc operations/list)로
+  해시 또는 크기 비교
+
+upload_recording.py에서 import해서 사용:
+    from upload_verify import get_digests, verify_remote
+"""
+
+import os
+import mmap
+import json
+import zlib
+import hashlib
+import tempfile
+import subprocess
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# 빠른 비암호 해시 (xxhash가 있으면 xxh3, 없으면 crc32)
+FAST_HASH = "xxh3" if XXHASH_AVAILABLE else "crc32"
+
+
+class _Crc32:
+    """zlib.crc32를 hashlib 인터페이스로"""
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return f"{self.value & 0xFFFFFFFF:08x}"
+
+
+def _new_hasher(algo):
+    if algo == "crc32":
+        return _Crc32()
+    if algo == "xxh3":
+        return xxhash.xxh3_64()
+    if algo == "xxh128":
+        return xxhash.xxh3_128()
+    return hashlib.new(algo)
+
+
+def hash_file(path, algorithms):
+    """
+    파일을 한 번 읽으며 여러 해시 계산 (메모리 맵, 청크 단위)
+
+    Returns:
+        {알고리즘: hex digest}
+    """
+    hashers = {algo: _new_hasher(algo) for algo in algorithms}
+
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return {algo: h.hexdigest() for algo, h in hashers.items()}
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for offset in range(0, size, CHUNK_SIZE):
+                    chunk = view[offset:offset + CHUNK_SIZE]
+                    for h in hashers.values():
+                        h.update(chunk)
+                    chunk.release()
+            finally:
+                view.release()
+
+    return {algo: h.hexdigest() for algo, h in hashers.items()}
+
+
+def get_verify_config(config):
+    """
+    config.yaml:
+        verify:
+          enabled: true        # 기본 false (verify: 항목이 없으면 이전처럼 검증 없이 이동)
+          hash: "md5"          # 원격 비교 해시 (md5/sha1/sha256/crc32/none=크기만)
+          sha256: false        # 로컬 SHA-256도 계산해 장부에 기록
+          require_hash: false  # 원격이 해시를 지원하지 않으면 실패 (false면 크기 비교로 대체)
+    """
+    cfg = config.get('verify') or {}
+    remote_hash = str(cfg.get('hash', 'md5')).lower()
+    return {
+        'enabled': cfg.get('enabled', False),
+        'hash': None if remote_hash in ('none', '', 'size') else remote_hash,
+        'sha256': cfg.get('sha256', False),
+        'require_hash': cfg.get('require_hash', False),
+    }
+
+
+def get_digests(file_info, ledger, verify_cfg):
+    """필요한 해시를 캐시에서 가져오고, 없는 것만 한 번에 계산"""
+    wanted = [FAST_HASH]
+    if verify_cfg['hash']:
+        wanted.append(verify_cfg['hash'])
+    if verify_cfg['sha256']:
+        wanted.append('sha256')
+    wanted = list(dict.fromkeys(wanted))
+
+    digests = ledger.get_digests(file_info)
+    missing = [algo for algo in wanted if algo not in digests]
+    if missing:
+        computed = hash_file(file_info['path'], missing)
+        ledger.put_digests(file_info, computed)
+        digests.update(computed)
+    return digests
+
+
+def list_remote(remote_dir, names, hash_type=None, rc_client=None):
+    """
+    원격 폴더에서 지정한 파일들의 크기/해시 조회 (한 번의 호출)
+
+    Returns:
+        {파일명: {'size': 크기, 'hashes': {알고리즘: digest}}}
+    """
+    # 업로드한 파일만 조회 (폴더 전체를 나열하면 SFTP에서는 모든 녹화 파일의 해시를 계산함)
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+        f.write('\n'.join(names) + '\n')
+        list_file = f.name
+    try:
+        if rc_client is not None:
+            opt = {'filesOnly': True, 'noModTime': True, 'noMimeType': True}
+            if hash_type:
+                opt.update({'showHash': True, 'hashTypes': [hash_type]})
+            result = rc_client.call('operations/list', fs=remote_dir.rstrip('/'), remote='', opt=opt,
+                                    _filter={'FilesFromRaw': [list_file]})
+            items = result.get('list') or []
+        else:
+            cmd = [
+                'rclone', 'lsjson', remote_dir,
+                '--files-only', '--no-modtime', '--no-mimetype',
+                '--files-from-raw', list_file,
+            ]
+            if hash_type:
+                cmd.extend(['--hash', '--hash-type', hash_type])
+            proc = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
+            if proc.returncode != 0:
+                raise RuntimeError(f"rclone lsjson 오류 (코드: {proc.returncode}): {proc.stderr.strip()[-200:]}")
+            items = json.loads(proc.stdout or '[]')
+    finally:
+        os.unlink(list_file)
+
+    wanted = set(names)
+    return {
+        item['Name']: {
+            'size': item.get('Size'),
+            'hashes': {k.lower(): v.lower() for k, v in (item.get('Hashes') or {}).items() if v},
+        }
+        for item in items if item.get('Name') in wanted
+    }
+
+
+def verify_remote(files, remote_dir, verify_cfg, rc_client=None):
+    """
+    업로드한 파일들을 원격 목록과 비교
+
+    Args:
+        files: [(file_info, digests)]
+
+    Returns:
+        {경로: (통과 여부, 사유)}
+    """
+    hash_type = verify_cfg['hash']
+    listing = list_remote(remote_dir, [f['name'] for f, _ in files], hash_type, rc_client)
+
+    results = {}
+    for file_info, digests in files:
+        remote = listing.get(file_info['name'])
+        if remote is None:
+            results[file_info['path']] = (False, "원격에 파일 없음")
+            continue
+        if remote['size'] != file_info['size']:
+            results[file_info['path']] = (False, f"크기 불일치 (원격 {remote['size']})")
+            continue
+
+        remote_hash = remote['hashes'].get(hash_type) if hash_type else None
+        if hash_type and remote_hash is None:
+            if verify_cfg['require_hash']:
+                results[file_info['path']] = (False, f"원격이 {hash_type} 해시를 지원하지 않음")
+            else:
+                results[file_info['path']] = (True, "크기 일치 (원격 해시 없음)")
+            continue
+        if remote_hash is not None and remote_hash != digests.get(hash_type):
+            results[file_info['path']] = (False, f"{hash_type} 불일치")
+            continue
+
+        results[file_info['path']] = (True, f"{hash_type} 일치" if remote_hash else "크기 일치")
+    return results
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+녹화 폴더 감시 (upload_recording.py --watch 용)
+
+- native: OS 파일 알림 (watchdog 패키지 필요, Windows/Linux/macOS)
+- polling: 주기적으로 폴더를 스캔해 크기/수정시간 변화 감지 (의존성 없음)
+
+콜백은 callback(path, event) 형태로 호출됩니다.
+  event: "created" / "modified" / "closed" / "deleted"
+
+upload_recording.py에서 import해서 사용:
+    from upload_watch import make_watcher
+"""
+
+import os
+import threading
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+
+def _match(path, extensions):
+    """확장자 확인"""
+    return os.path.splitext(path)[1].lower() in extensions
+
+
+class PollingWatcher:
+    """주기적 스캔 방식 감시 (폴백)"""
+
+    name = "polling"
+
+    def __init__(self, folder, extensions, interval=2.0):
+        self.folder = folder
+        self.extensions = extensions
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._seen = {}
+
+    def _scan(self):
+        """폴더 스캔 → {경로: (크기, 수정시간)}"""
+        result = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not _match(entry.name, self.extensions):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    result[entry.path] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            pass
+        return result
+
+    def _run(self, callback):
+        self._seen = self._scan()
+        while not self._stop.wait(self.interval):
+            current = self._scan()
+            for path, sig in current.items():
+                old = self._seen.get(path)
+                if old is None:
+                    callback(path, "created")
+                elif old != sig:
+                    callback(path, "modified")
+            for path in self._seen.keys() - current.keys():
+                callback(path, "deleted")
+            self._seen = current
+
+    def start(self, callback):
+        self._thread = threading.Thread(target=self._run, args=(callback,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+
+class NativeWatcher:
+    """OS 파일 알림 방식 감시 (watchdog)"""
+
+    name = "native"
+
+    def __init__(self, folder, extensions):
+        if not WATCHDOG_AVAILABLE:
+            raise RuntimeError("watchdog 패키지가 설치되지 않았습니다. (pip install watchdog)")
+        self.folder = folder
+        self.extensions = extensions
+        self._observer = None
+
+    def start(self, callback):
+        extensions = self.extensions
+
+        class Handler(FileSystemEventHandler):
+            def _emit(self, event, kind, path=None):
+                path = path or event.src_path
+                if not event.is_directory and _match(path, extensions):
+                    callback(path, kind)
+
+            def on_created(self, event):
+                self._emit(event, "created")
+
+            def on_modified(self, event):
+                self._emit(event, "modified")
+
+            def on_closed(self, event):
+                self._emit(event, "closed")
+
+            def on_moved(self, event):
+                # 임시 이름으로 쓰고 rename하는 경우
+                self._emit(event, "deleted")
+                self._emit(event, "created", event.dest_path)
+
+            def on_deleted(self, event):
+                self._emit(event, "deleted")
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), self.folder, recursive=False)
+        self._observer.start()
+
+    def stop(self):
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+
+
+def make_watcher(folder, extensions, backend="auto", interval=2.0):
+    """
+    감시자 생성
+
+    Args:
+        backend: "auto" (native 가능하면 native, 아니면 polling) / "native" / "polling"
+        interval: polling 주기(초)
+    """
+    extensions = [ext.lower() for ext in extensions]
+    if backend == "native" or (backend == "auto" and WATCHDOG_AVAILABLE):
+        return NativeWatcher(folder, extensions)
+    return PollingWatcher(folder, extensions, interval=interval)
@@ -9,6 +9,7 @@ Zoom 회의 상태 사전 체크
 사용법:
     python zoom_check.py           # 상태 확인 + 필요시 재참가
     python zoom_check.py --quiet   # 로그 없이 실행
+    python zoom_check.py --if-due 5  # 다음 캡처 시각(capture/schedule.yaml)이 5분 안일 때만 실행
 """
 
 import sys
@@ -20,9 +21,29 @@ sys.path.insert(0, str(Path(__file__).parent))
 from zoom_utils import ensure_meeting, is_in_meeting, check_disconnect_alert
 
 
+def minutes_until_capture():
+    """다음 자동 캡처까지 남은 분 (capture/schedule.yaml 기준, 없으면 None)"""
+    sys.path.insert(0, str(Path(__file__).parent.parent / "capture"))
+    from datetime import datetime
+    from session_schedule import load_schedule
+
+    seconds = load_schedule().seconds_until_next_trigger(datetime.now())
+    return None if seconds is None else seconds / 60
+
+
 def main():
     verbose = "--quiet" not in sys.argv and "-q" not in sys.argv
 
+    # 작업 스케줄러에서 자주 실행해도 캡처 직전에만 체크
+    if "--if-due" in sys.argv:
+        idx = sys.argv.index("--if-due")
+        within = float(sys.argv[idx + 1]) if idx + 1 < len(sys.argv) else 3
+        remaining = minutes_until_capture()
+        if remaining is None or remaining > within:
+            if verbose:
+                print("다음 캡처 시각이 아닙니다. 종료합니다.")
+            sys.exit(0)
+
     if verbose:
         print("=" * 50)
         print("Zoom 회의 상태 사전 체크")
@@ -790,7 +790,7 @@ def leave_meeting(close_app=None, verbose=True):
 # ============================================
 # 핵심 함수: ensure_meeting
 # ============================================
-def ensure_meeting(verbose=True):
+def ensure_meeting(verbose=True, on_rejoin=None):
     """
     회의 연결 상태 확인 및 필요시 재참가
 
@@ -805,6 +805,7 @@ def ensure_meeting(verbose=True):
 
     Args:
         verbose: 로그 출력 여부
+        on_rejoin: 재참가를 시작할 때 호출 (진행 상황 표시용)
 
     Returns:
         bool: 회의 활성화 여부
@@ -834,6 +835,8 @@ def ensure_meeting(verbose=True):
 
     # 3. 재참가 필요하면 Zoom 정리 후 재참가
     if need_rejoin:
+        if on_rejoin:
+            on_rejoin()
         log("[*] Zoom 정리 중...")
         cleanup_zoom()
         log("[O] Zoom 정리 완료")